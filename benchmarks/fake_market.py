@@ -0,0 +1,128 @@
+"""
+pykrx 대체 데이터 제공자
+pykrx.stock 모듈과 같은 함수 시그니처로 결정적(seed 고정) 시세 DataFrame을 생성
+"""
+from datetime import datetime, timedelta
+from typing import Dict, List, Optional
+import time
+import zlib
+import numpy as np
+import pandas as pd
+
+OHLCV_COLUMNS = ["시가", "고가", "저가", "종가", "거래량", "거래대금", "등락률"]
+
+class FakeKrxStock:
+    """pykrx.stock 스텁 (get_market_ohlcv, get_market_cap, get_index_ohlcv 등)"""
+
+    def __init__(self, n_tickers: int = 2500, latency_ms: float = 30.0, seed: int = 42):
+        """
+        초기화
+
+        Args:
+            n_tickers: 전체 시장 종목 수
+            latency_ms: 호출당 지연 시간 (ms, 실제 KRX 응답 시간 흉내)
+            seed: 난수 seed
+        """
+        self.latency = latency_ms / 1000
+        rng = np.random.default_rng(seed)
+
+        named = {
+            "005930": "삼성전자", "000660": "SK하이닉스", "373220": "LG에너지솔루션",
+            "207940": "삼성바이오로직스", "005380": "현대차", "000270": "기아",
+            "068270": "셀트리온", "005490": "POSCO홀딩스", "035420": "NAVER", "035720": "카카오"
+        }
+        tickers: List[str] = list(named)
+        code = 100000
+        while len(tickers) < n_tickers:
+            code += 7
+            tickers.append(f"{code:06d}")
+        self.tickers = tickers
+        self.names: Dict[str, str] = {t: named.get(t, f"종목{t}") for t in tickers}
+        self.markets: Dict[str, str] = {t: ("KOSPI" if i % 3 else "KOSDAQ") for i, t in enumerate(tickers)}
+
+        base = rng.lognormal(mean=10, sigma=1.2, size=len(tickers)).round(-1) + 1000
+        self._base_price = dict(zip(tickers, base))
+        self._shares = dict(zip(tickers, rng.integers(1_000_000, 5_000_000_000, size=len(tickers))))
+        self._seed = seed
+
+    def _sleep(self):
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _rng(self, *keys) -> np.random.Generator:
+        # hash()는 문자열이 프로세스마다 다르게 해시되므로(PYTHONHASHSEED) 고정 다이제스트 사용
+        return np.random.default_rng(zlib.crc32(repr((self._seed,) + keys).encode("utf-8")))
+
+    def _day_frame(self, date: str, tickers: List[str]) -> pd.DataFrame:
+        rng = self._rng("day", date)
+        base = np.array([self._base_price[t] for t in tickers])
+        change = rng.normal(0, 2.0, size=len(tickers)).clip(-29.9, 29.9)
+        close = (base * (1 + change / 100)).round()
+        open_ = (close * (1 + rng.normal(0, 0.01, size=len(tickers)))).round()
+        high = np.maximum(open_, close) * 1.01
+        low = np.minimum(open_, close) * 0.99
+        volume = rng.integers(1_000, 20_000_000, size=len(tickers))
+        frame = pd.DataFrame({
+            "시가": open_.astype(np.int64),
+            "고가": high.round().astype(np.int64),
+            "저가": low.round().astype(np.int64),
+            "종가": close.astype(np.int64),
+            "거래량": volume.astype(np.int64),
+            "거래대금": (volume * close).astype(np.int64),
+            "등락률": change.round(2)
+        }, index=pd.Index(tickers, name="티커"))
+        return frame
+
+    @staticmethod
+    def _business_days(fromdate: str, todate: str) -> List[str]:
+        days = pd.bdate_range(datetime.strptime(fromdate, "%Y%m%d"), datetime.strptime(todate, "%Y%m%d"))
+        return [d.strftime("%Y%m%d") for d in days]
+
+    def get_market_ohlcv(self, fromdate: str, todate: Optional[str] = None, ticker: Optional[str] = None, market: str = "KOSPI", **kwargs) -> pd.DataFrame:
+        self._sleep()
+        if ticker is None and todate is not None and not str(todate).isdigit():
+            ticker, todate = todate, None
+        if ticker is None:
+            # 날짜 하나 + 시장 전체
+            if datetime.strptime(fromdate, "%Y%m%d").weekday() >= 5:
+                return pd.DataFrame(columns=OHLCV_COLUMNS)
+            tickers = [t for t in self.tickers if market == "ALL" or self.markets[t] == market]
+            return self._day_frame(fromdate, tickers)
+
+        # 종목 하나 + 기간
+        days = self._business_days(fromdate, todate or fromdate)
+        rows = [self._day_frame(day, [ticker]).iloc[0] for day in days] if ticker in self._base_price else []
+        frame = pd.DataFrame(rows, columns=OHLCV_COLUMNS)
+        frame.index = pd.DatetimeIndex(pd.to_datetime(days[:len(rows)]), name="날짜")
+        return frame
+
+    def get_market_cap(self, date: str, market: str = "ALL", **kwargs) -> pd.DataFrame:
+        self._sleep()
+        tickers = [t for t in self.tickers if market == "ALL" or self.markets[t] == market]
+        close = self._day_frame(date, tickers)["종가"]
+        shares = pd.Series([self._shares[t] for t in tickers], index=close.index)
+        return pd.DataFrame({
+            "종가": close,
+            "시가총액": close * shares,
+            "거래량": 0,
+            "거래대금": 0,
+            "상장주식수": shares
+        })
+
+    def get_index_ohlcv(self, fromdate: str, todate: str, ticker: str, freq: str = "d", **kwargs) -> pd.DataFrame:
+        self._sleep()
+        days = self._business_days(fromdate, todate)
+        rng = self._rng("index", ticker)
+        base = 2600.0 if ticker == "1001" else 850.0
+        close = base * np.cumprod(1 + rng.normal(0, 0.008, size=len(days)))
+        return pd.DataFrame({
+            "시가": close, "고가": close * 1.005, "저가": close * 0.995, "종가": close,
+            "거래량": 0, "거래대금": 0
+        }, index=pd.DatetimeIndex(pd.to_datetime(days), name="날짜"))
+
+    def get_market_ticker_list(self, date: Optional[str] = None, market: str = "KOSPI", **kwargs) -> List[str]:
+        self._sleep()
+        return [t for t in self.tickers if market == "ALL" or self.markets[t] == market]
+
+    def get_market_ticker_name(self, ticker: str) -> str:
+        return self.names.get(ticker, ticker)
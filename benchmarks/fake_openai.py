@@ -0,0 +1,114 @@
+"""
+OpenAI 호환 스텁 서버
+/v1/chat/completions를 흉내내어 설정한 지연 시간 후 고정 답변을 반환 (스트리밍 지원)
+분류 프롬프트에는 질문 키워드로 카테고리를 골라 "category: ...\nstock: ..." 형식으로 응답
+같은 system 프롬프트가 다시 오면 OpenAI 프롬프트 캐시처럼 usage.prompt_tokens_details.cached_tokens를 채워 응답
+"""
+from fastapi import FastAPI, Request
+from fastapi.responses import JSONResponse, StreamingResponse
+import asyncio
+import hashlib
+import json
+import random
+import time
+import uuid
+
+# 분류 프롬프트 판별용 문구 (chains/classifier.py 프롬프트의 일부)
+CLASSIFIER_MARKER = "투자 질문을 분류하는 전문가"
+
+ANSWER_TEXT = (
+    "[핵심 분석]\n현재 지표를 종합하면 시장은 중립적인 흐름입니다.\n\n"
+    "[긍정적 요인]\n- 금리 인하 기대\n\n[부정적 요인]\n- 환율 변동성 확대\n\n"
+    "[추천 투자 성향]\n중립적"
+)
+
+def _classify(question: str) -> str:
+    """질문 키워드로 분류 답변 생성 (실제 LLM 분류 결과 형식과 동일)"""
+    if "리포트" in question or "목표주가" in question:
+        return "category: analyst_report\nstock: 삼성전자"
+    if "주가" in question or "어때" in question:
+        stock = "SK하이닉스" if "하이닉스" in question else "삼성전자"
+        return f"category: stock_price\nstock: {stock}"
+    if "금리" in question or "시장" in question or "환율" in question:
+        return "category: economic_indicator\nstock: none"
+    return "category: general\nstock: none"
+
+def create_app(latency_ms: float = 800.0, jitter_ms: float = 200.0, tokens_per_second: float = 200.0) -> FastAPI:
+    """
+    스텁 앱 생성
+
+    Args:
+        latency_ms: 첫 토큰까지 기본 지연 (ms)
+        jitter_ms: 지연 시간 무작위 편차 (ms)
+        tokens_per_second: 스트리밍 시 토큰 생성 속도
+    """
+    app = FastAPI(title="Fake OpenAI")
+    seen_prefixes = set()
+
+    @app.post("/v1/chat/completions")
+    async def chat_completions(request: Request):
+        body = await request.json()
+        messages = body.get("messages", [])
+        prompt = "\n".join(str(m.get("content", "")) for m in messages)
+        system = "".join(str(m.get("content", "")) for m in messages if m.get("role") == "system")
+        user = "\n".join(str(m.get("content", "")) for m in messages if m.get("role") == "user") or prompt
+
+        if CLASSIFIER_MARKER in prompt:
+            # user 메시지의 "질문:" 줄이 실제 질문 (system의 few-shot 예시는 제외)
+            question = user.split("질문:", 1)[-1].split("\n", 1)[0]
+            content = _classify(question)
+        else:
+            content = ANSWER_TEXT
+
+        await asyncio.sleep(max(0.0, latency_ms + random.uniform(-jitter_ms, jitter_ms)) / 1000)
+
+        prompt_tokens = len(prompt) // 2
+        completion_tokens = len(content) // 2
+        # 두 번째 요청부터 같은 system 프롬프트 분량을 캐시 적중으로 보고
+        prefix_key = hashlib.sha1(system.encode("utf-8")).hexdigest()
+        cached_tokens = len(system) // 2 if system and prefix_key in seen_prefixes else 0
+        seen_prefixes.add(prefix_key)
+        completion_id = f"chatcmpl-{uuid.uuid4().hex[:12]}"
+        model = body.get("model", "gpt-4o-mini")
+
+        if body.get("stream"):
+            async def stream():
+                pieces = [content[i:i + 8] for i in range(0, len(content), 8)]
+                for piece in pieces:
+                    chunk = {
+                        "id": completion_id, "object": "chat.completion.chunk", "created": int(time.time()),
+                        "model": model,
+                        "choices": [{"index": 0, "delta": {"content": piece}, "finish_reason": None}]
+                    }
+                    yield f"data: {json.dumps(chunk, ensure_ascii=False)}\n\n"
+                    await asyncio.sleep(4 / tokens_per_second)
+                done = {
+                    "id": completion_id, "object": "chat.completion.chunk", "created": int(time.time()),
+                    "model": model,
+                    "choices": [{"index": 0, "delta": {}, "finish_reason": "stop"}]
+                }
+                yield f"data: {json.dumps(done)}\n\n"
+                yield "data: [DONE]\n\n"
+            return StreamingResponse(stream(), media_type="text/event-stream")
+
+        # 비스트리밍: 생성 시간까지 반영
+        await asyncio.sleep(completion_tokens / tokens_per_second)
+        return JSONResponse({
+            "id": completion_id,
+            "object": "chat.completion",
+            "created": int(time.time()),
+            "model": model,
+            "choices": [{
+                "index": 0,
+                "message": {"role": "assistant", "content": content},
+                "finish_reason": "stop"
+            }],
+            "usage": {
+                "prompt_tokens": prompt_tokens,
+                "completion_tokens": completion_tokens,
+                "total_tokens": prompt_tokens + completion_tokens,
+                "prompt_tokens_details": {"cached_tokens": cached_tokens}
+            }
+        })
+
+    return app
@@ -0,0 +1,52 @@
+"""
+Spring Boot 백엔드 스텁 서버
+경제지표(/api/indicators/latest, ETag 지원)와 종목 조회 API를 흉내냄
+"""
+from fastapi import FastAPI, Query, Request, Response
+import asyncio
+
+INDICATORS = {
+    "기준금리": "3.50%",
+    "M2 통화량": "3,900조원",
+    "원/달러 환율": "1,385.2원",
+    "소비자물가지수": "2.3%",
+    "GDP 성장률": "1.4%"
+}
+INDICATORS_ETAG = '"indicators-v1"'
+
+STOCKS = [
+    {"stockId": "005930", "stockName": "삼성전자"},
+    {"stockId": "000660", "stockName": "SK하이닉스"},
+    {"stockId": "035420", "stockName": "NAVER"},
+    {"stockId": "035720", "stockName": "카카오"},
+    {"stockId": "005380", "stockName": "현대차"},
+]
+
+def create_app(latency_ms: float = 20.0) -> FastAPI:
+    """
+    스텁 앱 생성
+
+    Args:
+        latency_ms: 모든 응답에 더할 지연 시간 (ms)
+    """
+    app = FastAPI(title="Fake Spring Backend")
+
+    @app.get("/api/indicators/latest")
+    async def indicators(request: Request, response: Response):
+        await asyncio.sleep(latency_ms / 1000)
+        if request.headers.get("if-none-match") == INDICATORS_ETAG:
+            return Response(status_code=304)
+        response.headers["ETag"] = INDICATORS_ETAG
+        return INDICATORS
+
+    @app.get("/api/stocks")
+    async def stocks():
+        await asyncio.sleep(latency_ms / 1000)
+        return STOCKS
+
+    @app.get("/api/stocks/search")
+    async def search(query: str = Query(...)):
+        await asyncio.sleep(latency_ms / 1000)
+        return [s for s in STOCKS if query in s["stockName"]]
+
+    return app
@@ -0,0 +1,37 @@
+"""
+로컬 벡터 인덱스
+Pinecone 대신 InMemoryVectorStore + 결정적 가짜 임베딩으로 리포트 검색을 흉내냄
+"""
+from langchain_core.documents import Document
+from langchain_core.embeddings import DeterministicFakeEmbedding
+from langchain_core.vectorstores import InMemoryVectorStore
+
+FIRMS = ["NH투자증권", "미래에셋증권", "KB증권", "삼성증권", "한국투자증권"]
+COMPANIES = ["삼성전자", "SK하이닉스", "NAVER", "카카오", "현대차"]
+
+def build_vectorstore(n_docs: int = 500, chunk_chars: int = 800) -> InMemoryVectorStore:
+    """
+    합성 리포트 청크로 채운 인메모리 벡터스토어 생성
+
+    Args:
+        n_docs: 청크 수
+        chunk_chars: 청크당 대략적인 글자 수
+    """
+    store = InMemoryVectorStore(embedding=DeterministicFakeEmbedding(size=1536))
+    docs = []
+    for i in range(n_docs):
+        firm = FIRMS[i % len(FIRMS)]
+        company = COMPANIES[i % len(COMPANIES)]
+        sentence = f"{firm}은 {company}의 목표주가를 유지하며 메모리 업황 개선을 전망했다. "
+        docs.append(Document(
+            page_content=(sentence * (chunk_chars // len(sentence) + 1))[:chunk_chars],
+            metadata={
+                "title": f"{firm}_{company}_2025{(i % 12) + 1:02d}15.pdf",
+                "securities_firm": firm,
+                "company": company,
+                "date": f"2025{(i % 12) + 1:02d}15",
+                "source": f"data/reports/{firm}_{company}.pdf"
+            }
+        ))
+    store.add_documents(docs)
+    return store
@@ -0,0 +1,205 @@
+"""
+오프라인 벤치마크 실행기
+외부 서비스(OpenAI, pykrx, Spring Boot, Pinecone)를 로컬 대체물로 바꾼 뒤
+/ai/query(카테고리별)와 시세 API에 부하를 걸어 처리량과 p50/p95/p99 지연 시간을 측정
+
+사용 예:
+    python -m benchmarks.run_benchmark --requests 200 --concurrency 20
+    python -m benchmarks.run_benchmark --llm-latency-ms 1500 --output results.json
+"""
+from typing import Any, Dict, List, Optional, Tuple
+import argparse
+import asyncio
+import json
+import os
+import socket
+import sys
+import threading
+import time
+
+import httpx
+import numpy as np
+import uvicorn
+
+# 프로젝트 루트를 import 경로에 추가 (python benchmarks/run_benchmark.py로 실행하는 경우)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from benchmarks import fake_openai, fake_spring
+from benchmarks.fake_market import FakeKrxStock
+from benchmarks.fake_vectorstore import build_vectorstore
+
+QUERY_SCENARIOS: Dict[str, List[str]] = {
+    "economic_indicator": ["지금 시장 상황 어때?", "금리가 주식에 미치는 영향은?", "환율 전망 알려줘"],
+    "stock_price": ["삼성전자 주가 어때?", "SK하이닉스 주가 알려줘", "삼성전자 지금 사도 돼? 주가 어때"],
+    "analyst_report": ["삼성전자 목표주가 리포트 알려줘", "증권사 리포트에서 SK하이닉스 전망은?"],
+    "general": ["ETF가 뭐야?", "분산 투자는 왜 해야 해?"],
+}
+
+def _free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+def _serve(app, port: int) -> uvicorn.Server:
+    """uvicorn 서버를 백그라운드 스레드에서 실행하고 기동 완료까지 대기"""
+    server = uvicorn.Server(uvicorn.Config(app, host="127.0.0.1", port=port, log_level="warning", lifespan="on"))
+    threading.Thread(target=server.run, name=f"uvicorn-{port}", daemon=True).start()
+    deadline = time.time() + 30
+    while not server.started:
+        if time.time() > deadline:
+            raise RuntimeError(f"서버 기동 실패 (port={port})")
+        time.sleep(0.05)
+    return server
+
+def _percentiles(latencies: List[float]) -> Dict[str, float]:
+    if not latencies:
+        return {"p50_ms": 0.0, "p95_ms": 0.0, "p99_ms": 0.0, "mean_ms": 0.0}
+    values = np.array(latencies) * 1000
+    p50, p95, p99 = np.percentile(values, [50, 95, 99])
+    return {
+        "p50_ms": round(float(p50), 1),
+        "p95_ms": round(float(p95), 1),
+        "p99_ms": round(float(p99), 1),
+        "mean_ms": round(float(values.mean()), 1)
+    }
+
+async def _run_scenario(
+    client: httpx.AsyncClient,
+    name: str,
+    requests: List[Tuple[str, str, Optional[Dict[str, Any]]]],
+    concurrency: int
+) -> Dict[str, Any]:
+    """
+    요청 목록을 동시성 제한 하에 실행하고 결과 집계
+
+    Args:
+        client: HTTP 클라이언트
+        name: 시나리오 이름
+        requests: (method, path, json body) 목록
+        concurrency: 동시 요청 수
+    """
+    semaphore = asyncio.Semaphore(concurrency)
+    latencies: List[float] = []
+    errors = 0
+
+    async def one(method: str, path: str, body: Optional[Dict[str, Any]]):
+        nonlocal errors
+        async with semaphore:
+            started = time.perf_counter()
+            try:
+                response = await client.request(method, path, json=body)
+                ok = response.status_code < 400
+            except httpx.HTTPError:
+                ok = False
+            if ok:
+                latencies.append(time.perf_counter() - started)
+            else:
+                errors += 1
+
+    started = time.perf_counter()
+    await asyncio.gather(*(one(*request) for request in requests))
+    elapsed = time.perf_counter() - started
+
+    result = {
+        "scenario": name,
+        "requests": len(requests),
+        "errors": errors,
+        "throughput_rps": round(len(latencies) / elapsed, 2) if elapsed else 0.0,
+        **_percentiles(latencies)
+    }
+    print(
+        f"{name:<32} n={result['requests']:<5} err={errors:<4} "
+        f"rps={result['throughput_rps']:<8} p50={result['p50_ms']}ms "
+        f"p95={result['p95_ms']}ms p99={result['p99_ms']}ms"
+    )
+    return result
+
+def _build_scenarios(n: int) -> Dict[str, List[Tuple[str, str, Optional[Dict[str, Any]]]]]:
+    scenarios: Dict[str, List[Tuple[str, str, Optional[Dict[str, Any]]]]] = {}
+    for category, questions in QUERY_SCENARIOS.items():
+        scenarios[f"/ai/query [{category}]"] = [
+            ("POST", "/ai/query", {"question": questions[i % len(questions)], "session_id": f"bench-{i}"})
+            for i in range(n)
+        ]
+    tickers = ["005930", "000660", "035420", "035720", "005380"]
+    scenarios["/ai/api/dashboard"] = [("GET", "/ai/api/dashboard", None)] * n
+    scenarios["/ai/api/stock-details"] = [("POST", "/ai/api/stock-details", {"tickers": tickers})] * n
+    scenarios["/ai/api/stock/{ticker}/chart"] = [
+        ("GET", f"/ai/api/stock/{tickers[i % len(tickers)]}/chart", None) for i in range(n)
+    ]
+    return scenarios
+
+def _install_fakes(args: argparse.Namespace, openai_port: int, spring_port: int):
+    """
+    main 모듈을 import하기 전에 환경 변수를, import한 뒤에는 데이터 소스를 대체물로 교체
+    """
+    os.environ["OPENAI_BASE_URL"] = f"http://127.0.0.1:{openai_port}/v1"
+    os.environ["BACKEND_URL"] = f"http://127.0.0.1:{spring_port}"
+    os.environ.setdefault("OPENAI_API_KEY", "sk-benchmark")
+    os.environ.setdefault("PINECONE_API_KEY", "pc-benchmark")
+    os.environ.setdefault("LOG_LEVEL", "WARNING")
+    if args.no_answer_cache:
+        os.environ["ANSWER_CACHE_TTL_SECONDS"] = "0"
+
+    import chains.briefing
+    import chains.rag_chain
+    import chains.stock_chain
+    import routers.market_data
+    import utils.stock_resolver
+    import utils.technicals
+
+    fake_stock = FakeKrxStock(n_tickers=args.tickers, latency_ms=args.krx_latency_ms)
+    for module in (chains.stock_chain, chains.briefing, routers.market_data, utils.stock_resolver, utils.technicals):
+        module.stock = fake_stock
+
+    vectorstore = build_vectorstore(n_docs=args.documents)
+    chains.rag_chain.get_vectorstore = lambda: vectorstore
+
+async def _main_async(args: argparse.Namespace, port: int) -> List[Dict[str, Any]]:
+    scenarios = _build_scenarios(args.requests)
+    selected = [name for name in scenarios if not args.only or any(key in name for key in args.only)]
+
+    results = []
+    async with httpx.AsyncClient(base_url=f"http://127.0.0.1:{port}", timeout=args.timeout) as client:
+        # 워밍업 (캐시/커넥션 준비)
+        for name in selected:
+            await _run_scenario(client, f"warmup {name}", scenarios[name][:args.concurrency], args.concurrency)
+        print("-" * 100)
+        for name in selected:
+            results.append(await _run_scenario(client, name, scenarios[name], args.concurrency))
+    return results
+
+def main():
+    parser = argparse.ArgumentParser(description="오프라인 벤치마크 (로컬 대체 서비스 사용)")
+    parser.add_argument("--requests", type=int, default=100, help="시나리오별 요청 수")
+    parser.add_argument("--concurrency", type=int, default=10, help="동시 요청 수")
+    parser.add_argument("--timeout", type=float, default=60.0, help="요청 타임아웃 (초)")
+    parser.add_argument("--llm-latency-ms", type=float, default=800.0, help="가짜 LLM 첫 토큰 지연 (ms)")
+    parser.add_argument("--llm-jitter-ms", type=float, default=200.0, help="가짜 LLM 지연 편차 (ms)")
+    parser.add_argument("--llm-tokens-per-second", type=float, default=200.0, help="가짜 LLM 생성 속도")
+    parser.add_argument("--krx-latency-ms", type=float, default=30.0, help="가짜 pykrx 호출 지연 (ms)")
+    parser.add_argument("--spring-latency-ms", type=float, default=20.0, help="가짜 Spring 응답 지연 (ms)")
+    parser.add_argument("--tickers", type=int, default=2500, help="가짜 시장 종목 수")
+    parser.add_argument("--documents", type=int, default=500, help="로컬 벡터 인덱스 문서 수")
+    parser.add_argument("--no-answer-cache", action="store_true", help="답변 캐시 비활성화")
+    parser.add_argument("--only", nargs="*", help="이름에 해당 문자열이 포함된 시나리오만 실행")
+    parser.add_argument("--output", help="결과 JSON 저장 경로")
+    args = parser.parse_args()
+
+    openai_port, spring_port, app_port = _free_port(), _free_port(), _free_port()
+    _serve(fake_openai.create_app(args.llm_latency_ms, args.llm_jitter_ms, args.llm_tokens_per_second), openai_port)
+    _serve(fake_spring.create_app(args.spring_latency_ms), spring_port)
+
+    _install_fakes(args, openai_port, spring_port)
+    from main import app
+    _serve(app, app_port)
+
+    results = asyncio.run(_main_async(args, app_port))
+
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump({"config": vars(args), "results": results}, f, ensure_ascii=False, indent=2)
+        print(f"결과 저장: {args.output}")
+
+if __name__ == "__main__":
+    main()
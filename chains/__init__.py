@@ -4,11 +4,14 @@ from .rag_chain import query_rag
 from .indicator_chain import query_economic_indicator
 from .stock_chain import query_stock_analysis
 from .general_chain import query_general_advice
+from .briefing import run_post_close_briefings, briefing_scheduler
 
 __all__ = [
     "classify_question",
     "query_rag",
     "query_economic_indicator",
     "query_stock_analysis",
-    "query_general_advice"
+    "query_general_advice",
+    "run_post_close_briefings",
+    "briefing_scheduler"
 ]
@@ -0,0 +1,195 @@
+"""
+장 마감 후 브리핑 생성 - 시가총액/질문 상위 종목과 시장(경제지표) 브리핑을 미리 만들어
+utils.briefing_store에 저장 (장중 질문은 query_stock_analysis/query_economic_indicator가 바로 제공)
+
+- 평일 settings.briefing_run_time(서버 현지 시각)에 한 번 실행, 서버가 그 이후에 켜지면 즉시 실행
+- 멀티 워커면 리더 워커만 생성 (공유 캐시로 모든 워커가 제공)
+- LLM 호출은 BACKGROUND 우선순위 → 사용자 질문이 항상 먼저 처리됨
+"""
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+import asyncio
+from utils.config import settings
+from utils.logger import logger
+from utils.answer_cache import stock_data_version
+from utils.briefing_store import briefing_store
+from utils.metrics import BRIEFINGS
+from utils.rate_limiter import LLMBackpressureError, Priority, llm_priority
+from utils.shared_cache import is_leader
+from utils.spring_client import spring_client
+from utils.technicals import get_technicals_many
+from utils.lazy import lazy_import
+from .stock_chain import (
+    analyze_sentiment,
+    generate_stock_analysis,
+    get_latest_trading_day,
+    get_stock_data_from_pykrx
+)
+from .indicator_chain import generate_indicator_analysis, indicator_version
+
+stock = lazy_import("pykrx.stock")
+
+# 브리핑 생성에 쓰는 대표 질문 (사용자의 일반 질문과 같은 의도)
+STOCK_QUESTION = "{name} 오늘 주가 어때?"
+MARKET_QUESTION = "현재 시장 상황은?"
+
+# 호출 한도에 걸리면 Retry-After만큼 쉬었다가 재시도하는 횟수
+MAX_ATTEMPTS = 3
+
+def _top_market_cap(n: int) -> List[str]:
+    """최근 거래일 시가총액 상위 n개 종목 코드"""
+    if n <= 0:
+        return []
+    try:
+        date_str = get_latest_trading_day().strftime("%Y%m%d")
+        df_cap = stock.get_market_cap(date_str, market="ALL")
+        return df_cap.sort_values(by='시가총액', ascending=False).head(n).index.tolist()
+    except Exception as e:
+        logger.error(f"브리핑 대상(시가총액 상위) 조회 실패: {e}")
+        return []
+
+async def _generate(kind: str, label: str, make) -> Optional[str]:
+    """호출 한도 초과 시 재시도하며 브리핑 생성 (실패하면 None - 장중에 기존처럼 생성됨)"""
+    for attempt in range(1, MAX_ATTEMPTS + 1):
+        try:
+            return await make()
+        except LLMBackpressureError as e:
+            if attempt == MAX_ATTEMPTS:
+                break
+            logger.debug(f"브리핑 호출 한도 대기 ({label}): {e.retry_after}초")
+            await asyncio.sleep(e.retry_after)
+        except Exception as e:
+            logger.error(f"브리핑 생성 실패 ({label}): {e}")
+            break
+    BRIEFINGS.labels(kind=kind, result="failed").inc()
+    return None
+
+async def _brief_stock(stock_code: str, technicals: Optional[Dict[str, Any]], semaphore: asyncio.Semaphore):
+    """종목 브리핑 생성 (이미 같은 시세 스냅샷의 브리핑이 있으면 건너뜀)"""
+    async with semaphore:
+        stock_data = await asyncio.to_thread(get_stock_data_from_pykrx, stock_code)
+        # 시뮬레이션(목업) 데이터는 브리핑하지 않음
+        if not stock_data or "(Simulation)" in stock_data["name"]:
+            BRIEFINGS.labels(kind="stock", result="no_data").inc()
+            return
+
+        version = stock_data_version(stock_data)
+        if briefing_store.peek("stock", version) is not None:
+            BRIEFINGS.labels(kind="stock", result="fresh").inc()
+            return
+
+        question = STOCK_QUESTION.format(name=stock_data["name"])
+        sentiment = analyze_sentiment(stock_data, technicals)
+        briefing = await _generate(
+            "stock", stock_code,
+            lambda: generate_stock_analysis(question, stock_data, sentiment, technicals=technicals)
+        )
+        if briefing:
+            briefing_store.put("stock", version, briefing)
+            BRIEFINGS.labels(kind="stock", result="generated").inc()
+
+async def _brief_market():
+    """경제지표 기반 시장 브리핑 생성"""
+    indicator_data = await spring_client.get_economic_indicators()
+    if not indicator_data:
+        BRIEFINGS.labels(kind="indicator", result="no_data").inc()
+        return
+
+    version = indicator_version(indicator_data)
+    if briefing_store.peek("indicator", version) is not None:
+        BRIEFINGS.labels(kind="indicator", result="fresh").inc()
+        return
+
+    briefing = await _generate(
+        "indicator", "market",
+        lambda: generate_indicator_analysis(MARKET_QUESTION, indicator_data)
+    )
+    if briefing:
+        briefing_store.put("indicator", version, briefing)
+        BRIEFINGS.labels(kind="indicator", result="generated").inc()
+
+async def run_post_close_briefings() -> int:
+    """
+    장 마감 후 브리핑 일괄 생성
+
+    Returns:
+        브리핑 대상 종목 수
+    """
+    start = datetime.now()
+    with llm_priority(Priority.BACKGROUND):
+        targets = await asyncio.to_thread(_top_market_cap, settings.briefing_top_market_cap)
+        # 시가총액 상위 + 오늘 질문이 많았던 종목 (순서 유지, 중복 제거)
+        targets = list(dict.fromkeys(targets + briefing_store.most_queried(settings.briefing_top_queried)))
+
+        # 대상 종목의 기술적 지표는 한 번에 계산
+        technicals = await asyncio.to_thread(get_technicals_many, targets)
+
+        semaphore = asyncio.Semaphore(max(settings.briefing_concurrency, 1))
+        await asyncio.gather(
+            _brief_market(),
+            *(_brief_stock(code, technicals.get(code), semaphore) for code in targets),
+            return_exceptions=True
+        )
+
+    briefing_store.mark_run(start.strftime("%Y%m%d"))
+    logger.info(f"📰 장 마감 후 브리핑 생성 완료: 종목 {len(targets)}개 + 시장 ({(datetime.now() - start).total_seconds():.1f}초)")
+    return len(targets)
+
+class BriefingScheduler:
+    """평일 장 마감 후 브리핑 생성 스케줄러"""
+
+    def __init__(self):
+        self._task: Optional[asyncio.Task] = None
+
+    @staticmethod
+    def _run_at(day: datetime) -> datetime:
+        hour, minute = (int(part) for part in settings.briefing_run_time.split(":"))
+        return day.replace(hour=hour, minute=minute, second=0, microsecond=0)
+
+    def next_run(self, now: Optional[datetime] = None) -> datetime:
+        """
+        다음 실행 시각 (오늘 실행 시각이 지났는데 아직 안 돌았으면 지금)
+
+        Args:
+            now: 기준 시각 (기본: 현재 서버 시각)
+        """
+        now = now or datetime.now()
+        run_at = self._run_at(now)
+        if now.weekday() < 5 and now >= run_at and briefing_store.last_run() != now.strftime("%Y%m%d"):
+            return now
+        day = now if now < run_at else now + timedelta(days=1)
+        while day.weekday() >= 5:
+            day += timedelta(days=1)
+        return self._run_at(day)
+
+    def start(self):
+        """스케줄러 시작 (서버 시작 시 호출)"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._loop())
+
+    async def _loop(self):
+        while True:
+            run_at = self.next_run()
+            delay = (run_at - datetime.now()).total_seconds()
+            if delay > 0:
+                logger.info(f"다음 장 마감 후 브리핑: {run_at:%Y-%m-%d %H:%M}")
+                await asyncio.sleep(delay)
+            # 다른 워커가 이미 생성했으면 건너뜀 (공유 캐시)
+            if not is_leader() or briefing_store.last_run() == datetime.now().strftime("%Y%m%d"):
+                await asyncio.sleep(settings.shared_follower_sync_seconds)
+                continue
+            try:
+                await run_post_close_briefings()
+            except asyncio.CancelledError:
+                raise
+            except Exception as e:
+                logger.error(f"장 마감 후 브리핑 실패: {e}", exc_info=True)
+                await asyncio.sleep(600)
+
+    def stop(self):
+        """스케줄러 중지"""
+        if self._task is not None:
+            self._task.cancel()
+
+# 전역 브리핑 스케줄러 인스턴스
+briefing_scheduler = BriefingScheduler()
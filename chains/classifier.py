@@ -2,39 +2,29 @@
 질문 분류 체인
 사용자 질문을 4가지 카테고리로 자동 분류 + 종목 코드 추출
 """
-from langchain_openai import ChatOpenAI
-from langchain.prompts import PromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 from utils.config import settings
 from utils.logger import logger
+from utils.llm import cacheable_prompt, get_llm
 from utils.spring_client import spring_client
+from utils.stock_resolver import stock_resolver
+from utils.metrics import record_cache, track_stage
+from utils.rate_limiter import LLMBackpressureError, ainvoke
+from utils.deadline import DeadlineExceeded, mark_degraded, within_deadline
 import re
 import asyncio
 import openai # 직접 예외 처리를 위해 추가
+from typing import Any, Dict, Optional
 
-async def classify_question(question: str) -> dict:
-    """
-    사용자 질문을 카테고리로 분류하고 필요 시 종목 코드 추출
-    
-    Args:
-        question: 사용자 질문
-    
-    Returns:
-        {"category": str, "stock_code": str (optional)}
-    """
-    logger.info(f"질문 분류 시작: {question}")
-    
-    # LLM 초기화 (temperature=0으로 일관된 분류)
-    llm = ChatOpenAI(
-        model=settings.openai_model,
-        temperature=0.0,
-        openai_api_key=settings.openai_api_key
-    )
-    
-    # ★ 분류 프롬프트: 카테고리 + 종목명 추출
-    prompt = PromptTemplate(
-        input_variables=["question"],
-        template="""
+# 앞 질문의 종목을 이어받는 후속 질문 표현 (예: "그럼 목표주가는?", "이 종목 전망은?")
+_FOLLOW_UP_MARKERS = re.compile(r"^(그럼|그러면|그리고|그건|그거|이\s?종목|그\s?종목|이\s?회사|그\s?회사|거기|여기)")
+_REPORT_KEYWORDS = ("리포트", "목표주가", "목표가", "의견", "전망", "증권사")
+_PRICE_KEYWORDS = ("주가", "시세", "얼마", "거래량", "등락", "올랐", "떨어")
+# 표현 없이도 짧으면 후속 질문으로 보는 최대 길이 (공백 제외 글자 수)
+_FOLLOW_UP_MAX_LENGTH = 12
+
+# ★ 분류 프롬프트: 고정 지침/예시(system) + 질문(user) - 앞부분이 매번 같아야 프롬프트 캐시 적중
+SYSTEM_PROMPT = """
 당신은 투자 질문을 분류하는 전문가입니다.
 사용자 질문을 아래 4가지 카테고리 중 **정확히 하나**로 분류하세요.
 
@@ -49,8 +39,6 @@ async def classify_question(question: str) -> dict:
 - 구체적인 기업명(삼성전자, 네이버 등)이 있는 질문 → stock_price 또는 analyst_report
 - 기업명 없이 "투자 방법", "전략" 등을 묻는 질문 → general
 
-질문: {question}
-
 답변 형식: 
 category: 카테고리명
 stock: 종목명 (stock_price 또는 analyst_report인 경우만, 없으면 none)
@@ -75,17 +63,84 @@ stock: none
 답변:
 category: general
 stock: none
+"""
+
+USER_TEMPLATE = """
+질문: {question}
 
 답변:
 """
-    )
+
+PROMPT = cacheable_prompt(SYSTEM_PROMPT, USER_TEMPLATE)
+
+def resolve_follow_up(question: str, session: Optional[Dict[str, Any]]) -> Optional[dict]:
+    """
+    이전 턴의 종목을 이어받는 후속 질문이면 LLM 분류/종목 조회 없이 분류 결과 생성
+
+    Args:
+        question: 사용자 질문
+        session: 세션 메모리 (utils.session_memory)
+
+    Returns:
+        {"category", "stock_code", "follow_up": True} 또는 None (후속 질문이 아님)
+    """
+    if not session or not session.get("stock_code"):
+        return None
+    q = question.replace(" ", "")
+    if stock_resolver.find_in_text(question)[1]:
+        return None  # 새 종목을 언급하면 새 질문
+    if not _FOLLOW_UP_MARKERS.match(question.strip()) and len(q) > _FOLLOW_UP_MAX_LENGTH:
+        return None
+
+    if any(keyword in q for keyword in _REPORT_KEYWORDS):
+        category = "analyst_report"
+    elif any(keyword in q for keyword in _PRICE_KEYWORDS):
+        category = "stock_price"
+    else:
+        return None  # 종목과 무관한 짧은 질문은 일반 분류로
+
+    logger.info(f"후속 질문 → 이전 종목 재사용: category={category}, stock={session['stock_code']}")
+    return {"category": category, "stock_code": session["stock_code"], "follow_up": True}
+
+async def classify_question(question: str, session: Optional[Dict[str, Any]] = None) -> dict:
+    """
+    사용자 질문을 카테고리로 분류하고 필요 시 종목 코드 추출
+    
+    Args:
+        question: 사용자 질문
+        session: 세션 메모리 (후속 질문이면 이전 종목을 재사용)
+    
+    Returns:
+        {"category": str, "stock_code": str (optional), "follow_up": bool (후속 질문일 때)}
+    """
+    logger.debug(f"질문 분류 시작: {question}")
+    
+    # ★ 후속 질문: 이전 턴의 종목 코드 재사용 (LLM 분류/종목 조회 생략)
+    follow_up = resolve_follow_up(question, session)
+    if follow_up:
+        record_cache("session_follow_up", True)
+        return follow_up
+    
+    # LLM 초기화 (temperature=0으로 일관된 분류)
+    llm = get_llm(temperature=0.0, chain="classifier")
     
     # 체인 구성
-    chain = prompt | llm | StrOutputParser()
+    chain = PROMPT | llm | StrOutputParser()
     
     # 실행
     try:
-        result = chain.invoke({"question": question}).strip()
+        # 답변 단계(LLM 1회)에 쓸 시간은 남겨둠
+        result = (await ainvoke(
+            chain, {"question": question}, "classifier",
+            cap=settings.deadline_classifier_seconds,
+            reserve=settings.deadline_llm_min_seconds + settings.deadline_reserve_seconds
+        )).strip()
+    except LLMBackpressureError:
+        raise  # 호출 한도 초과는 API에서 503으로 응답
+    except DeadlineExceeded:
+        # ★ 시간 예산 부족: 남은 시간은 답변 단계에 쓰고 분류는 규칙 기반으로
+        mark_degraded("classification")
+        return await rule_based_classification(question)
     except Exception as e:
         logger.error(f"분류 LLM 호출 실패 (RateLimit 등): {e}")
         logger.info("⚠️ Fallback: 규칙 기반(Rule-based) 분류기 작동")
@@ -103,6 +158,12 @@ stock: none
     if stock_name != "none":
         stock_code = await get_stock_code(stock_name)
     
+    # ★ 종목 질문인데 종목이 안 나오면 세션의 마지막 종목으로 보완
+    if not stock_code and category in ("stock_price", "analyst_report") and session and session.get("stock_code"):
+        stock_code = session["stock_code"]
+        logger.info(f"종목 미지정 → 세션의 이전 종목 사용: {stock_code}")
+        return {"category": category, "stock_code": stock_code, "follow_up": True}
+    
     result_dict = {
         "category": category,
         "stock_code": stock_code
@@ -113,7 +174,7 @@ stock: none
 
 async def get_stock_code(stock_name: str) -> str:
     """
-    종목명 → 종목 코드 변환 (Spring Boot DB 조회)
+    종목명 → 종목 코드 변환 (로컬 리졸버 우선, 없으면 Spring Boot DB 조회)
     
     Args:
         stock_name: 종목명
@@ -121,25 +182,25 @@ async def get_stock_code(stock_name: str) -> str:
     Returns:
         종목 코드 (6자리) 또는 None
     """
-    # ★ Spring Boot의 Stock 테이블 조회
-    stock_code = await spring_client.get_stock_code_from_name(stock_name)
+    # ★ 메모리에 적재된 종목 테이블 조회 (별칭/영문명/띄어쓰기 정규화 포함)
+    with track_stage("stock_code_resolution", "local"):
+        stock_code = stock_resolver.resolve(stock_name)
+    record_cache("stock_resolver", stock_code is not None)
     
     if stock_code:
         return stock_code
     
-    # ★ Fallback: 주요 종목 하드코딩 (DB 조회 실패 시)
-    stock_map = {
-        "삼성전자": "005930",
-        "네이버": "035420",
-        "현대차": "005380",
-        "SK하이닉스": "000660",
-        "카카오": "035720",
-        "LG에너지솔루션": "373220",
-        "삼성바이오로직스": "207940",
-        "POSCO홀딩스": "005490"
-    }
-    
-    return stock_map.get(stock_name, None)
+    # ★ Fallback: 리졸버에 없는 신규 종목은 Spring Boot의 Stock 테이블 조회
+    with track_stage("stock_code_resolution", "spring"):
+        try:
+            return await within_deadline(
+                spring_client.get_stock_code_from_name(stock_name),
+                "stock_code_resolution",
+                reserve=settings.deadline_llm_min_seconds
+            )
+        except DeadlineExceeded:
+            mark_degraded("stock_code_resolution")
+            return None
 
 async def rule_based_classification(question: str) -> dict:
     """
@@ -147,25 +208,9 @@ async def rule_based_classification(question: str) -> dict:
     """
     q = question.replace(" ", "")
     
-    # 1. 종목명 추출 (간단한 매핑)
-    stock_map = {
-        "삼성전자": "005930", "삼전": "005930",
-        "네이버": "035420", "NAVER": "035420",
-        "카카오": "035720",
-        "현대차": "005380",
-        "하이닉스": "000660", "SK하이닉스": "000660",
-        "LG엔솔": "373220", "LG에너지솔루션": "373220",
-        "포스코": "005490", "POSCO홀딩스": "005490", 
-        "삼성바이오": "207940", "로직스": "207940"
-    }
-    
-    stock_code = None
-    extracted_name = "none"
-    for name, code in stock_map.items():
-        if name in q:
-            stock_code = code
-            extracted_name = name
-            break
+    # 1. 종목명 추출 (로컬 리졸버에서 가장 긴 일치 종목명)
+    extracted_name, stock_code = stock_resolver.find_in_text(question)
+    extracted_name = extracted_name or "none"
             
     # 2. 카테고리 분류
     if stock_code:
@@ -184,4 +229,4 @@ async def rule_based_classification(question: str) -> dict:
     return {
         "category": category,
         "stock_code": stock_code
-    }
\ No newline at end of file
+    }
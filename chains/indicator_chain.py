@@ -1,49 +1,23 @@
 """
 경제지표 체인 - Spring Boot DB 데이터 조회 및 LLM 해석
 """
-from langchain_openai import ChatOpenAI
-from langchain.prompts import PromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 from utils.config import settings
 from utils.logger import logger
+from utils.llm import cacheable_prompt, get_llm
 from utils.spring_client import spring_client
+from utils.answer_cache import answer_cache, fingerprint
+from utils.briefing_store import briefing_store
+from utils.indicator_history import get_indicator_history
+from utils.metrics import track_stage
+from utils.rate_limiter import ainvoke
+from utils.deadline import DeadlineExceeded, mark_degraded, within_deadline
+from typing import Any, Dict
 
-async def query_economic_indicator(question: str):
-    """
-    경제지표 데이터를 기반으로 질문에 답변 (비동기)
-    
-    Args:
-        question: 사용자 질문
-    
-    Returns:
-        답변 문자열
-    """
-    logger.info(f"경제지표 질의: {question}")
-    
-    # ★ Spring Boot에서 MariaDB 경제지표 데이터 조회
-    indicator_data = await spring_client.get_economic_indicators()
-    
-    if not indicator_data:
-        return "죄송합니다. 경제지표 데이터를 조회할 수 없습니다."
-    
-    # LLM 초기화
-    llm = ChatOpenAI(
-        model=settings.openai_model,
-        temperature=0.4,
-        openai_api_key=settings.openai_api_key
-    )
-    
-    # ★ 프롬프트: 경제지표 데이터를 컨텍스트로 제공
-    prompt = PromptTemplate(
-        input_variables=["question", "indicators"],
-        template="""
+# ★ 프롬프트: 고정 지침/답변 형식(system) + 경제지표·질문(user) - 앞부분이 매번 같아야 프롬프트 캐시 적중
+SYSTEM_PROMPT = """
 당신은 경제 전문가입니다.
-아래 경제지표 데이터를 기반으로 질문에 답변하세요.
-
-현재 경제지표:
-{indicators}
-
-질문: {question}
+사용자가 제공하는 현재 경제지표 데이터를 기반으로 질문에 답변하세요.
 
 답변 지침:
 1. **질문 의도를 정확히 파악하세요:**
@@ -79,19 +53,105 @@ async def query_economic_indicator(question: str):
 (공격적/중립적/안정적 중 택 1)
 **[/답변 형식]**
 """
-    )
+
+USER_TEMPLATE = """
+현재 경제지표:
+{indicators}
+
+{history}질문: {question}
+"""
+
+PROMPT = cacheable_prompt(SYSTEM_PROMPT, USER_TEMPLATE)
+
+def format_indicators(indicator_data: Dict[str, Any]) -> str:
+    """경제지표를 "- 이름: 값 (30일/1년 변화, 추세)" 목록 문자열로 변환 (utils.indicator_history)"""
+    try:
+        return get_indicator_history().digest(indicator_data)
+    except Exception as e:
+        # 이력 저장소를 열 수 없으면 추세 없이 값만
+        logger.error(f"경제지표 이력 사용 불가: {e}")
+        return "\n".join([f"- {k}: {v}" for k, v in indicator_data.items()])
+
+def indicator_version(indicator_data: Dict[str, Any]) -> str:
+    """답변 캐시/브리핑용 데이터 버전 (지표 값과 추세 요약이 같으면 같은 버전)"""
+    return fingerprint(format_indicators(indicator_data))
+
+async def generate_indicator_analysis(question: str, indicator_data: Dict[str, Any], history: str = "") -> str:
+    """
+    경제지표로 LLM 해석 생성 (실패 시 예외 그대로 전달 - 대체 답변은 호출 측 처리)
+    
+    Args:
+        question: 사용자 질문
+        indicator_data: 경제지표 데이터
+        history: 이전 대화 블록
+    
+    Returns:
+        답변 문자열
+    """
+    # LLM 초기화
+    llm = get_llm(temperature=0.4, chain="indicator")
     
     # 체인 구성
-    chain = prompt | llm | StrOutputParser()
+    chain = PROMPT | llm | StrOutputParser()
     
-    # ★ 경제지표를 문자열로 변환
-    indicators_str = "\n".join([f"- {k}: {v}" for k, v in indicator_data.items()])
+    return await ainvoke(chain, {
+        "question": question,
+        "indicators": format_indicators(indicator_data),
+        "history": history
+    }, "indicator")
+
+async def query_economic_indicator(question: str, history: str = ""):
+    """
+    경제지표 데이터를 기반으로 질문에 답변 (비동기)
+    
+    Args:
+        question: 사용자 질문
+        history: 이전 대화 블록 (후속 질문일 때, utils.session_memory)
+    
+    Returns:
+        답변 문자열
+    """
+    logger.debug(f"경제지표 질의: {question}")
+    
+    # ★ Spring Boot에서 MariaDB 경제지표 데이터 조회
+    with track_stage("indicator_fetch", "spring"):
+        try:
+            indicator_data = await within_deadline(
+                spring_client.get_economic_indicators(),
+                "indicator_fetch",
+                reserve=settings.deadline_reserve_seconds
+            )
+        except DeadlineExceeded:
+            mark_degraded("indicator_fetch")
+            indicator_data = None
+    
+    if not indicator_data:
+        return "죄송합니다. 경제지표 데이터를 조회할 수 없습니다."
+    
+    # ★ 장 마감 후 미리 만든 시장 브리핑: "시장 상황은?" 같은 일반 질문이고 지표가 같으면 바로 제공
+    version = indicator_version(indicator_data)
+    if not history:
+        briefing = briefing_store.get("indicator", version, question)
+        if briefing:
+            return briefing
+    
+    # ★ 같은 지표 데이터 + 같은 질문 의도면 캐시된 답변 재사용
+    # (이전 대화를 반영하는 후속 질문은 캐시하지 않음)
+    cache_key = answer_cache.make_key("indicator", version, question) if not history else None
+    cached_answer = answer_cache.get(cache_key) if cache_key else None
+    if cached_answer:
+        return cached_answer
     
     # 실행
-    answer = chain.invoke({
-        "question": question,
-        "indicators": indicators_str
-    })
+    try:
+        answer = await generate_indicator_analysis(question, indicator_data, history)
+    except DeadlineExceeded:
+        # ★ 시간 예산 부족: AI 해석 없이 조회한 지표표만 제공
+        mark_degraded("llm.indicator")
+        return f"[현재 경제지표]\n{format_indicators(indicator_data)}\n\n(응답 시간 제한으로 AI 해석 없이 지표 데이터만 제공합니다.)"
+    
+    if cache_key:
+        answer_cache.set(cache_key, answer)
     
     logger.info("경제지표 답변 생성 완료")
     return answer
\ No newline at end of file
@@ -1,47 +1,23 @@
 """
 RAG 체인 - 증권사 리포트 검색 및 답변 생성 (타입 안정성 강화)
 """
-from langchain.chains import RetrievalQA
-from langchain_openai import ChatOpenAI
-from langchain.prompts import PromptTemplate
+from langchain_core.output_parsers import StrOutputParser
+from langchain_core.runnables import Runnable
 from utils.config import settings
 from utils.db_client import get_vectorstore
+from utils.context_builder import build_context
+from utils.tokenizer import count_tokens
 from utils.logger import logger
+from utils.llm import cacheable_prompt, get_llm, get_model
+from utils.metrics import track_stage
+from utils.rate_limiter import LLMBackpressureError, ainvoke
+from utils.deadline import DeadlineExceeded, mark_degraded, within_deadline
 from typing import Dict, Any, List
 
-def create_rag_chain(collection_name: str = "analyst_reports") -> RetrievalQA:
-    """
-    RAG 체인 생성
-    
-    Args:
-        collection_name: ChromaDB 컬렉션 이름
-    
-    Returns:
-        RetrievalQA 체인
-    """
-    logger.info("RAG 체인 생성 시작")
-    
-    llm = ChatOpenAI(
-        model=settings.openai_model,
-        temperature=0.3,
-        openai_api_key=settings.openai_api_key
-    )
-    
-    vectorstore = get_vectorstore(collection_name=collection_name)
-    
-    retriever = vectorstore.as_retriever(
-        search_type="similarity",
-        search_kwargs={"k": 3}
-    )
-    
-    prompt_template = """
+# ★ 프롬프트: 고정 지침(system) + 참고 문서·질문(user) - 앞부분이 매번 같아야 프롬프트 캐시 적중
+SYSTEM_PROMPT = """
 당신은 전문 투자 상담가입니다.
-아래 증권사 리포트를 참고하여 질문에 답변하세요.
-
-참고 문서:
-{context}
-
-질문: {question}
+사용자가 제공하는 증권사 리포트를 참고하여 질문에 답변하세요.
 
 답변 지침:
 1. 참고 문서의 내용을 기반으로 정확히 답변하세요
@@ -49,69 +25,145 @@ def create_rag_chain(collection_name: str = "analyst_reports") -> RetrievalQA:
 3. 초보 투자자도 이해할 수 있도록 쉽게 설명하세요
 4. 확실하지 않은 내용은 추측하지 마세요
 5. 여러 증권사의 의견이 다르면 모두 소개하세요
+"""
+
+USER_TEMPLATE = """
+참고 문서:
+{context}
+
+{history}질문: {question}
 
 답변:
 """
-    
-    prompt = PromptTemplate(
-        input_variables=["context", "question"],
-        template=prompt_template
-    )
-    
-    qa_chain = RetrievalQA.from_chain_type(
-        llm=llm,
-        chain_type="stuff",
-        retriever=retriever,
-        return_source_documents=True,
-        chain_type_kwargs={"prompt": prompt}
+
+def format_sources(docs) -> List[Dict[str, str]]:
+    """답변에 첨부할 출처 목록 (리포트 메타데이터 + 본문 앞부분)"""
+    return [
+        {
+            "title": doc.metadata.get("title", "Unknown"),
+            "securities_firm": doc.metadata.get("securities_firm", "Unknown"),
+            "date": doc.metadata.get("date", "Unknown"),
+            "content": doc.page_content[:200]
+        }
+        for doc in docs
+    ]
+
+def snippets_answer(sources: List[Dict[str, str]]) -> str:
+    """LLM 답변 없이 검색된 리포트 발췌만으로 만든 답변 (시간 예산 부족 시)"""
+    lines = ["응답 시간 안에 AI 요약을 마치지 못해, 검색된 증권사 리포트 발췌를 먼저 전달드립니다.", ""]
+    for source in sources:
+        lines.append(f"■ {source['securities_firm']} - {source['title']} ({source['date']})")
+        lines.append(f"  {source['content']}")
+    return "\n".join(lines)
+
+def get_retriever(collection_name: str = "analyst_reports"):
+    """
+    Pinecone 리트리버 생성
+
+    Args:
+        collection_name: 컬렉션 이름 (Pinecone은 단일 Index 사용)
+
+    Returns:
+        VectorStoreRetriever
+    """
+    vectorstore = get_vectorstore()
+
+    return vectorstore.as_retriever(
+        search_type="similarity",
+        search_kwargs={"k": settings.rag_top_k}
     )
-    
+
+def create_rag_chain() -> Runnable:
+    """
+    RAG 답변 체인 생성 (컨텍스트는 build_context로 미리 조립)
+
+    Returns:
+        prompt | llm | parser 체인
+    """
+    logger.info("RAG 체인 생성 시작")
+
+    llm = get_llm(temperature=0.3, chain="rag")
+
     logger.info("RAG 체인 생성 완료")
-    return qa_chain
+    return cacheable_prompt(SYSTEM_PROMPT, USER_TEMPLATE) | llm | StrOutputParser()
 
-def query_rag(question: str, collection_name: str = "analyst_reports") -> Dict[str, Any]:
+async def query_rag(
+    question: str,
+    collection_name: str = "analyst_reports",
+    category: str = "analyst_report",
+    history: str = ""
+) -> Dict[str, Any]:
     """
-    RAG 체인 실행 (타입 안정성 강화)
-    
+    RAG 체인 실행 (타입 안정성 강화, 비동기)
+
     Args:
         question: 사용자 질문
         collection_name: 컬렉션 이름
-    
+        category: 질문 카테고리 (컨텍스트 토큰 예산 선택용)
+        history: 이전 대화 블록 (후속 질문일 때, utils.session_memory)
+
     Returns:
         {
             "answer": str,
-            "sources": List[Dict[str, str]]
+            "sources": List[Dict[str, str]],
+            "prompt_tokens": int
         }
     """
-    logger.info(f"RAG 질의 시작: {question}")
-    
+    logger.debug(f"RAG 질의 시작: {question}")
+
     try:
-        qa_chain = create_rag_chain(collection_name)
-        
-        result = qa_chain({"query": question})
-        
-        answer: str = result["result"]
-        source_docs = result["source_documents"]
-        
-        sources: List[Dict[str, str]] = []
-        for doc in source_docs:
-            sources.append({
-                "title": doc.metadata.get("title", "Unknown"),
-                "securities_firm": doc.metadata.get("securities_firm", "Unknown"),
-                "date": doc.metadata.get("date", "Unknown"),
-                "content": doc.page_content[:200]
-            })
-        
+        retriever = get_retriever(collection_name)
+        with track_stage("retrieval", "pinecone"):
+            source_docs = await within_deadline(
+                retriever.ainvoke(question),
+                "retrieval",
+                reserve=settings.deadline_reserve_seconds
+            )
+
+        # ★ 중복 제거 + 토큰 예산 적용
+        context, used_docs, _ = build_context(source_docs, category=category, model=get_model("rag"))
+
+        prompt_tokens = count_tokens(
+            SYSTEM_PROMPT + USER_TEMPLATE.format(context=context, question=question, history=history),
+            get_model("rag")
+        )
+        logger.info(f"RAG 프롬프트 토큰: {prompt_tokens}")
+
+        sources = format_sources(used_docs)
+
+        qa_chain = create_rag_chain()
+        try:
+            answer: str = await ainvoke(
+                qa_chain,
+                {"context": context, "question": question, "history": history},
+                "rag"
+            )
+        except DeadlineExceeded:
+            # ★ 시간 예산 부족: 검색된 리포트 발췌로 대체
+            mark_degraded("llm.rag")
+            answer = snippets_answer(sources)
+
         logger.info(f"RAG 답변 생성 완료: {len(answer)}자, 출처 {len(sources)}개")
-        
+
         return {
             "answer": answer,
-            "sources": sources
+            "sources": sources,
+            "prompt_tokens": prompt_tokens
+        }
+
+    except LLMBackpressureError:
+        raise  # 호출 한도 초과는 API에서 503으로 응답
+    except DeadlineExceeded as e:
+        mark_degraded(e.stage)
+        return {
+            "answer": "죄송합니다. 응답 시간 안에 증권사 리포트 검색을 마치지 못했습니다. 잠시 후 다시 시도해 주세요.",
+            "sources": [],
+            "prompt_tokens": 0
         }
-    
     except Exception as e:
         logger.error(f"RAG 체인 실행 실패: {e}", exc_info=True)
         return {
             "answer": f"증권사 리포트 검색 중 오류가 발생했습니다: {str(e)}",
-            "sources": []
-        }
\ No newline at end of file
+            "sources": [],
+            "prompt_tokens": 0
+        }
@@ -1,15 +1,53 @@
 """
 주가 분석 체인 - pykrx API 데이터 조회 및 LLM 감성 분석
 """
-from langchain_openai import ChatOpenAI
-from langchain.prompts import PromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 from utils.config import settings
 from utils.logger import logger
-from pykrx import stock
+from utils.llm import cacheable_prompt, get_llm
+from utils.answer_cache import answer_cache, stock_data_version
+from utils.briefing_store import briefing_store
+from utils.metrics import track_stage
+from utils.rate_limiter import LLMBackpressureError, ainvoke
+from utils.deadline import DeadlineExceeded, mark_degraded, within_deadline
+from utils.technicals import digest, get_technicals
+from utils.lazy import lazy_import
 from datetime import datetime, timedelta
 from typing import Dict, Any, Optional
-import yfinance as yf # Fallback data source
+import asyncio
+
+stock = lazy_import("pykrx.stock")
+yf = lazy_import("yfinance") # Fallback data source
+
+# ★ 프롬프트: 고정 지침(system) + 주가 데이터·감성·질문(user) - 앞부분이 매번 같아야 프롬프트 캐시 적중
+SYSTEM_PROMPT = """
+당신은 주식 애널리스트입니다.
+사용자가 제공하는 주가 데이터와 시장 감성 분석을 기반으로 질문에 답변하세요.
+
+답변 지침:
+1. 현재 주가와 변동률을 명확히 설명하세요
+2. 제공된 시장 감성을 반영하여 분석하세요
+   - 긍정: 상승 모멘텀, 투자 심리 호전 강조
+   - 부정: 하락 압력, 리스크 요인 강조
+   - 중립: 균형잡힌 시각 제시
+3. 거래량과 가격 범위를 고려한 시장 동향을 분석하세요
+4. 투자 시 주의사항을 언급하세요
+5. 구체적인 매수/매도 추천은 하지 마세요
+6. 한국어로 자연스럽게 답변하세요
+"""
+
+USER_TEMPLATE = """
+주가 데이터:
+{stock_data}
+
+시장 감성: {sentiment}
+
+{history}질문: {question}
+
+답변:
+"""
+
+PROMPT = cacheable_prompt(SYSTEM_PROMPT, USER_TEMPLATE)
 
 def get_latest_trading_day() -> datetime:
     """
@@ -109,7 +147,8 @@ def get_stock_data_from_pykrx(stock_code: str) -> Dict[str, Any]:
     except Exception as e:
         logger.error(f"pykrx 주가 조회 실패 ({stock_code}): {e}")
         logger.info(f"⚠️ Fallback: {stock_code}에 대해 yfinance 시도")
-        return get_stock_data_from_yfinance(stock_code)
+        with track_stage("market_data", "yfinance"):
+            return get_stock_data_from_yfinance(stock_code)
 
 def get_stock_data_from_yfinance(stock_code: str) -> Dict[str, Any]:
     """yfinance를 통한 주가 조회 Fallback"""
@@ -164,12 +203,33 @@ def get_stock_data_from_yfinance(stock_code: str) -> Dict[str, Any]:
         "date": datetime.now().strftime("%Y%m%d")
     }
 
-def analyze_sentiment(stock_data: Dict[str, Any]) -> str:
+async def get_technicals_within_deadline(stock_code: str) -> Optional[Dict[str, Any]]:
+    """
+    기술적 지표 조회 (LLM 호출 시간을 남기고, 시간이 부족하거나 실패하면 None)
+    
+    Args:
+        stock_code: 종목 코드
+    """
+    with track_stage("technicals", "pykrx"):
+        try:
+            return await within_deadline(
+                asyncio.to_thread(get_technicals, stock_code),
+                "technicals",
+                reserve=settings.deadline_llm_min_seconds + settings.deadline_reserve_seconds
+            )
+        except DeadlineExceeded:
+            mark_degraded("technicals")
+        except Exception as e:
+            logger.error(f"기술적 지표 계산 실패: {e}")
+    return None
+
+def analyze_sentiment(stock_data: Dict[str, Any], technicals: Optional[Dict[str, Any]] = None) -> str:
     """
-    주가 데이터 기반 감성 분석 (긍정/중립/부정)
+    주가 데이터 + 기술적 지표 기반 감성 분석 (긍정/중립/부정)
     
     Args:
         stock_data: 주가 데이터
+        technicals: 기술적 지표 (utils.technicals, 없으면 당일 등락률만 사용)
     
     Returns:
         "긍정", "중립", "부정" 중 하나
@@ -179,76 +239,83 @@ def analyze_sentiment(stock_data: Dict[str, Any]) -> str:
     
     change_pct = stock_data.get("change_pct", 0)
     
-    # 간단한 규칙 기반 감성 분석
+    # 간단한 규칙 기반 점수: 당일 등락률(±3% 이상 ±2, ±1% 이상 ±1)
+    score = 0
     if change_pct >= 3.0:
-        return "긍정"
+        score += 2
     elif change_pct <= -3.0:
+        score -= 2
+    elif change_pct >= 1.0:
+        score += 1
+    elif change_pct <= -1.0:
+        score -= 1
+    
+    # ★ 기술적 지표: 이동평균 배열 방향 + 거래량이 크게 실린 당일 움직임
+    if technicals:
+        if technicals.get("trend") == "정배열":
+            score += 1
+        elif technicals.get("trend") == "역배열":
+            score -= 1
+        if (technicals.get("volume_z") or 0) >= 2.0 and change_pct:
+            score += 1 if change_pct > 0 else -1
+    
+    if score >= 2:
+        return "긍정"
+    elif score <= -2:
         return "부정"
     else:
         return "중립"
 
-def query_stock_analysis(question: str, stock_code: str) -> str:
+def data_only_answer(stock_data: Dict[str, Any], sentiment: str, headline: str, notice: str) -> str:
+    """
+    LLM 분석 없이 조회한 시세만으로 만든 답변 (LLM 실패/시간 초과 시)
+
+    Args:
+        stock_data: 주가 데이터
+        sentiment: 감성 분석 결과
+        headline: 첫 안내 문장
+        notice: 마지막 괄호 안내 문구
+    """
+    return f"""
+[시장 감성: {sentiment}]
+
+{headline}
+
+■ {stock_data['name']} ({stock_data['ticker']})
+- 현재가: {stock_data['price']:,}원
+- 전일대비: {stock_data['change_pct']}%
+- 거래량: {stock_data['volume']:,}주
+
+({notice})
+"""
+
+async def generate_stock_analysis(
+    question: str,
+    stock_data: Dict[str, Any],
+    sentiment: str,
+    history: str = "",
+    technicals: Optional[Dict[str, Any]] = None
+) -> str:
     """
-    주가 데이터를 기반으로 질문에 답변 (감성 분석 포함)
+    주가 데이터 + 감성 분석으로 LLM 답변 생성 (실패 시 예외 그대로 전달 - 대체 답변은 호출 측 처리)
     
     Args:
         question: 사용자 질문
-        stock_code: 종목 코드
+        stock_data: 주가 데이터
+        sentiment: 감성 분석 결과
+        history: 이전 대화 블록
+        technicals: 기술적 지표 (있으면 요약을 주가 데이터 뒤에 추가)
     
     Returns:
-        답변 문자열
+        "[시장 감성: ...]" 머리말이 붙은 답변
     """
-    logger.info(f"주가 분석 질의: {question}, 종목: {stock_code}")
-    
-    # ★ 1. pykrx에서 주가 데이터 조회
-    stock_data = get_stock_data_from_pykrx(stock_code)
-    
-    if not stock_data:
-        return f"죄송합니다. 종목 코드 '{stock_code}'의 주가 데이터를 조회할 수 없습니다. 종목 코드를 확인해 주세요."
-    
-    # ★ 2. 감성 분석
-    sentiment = analyze_sentiment(stock_data)
-    
     # LLM 초기화
-    llm = ChatOpenAI(
-        model=settings.openai_model,
-        temperature=0.3,
-        openai_api_key=settings.openai_api_key
-    )
-    
-    # ★ 3. 감성 분석을 포함한 프롬프트
-    prompt = PromptTemplate(
-        input_variables=["question", "stock_data", "sentiment"],
-        template="""
-당신은 주식 애널리스트입니다.
-아래 주가 데이터와 시장 감성 분석을 기반으로 질문에 답변하세요.
-
-주가 데이터:
-{stock_data}
-
-시장 감성: {sentiment}
-
-질문: {question}
-
-답변 지침:
-1. 현재 주가와 변동률을 명확히 설명하세요
-2. 시장 감성({sentiment})을 반영하여 분석하세요
-   - 긍정: 상승 모멘텀, 투자 심리 호전 강조
-   - 부정: 하락 압력, 리스크 요인 강조
-   - 중립: 균형잡힌 시각 제시
-3. 거래량과 가격 범위를 고려한 시장 동향을 분석하세요
-4. 투자 시 주의사항을 언급하세요
-5. 구체적인 매수/매도 추천은 하지 마세요
-6. 한국어로 자연스럽게 답변하세요
-
-답변:
-"""
-    )
+    llm = get_llm(temperature=0.3, chain="stock")
     
     # 체인 구성
-    chain = prompt | llm | StrOutputParser()
+    chain = PROMPT | llm | StrOutputParser()
     
-    # ★ 4. 주가 데이터를 문자열로 변환
+    # ★ 주가 데이터를 문자열로 변환
     stock_str = f"""
 종목명: {stock_data['name']}
 종목코드: {stock_data['ticker']}
@@ -260,34 +327,95 @@ def query_stock_analysis(question: str, stock_code: str) -> str:
 거래량: {stock_data['volume']:,}주
 기준일: {stock_data['date']}
 """
+    technicals_str = digest(technicals)
+    if technicals_str:
+        stock_str += f"\n기술적 지표:\n{technicals_str}\n"
+    
+    answer = await ainvoke(chain, {
+        "question": question,
+        "stock_data": stock_str,
+        "sentiment": sentiment,
+        "history": history
+    }, "stock")
+    
+    # ★ 답변에 감성 분석 결과 추가
+    return f"[시장 감성: {sentiment}]\n\n{answer}"
+
+async def query_stock_analysis(question: str, stock_code: str, history: str = "") -> str:
+    """
+    주가 데이터를 기반으로 질문에 답변 (감성 분석 포함, 비동기)
+    
+    Args:
+        question: 사용자 질문
+        stock_code: 종목 코드
+        history: 이전 대화 블록 (후속 질문일 때, utils.session_memory)
+    
+    Returns:
+        답변 문자열
+    """
+    logger.debug(f"주가 분석 질의: {question}, 종목: {stock_code}")
+    briefing_store.record_query(stock_code)
+    
+    # ★ 1. pykrx에서 주가 데이터 조회
+    with track_stage("market_data", "pykrx"):
+        try:
+            stock_data = await within_deadline(
+                asyncio.to_thread(get_stock_data_from_pykrx, stock_code),
+                "market_data",
+                reserve=settings.deadline_reserve_seconds
+            )
+        except DeadlineExceeded:
+            mark_degraded("market_data")
+            return f"죄송합니다. 종목 코드 '{stock_code}'의 시세 조회가 지연되고 있습니다. 잠시 후 다시 시도해 주세요."
+    
+    if not stock_data:
+        return f"죄송합니다. 종목 코드 '{stock_code}'의 주가 데이터를 조회할 수 없습니다. 종목 코드를 확인해 주세요."
+    
+    # ★ 장 마감 후 미리 만든 브리핑: "오늘 어때?" 같은 일반 질문이고 시세 스냅샷이 같으면 바로 제공
+    version = stock_data_version(stock_data)
+    if not history:
+        briefing = briefing_store.get("stock", version, question, subject=stock_data["name"])
+        if briefing:
+            return briefing
+    
+    # ★ 같은 종목·거래일·시세 스냅샷 + 같은 질문 의도면 캐시된 답변 재사용
+    # (이전 대화를 반영하는 후속 질문은 캐시하지 않음)
+    cache_key = answer_cache.make_key("stock", version, question) if not history else None
+    cached_answer = answer_cache.get(cache_key) if cache_key else None
+    if cached_answer:
+        return cached_answer
+    
+    # ★ 2. 기술적 지표 + 감성 분석 (지표는 시간이 부족하거나 실패하면 생략)
+    # 이력 조회는 브리핑/답변 캐시를 못 찾았을 때만 (캐시 적중 시 pykrx 호출 없음)
+    technicals = await get_technicals_within_deadline(stock_code)
+    sentiment = analyze_sentiment(stock_data, technicals)
     
     # 실행
     try:
-        answer = chain.invoke({
-            "question": question,
-            "stock_data": stock_str,
-            "sentiment": sentiment
-        })
+        final_answer = await generate_stock_analysis(question, stock_data, sentiment, history, technicals)
         
-        # ★ 5. 답변에 감성 분석 결과 추가
-        final_answer = f"[시장 감성: {sentiment}]\n\n{answer}"
+        # 시뮬레이션(목업) 데이터 기반 답변은 캐시하지 않음
+        if cache_key and "(Simulation)" not in stock_data["name"]:
+            answer_cache.set(cache_key, final_answer)
         
         logger.info(f"주가 분석 답변 생성 완료 (감성: {sentiment})")
         return final_answer
         
+    except LLMBackpressureError:
+        raise  # 호출 한도 초과는 API에서 503으로 응답
+    except DeadlineExceeded:
+        # ★ 시간 예산 부족: 조회한 시세만 제공
+        mark_degraded("llm.stock")
+        return data_only_answer(
+            stock_data, sentiment,
+            "응답 시간 안에 AI 분석을 마치지 못했지만, 데이터는 조회했습니다.",
+            "응답 시간 제한으로 단순 데이터만 제공합니다."
+        )
     except Exception as e:
         logger.error(f"주가 분석 LLM 호출 실패: {e}")
         # LLM 실패 시(429 등)에도 데이터는 보여줌
-        fallback_answer = f"""
-[시장 감성: {sentiment}]
-
-죄송합니다. 현재 AI 분석량이 많아 상세 분석은 어렵지만, 데이터는 조회했습니다.
-
-■ {stock_data['name']} ({stock_data['ticker']})
-- 현재가: {stock_data['price']:,}원
-- 전일대비: {stock_data['change_pct']}%
-- 거래량: {stock_data['volume']:,}주
-
-(AI 분석 서버가 혼잡하여 단순 데이터만 제공합니다.)
-"""
-        return fallback_answer
\ No newline at end of file
+        return data_only_answer(
+            stock_data, sentiment,
+            "죄송합니다. 현재 AI 분석량이 많아 상세 분석은 어렵지만, 데이터는 조회했습니다.",
+            "AI 분석 서버가 혼잡하여 단순 데이터만 제공합니다."
+        )
\ No newline at end of file
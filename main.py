@@ -2,32 +2,117 @@
 FastAPI 메인 서버
 모든 체인을 통합하여 Spring Boot와 연동
 """
-from fastapi import FastAPI, HTTPException
+import time
+_IMPORT_STARTED = time.perf_counter()  # import 소요 시간 측정 (기동 시간 분석용)
+
+from contextlib import asynccontextmanager
+from fastapi import FastAPI, HTTPException, Request, Response
+from fastapi.responses import JSONResponse
 from fastapi.middleware.cors import CORSMiddleware
 from pydantic import BaseModel
 from datetime import datetime
-from typing import List, Dict
+from typing import Any, List, Dict, Optional
+import asyncio
+import uuid
+from prometheus_client import CONTENT_TYPE_LATEST, generate_latest
 
 # 설정 및 유틸
 from utils.config import settings
-from utils.logger import logger
+from utils.logger import logger, request_id_var
 from utils.spring_client import spring_client
+from utils.stock_resolver import stock_resolver
+from utils.metrics import (
+    REQUEST_LATENCY, IN_FLIGHT, QUERY_LATENCY, metrics_registry, record_query_usage,
+    reset_multiprocess_metrics, start_request_usage, track_stage
+)
+from utils.tracing import start_trace, finish_trace, get_current_trace
+from utils.lazy import lazy_import
+from utils.startup import readiness
+from utils.responses import CompressionMiddleware, ORJSONResponse
+from utils.rate_limiter import LLMBackpressureError
+from utils.deadline import DeadlineExceeded, degraded_stages, request_deadline
+from utils.session_memory import session_memory
+from utils.indicator_history import get_indicator_history
+from utils import replay
 
-# 체인들
-from chains.classifier import classify_question
-from chains.rag_chain import query_rag
-from chains.indicator_chain import query_economic_indicator
-from chains.stock_chain import query_stock_analysis
-from chains.general_chain import query_general_advice
+# ★ 녹화/재생 모드면 pykrx/yfinance 호출을 녹화/재생 래퍼로 교체 (REPLAY_MODE=off면 아무 것도 안 함)
+replay.install()
+
+# 체인들 (langchain/openai import가 무거우므로 워밍업 또는 첫 질문 시 import)
+chains = lazy_import("chains")
 
 # 라우터
 from routers import market_data
 
+# ===== 워밍업 (준비 완료 전 미리 실행, settings.startup_warmups로 선택) =====
+async def warmup_chains():
+    """체인 모듈 import (langchain, openai, pykrx 등)"""
+    await asyncio.to_thread(chains.load)
+
+async def warmup_tokenizer():
+    """tiktoken 인코딩 적재 (최초 1회 다운로드/파싱)"""
+    from utils.tokenizer import get_encoding
+    await asyncio.to_thread(get_encoding, settings.openai_model)
+
+async def warmup_retriever():
+    """Pinecone 벡터스토어 연결 (get_vectorstore 캐시 채우기)"""
+    await asyncio.to_thread(lambda: chains.load().rag_chain.get_retriever())
+
+async def warmup_ticker_names():
+    """종목명 리졸버 첫 적재 대기"""
+    await stock_resolver.wait_until_loaded()
+
+async def warmup_market_snapshot():
+    """대시보드 캐시 채우기 (pykrx 조회는 load_dashboard_payload 안에서 별도 스레드로 실행)"""
+    await market_data.load_dashboard_payload()
+
+async def start_briefings():
+    """장 마감 후 브리핑 스케줄러 시작 (체인 import 후)"""
+    await asyncio.to_thread(chains.load)
+    chains.briefing_scheduler.start()
+
+readiness.register("chains", warmup_chains)
+readiness.register("tokenizer", warmup_tokenizer)
+readiness.register("retriever", warmup_retriever)
+readiness.register("ticker_names", warmup_ticker_names)
+readiness.register("market_snapshot", warmup_market_snapshot)
+
+# ===== 서버 시작/종료 (lifespan) =====
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """
+    시작: 클라이언트 생성, 경제지표·종목 목록 백그라운드 갱신, 워밍업·장 마감 후 브리핑 스케줄러 시작
+    종료: 백그라운드 작업 중지 및 클라이언트 정리
+    """
+    started = time.perf_counter()
+    spring_client.client  # 이벤트 루프 안에서 httpx 클라이언트 생성
+    spring_client.start_indicator_refresh()
+    stock_resolver.start_daily_refresh()
+    readiness.start()
+    briefing_start = asyncio.create_task(start_briefings()) if settings.briefing_enabled else None
+    readiness.record_startup(time.perf_counter() - started)
+    logger.info(
+        f"서버 시작 (import {readiness.import_seconds}초, startup {readiness.startup_seconds}초) - 워밍업 진행 중"
+    )
+
+    yield
+
+    readiness.stop()
+    if briefing_start is not None:
+        briefing_start.cancel()
+    if chains.loaded:
+        chains.briefing_scheduler.stop()
+    stock_resolver.stop()
+    await spring_client.close()
+    logger.info("서버 종료")
+
 # FastAPI 앱 초기화
 app = FastAPI(
     title="전봉준 AI 투자 어드바이저 API",
     description="RAG 기반 투자 상담 API",
-    version="1.0.0"
+    version="1.0.0",
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse  # ★ orjson 렌더링 (dict 반환은 jsonable_encoder를 거치므로 NumPy 값이 있으면 ORJSONResponse를 직접 반환)
 )
 
 # CORS 설정
@@ -39,6 +124,49 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
+# 응답 압축 (brotli/gzip, 미리 압축된 응답은 그대로 전달)
+app.add_middleware(CompressionMiddleware, minimum_size=settings.response_compression_min_bytes)
+
+def _route_group(path: str) -> str:
+    """처리 중 요청 게이지용 경로 그룹 (라우트 매칭 전이라 접두어 기준)"""
+    if path == "/ai/query":
+        return path
+    if path.startswith("/ai/api"):
+        return "/ai/api"
+    return "other"
+
+# 요청 ID 설정 (로그 레코드에 자동 포함, 응답 헤더로 반환)
+@app.middleware("http")
+async def request_id_middleware(request: Request, call_next):
+    request_id = request.headers.get("X-Request-ID") or uuid.uuid4().hex[:12]
+    token = request_id_var.set(request_id)
+    # /ai/query 및 시장 데이터 API만 단계별 트레이스 기록
+    trace = None
+    if request.url.path == "/ai/query" or request.url.path.startswith("/ai/api"):
+        trace = start_trace(f"{request.method} {request.url.path}", request_id)
+    started = time.perf_counter()
+    in_flight = IN_FLIGHT.labels(route=_route_group(request.url.path))
+    in_flight.inc()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+    finally:
+        in_flight.dec()
+        finish_trace(trace, status=status)
+        request_id_var.reset(token)
+        # 경로 파라미터가 있는 라우트는 템플릿 경로로 기록 (라벨 카디널리티 제한)
+        route = request.scope.get("route")
+        REQUEST_LATENCY.labels(
+            method=request.method,
+            route=getattr(route, "path", "unmatched"),
+            status=str(status)
+        ).observe(time.perf_counter() - started)
+    response.headers["X-Request-ID"] = request_id
+    if trace is not None:
+        response.headers["X-Trace-ID"] = trace.trace_id
+    return response
+
 # 라우터 등록
 app.include_router(market_data.router, prefix="/ai")
 
@@ -48,6 +176,8 @@ class QueryRequest(BaseModel):
     """질문 요청 모델"""
     session_id: str
     question: str
+    debug: bool = False  # True면 단계별 소요 시간(timings)을 응답에 포함
+    deadline_seconds: Optional[float] = None  # 응답 시간 예산 (settings.query_deadline_seconds 이하로 제한)
 
 class Source(BaseModel):
     """출처 정보 모델"""
@@ -63,6 +193,9 @@ class QueryResponse(BaseModel):
     category: str
     sources: List[Dict]
     timestamp: str
+    timings: Optional[Dict[str, float]] = None  # debug 요청 시 단계별 소요 시간 (ms)
+    usage: Optional[Dict[str, Any]] = None  # debug 요청 시 LLM 토큰/비용 집계
+    degraded: Optional[List[str]] = None  # 시간 예산 부족으로 축소 처리된 단계 (예: ["llm.stock"])
 
 # ===== API 엔드포인트 =====
 
@@ -76,7 +209,30 @@ async def health_check():
         "timestamp": datetime.now().isoformat()
     }
 
-@app.post("/ai/query", response_model=QueryResponse)
+@app.get("/ready")
+async def ready_check():
+    """준비 상태 (워밍업 완료 전에는 503) - Kubernetes readinessProbe용"""
+    return JSONResponse(readiness.status(), status_code=200 if readiness.ready else 503)
+
+@app.get("/metrics")
+async def metrics():
+    """Prometheus 메트릭 (멀티 워커면 모든 워커의 메트릭을 합산)"""
+    return Response(content=generate_latest(metrics_registry()), media_type=CONTENT_TYPE_LATEST)
+
+def _with_stock_name(question: str, stock_code: Optional[str]) -> str:
+    """후속 질문 앞에 이어받은 종목명 붙이기 (예: "그럼 목표주가는?" → "삼성전자 그럼 목표주가는?")"""
+    name = stock_resolver.name_of(stock_code) if stock_code else None
+    if not name or name in question:
+        return question
+    return f"{name} {question}"
+
+def _deadline_budget(request: QueryRequest) -> float:
+    """요청 시간 예산 (요청 값은 서버 상한 이하, 최소 1초)"""
+    if request.deadline_seconds is None:
+        return settings.query_deadline_seconds
+    return max(1.0, min(request.deadline_seconds, settings.query_deadline_seconds))
+
+@app.post("/ai/query", response_model=QueryResponse, response_model_exclude_none=True)
 async def query_ai(request: QueryRequest):
     """
     AI 질문 처리 메인 엔드포인트
@@ -87,93 +243,149 @@ async def query_ai(request: QueryRequest):
     3. 답변 생성
     4. 응답 반환
     """
+    started = time.perf_counter()
+    category = "unclassified"
+    usage = start_request_usage()
     try:
-        logger.info(f"[{request.session_id}] 질문 수신: {request.question}")
-        
-        # ★ 1. 질문 분류 (카테고리 + 종목 코드) - async 지원
-        classification = await classify_question(request.question)
-        category = classification["category"]
-        stock_code = classification.get("stock_code")
-        
-        logger.info(f"[{request.session_id}] 분류: {category}, 종목: {stock_code}")
-
-        # ★ 2. 카테고리별 처리
-        answer = ""
-        sources = []
-        
-        if category == "analyst_report":
-            # ★ RAG: ChromaDB 검색 + LLM 답변
-            result = query_rag(request.question)
-            answer = result["answer"]
-            sources = result["sources"]
+        with request_deadline(_deadline_budget(request)):
+            logger.info(f"[{request.session_id}] 질문 수신 ({len(request.question)}자)")
+            logger.debug(f"[{request.session_id}] 질문 내용: {request.question}")
             
-        elif category == "economic_indicator":
-            # ★ 경제지표: Spring Boot DB 조회 + LLM 해석
-            answer = await query_economic_indicator(request.question)
-            sources = [{
-                "title": "한국은행 경제통계",
-                "securities_firm": "MariaDB",
-                "date": datetime.now().strftime("%Y-%m-%d")
-            }]
+            # ★ 1. 질문 분류 (카테고리 + 종목 코드) - async 지원, 후속 질문이면 세션의 이전 종목 재사용
+            session = session_memory.get(request.session_id)
+            with track_stage("classification"):
+                classification = await chains.classify_question(request.question, session)
+            category = classification["category"]
+            stock_code = classification.get("stock_code")
             
-        elif category == "stock_price":
-            # ★ 주가: pykrx API 조회 + LLM 분석
-            if stock_code:
-                answer = query_stock_analysis(request.question, stock_code)
+            # ★ 후속 질문: 질문에 종목명을 붙이고(검색/프롬프트용) 최근 대화를 맥락으로 전달
+            question, history = request.question, ""
+            if classification.get("follow_up"):
+                question = _with_stock_name(request.question, stock_code)
+                history = session_memory.context(session)
+            
+            logger.info(f"[{request.session_id}] 분류: {category}, 종목: {stock_code}")
+
+            # ★ 2. 카테고리별 처리
+            answer = ""
+            sources = []
+            
+            if category == "analyst_report":
+                # ★ RAG: ChromaDB 검색 + LLM 답변
+                result = await chains.query_rag(question, history=history)
+                answer = result["answer"]
+                sources = result["sources"]
+                
+            elif category == "economic_indicator":
+                # ★ 경제지표: Spring Boot DB 조회 + LLM 해석
+                answer = await chains.query_economic_indicator(question, history=history)
                 sources = [{
-                    "title": f"실시간 주가 ({stock_code})",
-                    "securities_firm": "pykrx",
+                    "title": "한국은행 경제통계",
+                    "securities_firm": "MariaDB",
                     "date": datetime.now().strftime("%Y-%m-%d")
                 }]
-            else:
-                # 종목 코드 없으면 일반 상담으로 처리
-                answer = query_general_advice(request.question)
+                
+            elif category == "stock_price":
+                # ★ 주가: pykrx API 조회 + LLM 분석
+                if stock_code:
+                    answer = await chains.query_stock_analysis(question, stock_code, history=history)
+                    sources = [{
+                        "title": f"실시간 주가 ({stock_code})",
+                        "securities_firm": "pykrx",
+                        "date": datetime.now().strftime("%Y-%m-%d")
+                    }]
+                else:
+                    # 종목 코드 없으면 일반 상담으로 처리
+                    answer = await chains.query_general_advice(question, history=history)
+                    sources = []
+            else:  # general
+                # ★ 일반 상담: LLM 직접 답변
+                answer = await chains.query_general_advice(question, history=history)
                 sources = []
-        else:  # general
-            # ★ 일반 상담: LLM 직접 답변
-            answer = query_general_advice(request.question)
-            sources = []
-        
-        # ★ 빈 답변 검증
-        if not answer or len(answer.strip()) == 0:
-            logger.error(f"[{request.session_id}] 빈 답변 생성됨. Category: {category}")
-            raise HTTPException(status_code=500, detail="답변 생성 실패")
-        
-        # ★ 3. 응답 생성
-        response = QueryResponse(
-            session_id=request.session_id,
-            question=request.question,
-            answer=answer,
-            category=category,
-            sources=sources,
-            timestamp=datetime.now().isoformat()
-        )
-        
-        logger.info(f"[{request.session_id}] 응답 생성 완료")
-        return response
+            
+            # ★ 빈 답변 검증
+            if not answer or len(answer.strip()) == 0:
+                logger.error(f"[{request.session_id}] 빈 답변 생성됨. Category: {category}")
+                raise HTTPException(status_code=500, detail="답변 생성 실패")
+            
+            session_memory.remember(request.session_id, request.question, answer, category, stock_code)
+            
+            # ★ 3. 응답 생성
+            response = QueryResponse(
+                session_id=request.session_id,
+                question=request.question,
+                answer=answer,
+                category=category,
+                sources=sources,
+                timestamp=datetime.now().isoformat(),
+                degraded=degraded_stages() or None
+            )
+            
+            # ★ 디버그 요청이면 단계별 소요 시간 포함
+            trace = get_current_trace()
+            if request.debug and trace is not None:
+                response.timings = trace.timings()
+            if request.debug:
+                response.usage = usage.to_dict()
+            
+            logger.info(f"[{request.session_id}] 응답 생성 완료")
+            return response
         
     except HTTPException:
         raise  # HTTPException은 그대로 전달
+    except DeadlineExceeded as e:
+        # 부분 결과로 대체하지 못한 단계가 마감 시간을 넘긴 경우
+        logger.warning(f"[{request.session_id}] {e}")
+        raise HTTPException(status_code=504, detail="응답 시간 제한을 초과했습니다. 잠시 후 다시 시도해 주세요.")
+    except LLMBackpressureError as e:
+        # ★ OpenAI 호출 한도 대기열 초과 → 429 폭주 대신 재시도 시점을 알려주고 거절
+        logger.warning(f"[{request.session_id}] {e}")
+        raise HTTPException(
+            status_code=503,
+            detail="AI 요청이 많아 잠시 후 다시 시도해 주세요.",
+            headers={"Retry-After": str(e.retry_after)}
+        )
     except Exception as e:
         logger.error(f"[{request.session_id}] 예상치 못한 오류 발생: {str(e)}", exc_info=True)
         raise HTTPException(status_code=500, detail=f"AI 처리 중 오류: {str(e)}")
+    finally:
+        QUERY_LATENCY.labels(category=category).observe(time.perf_counter() - started)
+        record_query_usage(category, usage)
+        logger.info(
+            f"[{request.session_id}] LLM 사용량: 입력 {usage.prompt_tokens} / 출력 {usage.completion_tokens} 토큰, "
+            f"추정 비용 ${usage.cost_usd:.6f} ({len(usage.calls)}회 호출)"
+        )
 
+@app.get("/ai/indicators/trends")
+async def indicator_trends():
+    """
+    경제지표 추세 (LLM 호출 없음)
+    지표별 현재 값, 전일/30일/1년 대비 변화, 90일 평균, 1년 범위, 추세·국면 플래그
+    """
+    indicators = await spring_client.get_economic_indicators()
+    history = get_indicator_history()
+    trends = await asyncio.to_thread(history.summary, indicators)
+    if not trends:
+        raise HTTPException(status_code=503, detail="경제지표 데이터를 조회할 수 없습니다.")
+    return {
+        "indicators": trends,
+        "timestamp": datetime.now().isoformat()
+    }
 
 
-# ===== 서버 종료 시 정리 =====
-@app.on_event("shutdown")
-async def shutdown_event():
-    """서버 종료 시 Spring Boot 클라이언트 정리"""
-    await spring_client.close()
-    logger.info("서버 종료")
+
+readiness.record_import(time.perf_counter() - _IMPORT_STARTED)
 
 # ===== 서버 실행 =====
 if __name__ == "__main__":
     import uvicorn
-    logger.info("서버 시작")
+    logger.info(f"서버 시작 (워커 {settings.workers}개, 공유 캐시: {settings.shared_cache_backend})")
+    reset_multiprocess_metrics()
     uvicorn.run(
         "main:app",
         host=settings.host,
         port=settings.port,
-        reload=settings.debug
+        # 멀티 워커에서는 자동 리로드 사용 불가
+        reload=settings.debug and settings.workers == 1,
+        workers=settings.workers
     )
\ No newline at end of file
@@ -1,13 +1,25 @@
-from fastapi import APIRouter, HTTPException
+from fastapi import APIRouter, HTTPException, Query, Request
 from datetime import datetime, timedelta
+from utils.config import settings
 from utils.logger import logger
-from pykrx import stock
-import pandas as pd
+from utils.metrics import DASHBOARD_REFRESH, record_cache, track_stage
+from utils.lazy import lazy_import
+from utils.responses import EncodedPayload, ORJSONResponse
+from utils.shared_cache import ProcessLock, get_shared_cache, wait_for
+from utils.technicals import get_technicals
+from utils.portfolio import MissingHistoryError, analyze_portfolio
+from utils.screener import MarketSnapshot, market_screener
+from utils.stock_resolver import stock_resolver
 import time
 import asyncio
 from pydantic import BaseModel
-from typing import List
-import yfinance as yf # Fallback data source
+from functools import lru_cache
+from typing import Dict, FrozenSet, List, Literal, Optional
+
+# ★ 무거운 라이브러리는 첫 사용 시 import (서버 기동 시간 단축)
+stock = lazy_import("pykrx.stock")
+pd = lazy_import("pandas")
+yf = lazy_import("yfinance") # Fallback data source
 
 router = APIRouter(
     prefix="/api",       
@@ -15,7 +27,9 @@ router = APIRouter(
 )
 
 # --- 캐시 및 헬퍼 함수 ---
-cached_data = {}
+# ★ 대시보드 스냅샷은 공유 캐시에 저장 (워커 여러 개가 같은 스냅샷 사용, 갱신은 한 워커만)
+# ★ 저장 값은 직렬화/압축까지 끝낸 EncodedPayload (캐시 적중 시 바이트만 전송)
+DASHBOARD_CACHE_KEY = "market:dashboard"
 CACHE_DURATION_SECONDS = 60
 
 def get_latest_trading_day_str():
@@ -68,17 +82,79 @@ def safe_get_market_cap(date_str, market="ALL"):
         logger.error(f"시가총액 조회 실패: {e}")
         return pd.DataFrame()
 
+# --- 스크리너 스냅샷 ---
+@lru_cache(maxsize=4)
+def get_market_tickers(date_str: str) -> Dict[str, FrozenSet[str]]:
+    """거래일별 KOSPI/KOSDAQ 종목 코드 (스크리너 시장 구분용, 하루 한 번 조회)"""
+    return {
+        market: frozenset(stock.get_market_ticker_list(date_str, market=market))
+        for market in ("KOSPI", "KOSDAQ")
+    }
+
+def update_screener_snapshot(latest_day: str, df_ohlcv, df_cap):
+    """전 종목 OHLCV/시가총액으로 스크리너 스냅샷 교체 (실패해도 호출 측에는 영향 없음)"""
+    try:
+        market_screener.update(
+            MarketSnapshot.from_frames(latest_day, df_ohlcv, df_cap, get_market_tickers(latest_day))
+        )
+    except Exception as e:
+        logger.error(f"스크리너 스냅샷 생성 실패: {e}")
+
+def refresh_screener_snapshot() -> bool:
+    """
+    스크리너 스냅샷을 직접 조회해서 갱신 (대시보드 갱신이 없었거나 오래된 경우)
+
+    Returns:
+        성공 여부 (pykrx 조회 실패 시 False - 기존 스냅샷은 그대로 유지)
+    """
+    try:
+        latest_day = get_latest_trading_day_str()
+        df_ohlcv = stock.get_market_ohlcv(latest_day, market="ALL")
+        df_cap = stock.get_market_cap(latest_day, market="ALL")
+    except Exception as e:
+        logger.error(f"스크리너 시세 조회 실패: {e}")
+        return False
+    update_screener_snapshot(latest_day, df_ohlcv, df_cap)
+    return True
+
+_screener_refresh_lock = asyncio.Lock()
+SCREENER_RETRY_SECONDS = 10  # 갱신 실패 후 다시 시도하기까지 (그동안은 기존 스냅샷 또는 503)
+_screener_failed_at = 0.0
+
 # --- 통합 대시보드 API ---
 @router.get("/dashboard")
-async def get_dashboard_data():
+async def get_dashboard_data(request: Request):
     """대시보드에 필요한 모든 데이터를 한 번에 조회하여 반환"""
-    global cached_data
-    current_time = time.time()
-
-    if 'dashboard' in cached_data and current_time - cached_data['dashboard']['timestamp'] < CACHE_DURATION_SECONDS:
-        logger.info("✅ 캐시된 대시보드 데이터 반환")
-        return cached_data['dashboard']['data']
-
+    payload = await load_dashboard_payload()
+    return payload.response(request.headers.get("accept-encoding", ""))
+
+async def load_dashboard_payload() -> EncodedPayload:
+    """대시보드 응답 본문 (공유 캐시 우선, 없으면 한 워커만 갱신하고 나머지는 대기)"""
+    cache = get_shared_cache()
+    cached = cache.get(DASHBOARD_CACHE_KEY)
+    if cached is not None:
+        record_cache("dashboard", True)
+        logger.info("✅ 캐시된 대시보드 데이터 반환", extra={"sample_key": "dashboard_cache_hit"})
+        return cached
+
+    record_cache("dashboard", False)
+
+    # ★ 단일 갱신: 다른 워커(또는 요청)가 갱신 중이면 그 결과를 기다림
+    refresh_lock = ProcessLock("dashboard")
+    if not refresh_lock.acquire():
+        cached = await wait_for(DASHBOARD_CACHE_KEY, settings.shared_cache_wait_seconds)
+        if cached is not None:
+            return cached
+        logger.warning("⚠️ 대시보드 갱신 대기 시간 초과 - 직접 조회")
+    try:
+        # pykrx/yfinance는 동기 호출이므로 조회만 별도 스레드에서 (이벤트 루프는 막지 않음)
+        return await asyncio.to_thread(fetch_dashboard_data)
+    finally:
+        refresh_lock.release()
+
+def fetch_dashboard_data() -> EncodedPayload:
+    """pykrx로 대시보드 데이터를 새로 조회하여 공유 캐시에 저장 (실패 시 yfinance Fallback, 캐시 안 함, 동기 - 스레드에서 호출)"""
+    refresh_started = time.perf_counter()
     try:
         logger.info("🔄 새로운 대시보드 데이터 요청")
         latest_day = get_latest_trading_day_str()
@@ -159,6 +235,9 @@ async def get_dashboard_data():
 
         # 시가총액 상위 10개
         df_cap = stock.get_market_cap(latest_day, market="ALL")
+        
+        # ★ 받은 전 종목 시세/시가총액은 스크리너 스냅샷으로 재사용
+        update_screener_snapshot(latest_day, df_ohlcv, df_cap)
         top_10_tickers = df_cap.sort_values(by='시가총액', ascending=False).head(10).index.tolist()
         
         top_market_cap_data = [
@@ -179,17 +258,22 @@ async def get_dashboard_data():
             "topMarketCap": top_market_cap_data,
         }
 
-        cached_data['dashboard'] = {"data": dashboard_data, "timestamp": current_time}
-        return dashboard_data
+        # ★ NumPy 스칼라가 섞인 dict를 한 번만 직렬화/압축해서 저장
+        payload = EncodedPayload.encode(dashboard_data)
+        get_shared_cache().set(DASHBOARD_CACHE_KEY, payload, ttl=CACHE_DURATION_SECONDS)
+        DASHBOARD_REFRESH.labels(source="pykrx").observe(time.perf_counter() - refresh_started)
+        return payload
         
     except Exception as e:
         logger.error(f"대시보드 데이터 조회 중 오류 (Real Data 실패): {e}")
         logger.info("⚠️ Fallback: 목업(Mock) 데이터 반환. (Render IP 차단 가능성)")
         
         # 목업 데이터 반환
-        return await fetch_dashboard_data_from_yfinance()
+        fallback_data = fetch_dashboard_data_from_yfinance()
+        DASHBOARD_REFRESH.labels(source="yfinance").observe(time.perf_counter() - refresh_started)
+        return EncodedPayload.encode(fallback_data)
 
-async def fetch_dashboard_data_from_yfinance():
+def fetch_dashboard_data_from_yfinance():
     """yfinance를 통한 Fallback 데이터 조회"""
     try:
         logger.info("⚠️ yfinance Fallback 데이터 조회 시작")
@@ -371,7 +455,8 @@ async def get_stock_details(request: TickersRequest):
         latest_day = get_latest_trading_day_str()
         
         # 전체 시장의 최신 시세 정보를 한 번만 가져옵니다.
-        df = stock.get_market_ohlcv(latest_day, market="ALL")
+        with track_stage("market_data", "pykrx"):
+            df = stock.get_market_ohlcv(latest_day, market="ALL")
         
         # 요청받은 티커에 해당하는 데이터만 필터링합니다.
         filtered_df = df[df.index.isin(request.tickers)]
@@ -386,12 +471,96 @@ async def get_stock_details(request: TickersRequest):
                     "price": row['종가'],
                     "changePct": round(row['등락률'], 2)
                 })
-        return result
+        # pandas 행의 NumPy 스칼라는 orjson이 그대로 직렬화 (jsonable_encoder 변환 생략)
+        return ORJSONResponse(result)
 
     except Exception as e:
         logger.error(f"개별 종목 상세 정보 조회 중 오류: {e}")
         raise HTTPException(status_code=500, detail="개별 종목 정보를 가져오는 중 오류가 발생했습니다.")
 
+class PortfolioRequest(BaseModel):
+    tickers: List[str]
+    weights: Optional[List[float]] = None  # 없으면 동일 비중, 합계가 1이 아니면 정규화
+    days: Optional[int] = None  # 분석 기간 (거래일, 기본 settings.portfolio_default_days)
+
+@router.post("/portfolio/analytics")
+async def get_portfolio_analytics(request: PortfolioRequest):
+    """
+    보유 종목/비중으로 포트폴리오 분석
+    (수익률, 변동성, 상관계수 행렬, KOSPI 대비 베타, 최대/현재 낙폭 - 캐시된 시세 이력으로 계산)
+    """
+    try:
+        with track_stage("portfolio", "numpy"):
+            return ORJSONResponse(
+                await asyncio.to_thread(analyze_portfolio, request.tickers, request.weights, request.days)
+            )
+    except MissingHistoryError as e:
+        raise HTTPException(status_code=404, detail=str(e))
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+
+@router.get("/screener")
+async def screen_market(
+    market: Literal["ALL", "KOSPI", "KOSDAQ"] = "ALL",
+    min_price: Optional[float] = None,
+    max_price: Optional[float] = None,
+    min_change_rate: Optional[float] = None,
+    max_change_rate: Optional[float] = None,
+    min_volume: Optional[float] = None,
+    max_volume: Optional[float] = None,
+    min_trading_value: Optional[float] = None,
+    max_trading_value: Optional[float] = None,
+    min_market_cap: Optional[float] = None,
+    max_market_cap: Optional[float] = None,
+    min_turnover: Optional[float] = None,
+    max_turnover: Optional[float] = None,
+    min_range_pct: Optional[float] = None,
+    max_range_pct: Optional[float] = None,
+    sort: Literal["price", "change_rate", "volume", "trading_value", "market_cap", "turnover", "range_pct"] = "market_cap",
+    order: Literal["asc", "desc"] = "desc",
+    offset: int = Query(0, ge=0),
+    limit: int = Query(20, ge=1, le=100)
+):
+    """
+    전 종목 스크리너 (가격/등락률/거래량/거래대금/시가총액/회전율/일중 변동폭 조건 + 정렬 + 페이지네이션)
+    금액은 원, 등락률/회전율(거래대금÷시가총액)/일중 변동폭((고가-저가)÷시가)은 %
+    """
+    # 스냅샷이 없거나 대시보드 캐시 주기보다 오래되면 갱신 (워커 안에서 한 번만, 실패하면 잠시 기존 스냅샷 사용)
+    global _screener_failed_at
+    if market_screener.is_stale(CACHE_DURATION_SECONDS) and time.monotonic() - _screener_failed_at > SCREENER_RETRY_SECONDS:
+        async with _screener_refresh_lock:
+            if market_screener.is_stale(CACHE_DURATION_SECONDS) and time.monotonic() - _screener_failed_at > SCREENER_RETRY_SECONDS:
+                with track_stage("market_data", "pykrx"):
+                    if not await asyncio.to_thread(refresh_screener_snapshot):
+                        _screener_failed_at = time.monotonic()
+    
+    snapshot = market_screener.snapshot
+    if snapshot is None:
+        raise HTTPException(status_code=503, detail="시장 데이터를 조회할 수 없습니다.")
+    
+    bounds = {
+        "price": (min_price, max_price),
+        "change_rate": (min_change_rate, max_change_rate),
+        "volume": (min_volume, max_volume),
+        "trading_value": (min_trading_value, max_trading_value),
+        "market_cap": (min_market_cap, max_market_cap),
+        "turnover": (min_turnover, max_turnover),
+        "range_pct": (min_range_pct, max_range_pct)
+    }
+    ranges = {field: bound for field, bound in bounds.items() if bound != (None, None)}
+    total, items = snapshot.screen(market, ranges, sort, order == "desc", offset, limit)
+    # 종목명은 메모리 리졸버에서만 조회 (이벤트 루프에서 pykrx 호출 안 함, 적재 전이면 None)
+    for item in items:
+        item["name"] = stock_resolver.name_of(item["code"])
+    
+    return ORJSONResponse({
+        "date": snapshot.date,
+        "total": total,
+        "offset": offset,
+        "limit": limit,
+        "items": items
+    })
+
 @router.get("/stock/search")
 async def search_stock(query: str):
     """종목 검색 (이름 -> 티커)"""
@@ -431,14 +600,16 @@ async def get_stock_detail(ticker: str):
     """특정 종목의 최신 시세 정보"""
     try:
         latest_day = get_latest_trading_day_str()
-        df = safe_get_ohlcv(latest_day, ticker=ticker)
+        with track_stage("market_data", "pykrx"):
+            df = safe_get_ohlcv(latest_day, ticker=ticker)
         
         if df.empty:
             raise HTTPException(status_code=404, detail="해당 종목의 데이터를 찾을 수 없습니다.")
         
         latest_data = df.iloc[0]
         
-        return {
+        # pandas 행의 NumPy 스칼라가 섞이므로 ORJSONResponse로 직접 반환
+        return ORJSONResponse({
             "name": stock.get_market_ticker_name(ticker),
             "ticker": ticker,
             "price": int(latest_data["종가"]),
@@ -448,13 +619,14 @@ async def get_stock_detail(ticker: str):
                 "high": int(latest_data["고가"]),
                 "low": int(latest_data["저가"]),
             }
-        }
+        })
     except HTTPException:
         raise
     except Exception as e:
         logger.error(f"종목 상세 조회 실패 ({ticker}) - PyKrx: {e}")
         logger.info(f"⚠️ Fallback: {ticker}에 대해 yfinance 시도")
-        return await fetch_stock_detail_from_yfinance(ticker)
+        with track_stage("market_data", "yfinance"):
+            return await fetch_stock_detail_from_yfinance(ticker)
 
 async def fetch_stock_detail_from_yfinance(ticker: str):
     """yfinance를 통한 개별 종목 상세 정보 Fallback"""
@@ -519,7 +691,8 @@ async def get_stock_chart(ticker: str):
         start_date = (datetime.now() - timedelta(days=14)).strftime('%Y%m%d')
         today = datetime.now().strftime('%Y%m%d')
         
-        df = stock.get_market_ohlcv(start_date, today, ticker)
+        with track_stage("market_data", "pykrx"):
+            df = stock.get_market_ohlcv(start_date, today, ticker)
         
         chart_data = df['종가'].tolist()
         
@@ -527,7 +700,19 @@ async def get_stock_chart(ticker: str):
     except Exception as e:
         logger.error(f"종목 차트({ticker}) 조회 중 오류 - PyKrx: {e}")
         logger.info(f"⚠️ Fallback: {ticker} 차트에 대해 yfinance 시도")
-        return await fetch_stock_chart_from_yfinance(ticker)
+        with track_stage("market_data", "yfinance"):
+            return await fetch_stock_chart_from_yfinance(ticker)
+
+@router.get("/stock/{ticker}/indicators")
+async def get_stock_indicators(ticker: str):
+    """특정 종목의 기술적 지표 (이동평균, RSI, 변동성, 거래량 z-score, 52주 범위)"""
+    with track_stage("market_data", "pykrx"):
+        technicals = await asyncio.to_thread(get_technicals, ticker)
+    
+    if technicals is None:
+        raise HTTPException(status_code=404, detail="해당 종목의 시세 이력을 찾을 수 없습니다.")
+    
+    return technicals
 
 async def fetch_stock_chart_from_yfinance(ticker: str):
     suffixes = [".KS", ".KQ"]
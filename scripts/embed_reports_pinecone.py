@@ -9,9 +9,9 @@ from pathlib import Path
 project_root = str(Path(__file__).parent.parent)
 sys.path.insert(0, project_root)
 
-from utils.data_loader import load_pdfs_from_directory
-from utils.text_splitter import get_text_splitter
-from utils.db_client import create_vectorstore
+from utils.data_loader import iter_pdfs_from_directory
+from utils.text_splitter import split_document_stream
+from utils.db_client import upload_document_batches
 from utils.logger import logger
 
 def main():
@@ -26,33 +26,27 @@ def main():
         logger.info(f"{reports_dir}에 PDF 파일을 추가한 후 다시 실행하세요.")
         return
     
-    # PDF 파일 로드
+    # PDF 페이지 스트림 (전체를 메모리에 올리지 않음)
     logger.info(f"📂 PDF 파일 로드 중: {reports_dir}")
-    documents = load_pdfs_from_directory(reports_dir)
+    pages = iter_pdfs_from_directory(reports_dir)
     
-    if not documents:
-        logger.warning("로드된 PDF 파일이 없습니다.")
-        logger.info(f"{reports_dir}에 PDF 파일을 추가한 후 다시 실행하세요.")
-        return
-    
-    logger.info(f"✅ {len(documents
-
-)}개 PDF 문서 로드 완료")
+    # 텍스트 청킹 (배치 단위)
+    logger.info("📝 텍스트 청킹 및 임베딩 스트리밍 시작...")
+    chunk_batches = split_document_stream(pages)
     
-    # 텍스트 청킹
-    logger.info("📝 텍스트 청킹 중...")
-    text_splitter = get_text_splitter()
-    chunks = text_splitter.split_documents(documents)
-    logger.info(f"✅ {len(chunks)}개의 청크 생성 완료")
-    
-    # Pinecone에 임베딩 및 저장
+    # Pinecone에 임베딩 및 저장 (배치 단위)
     logger.info("🚀 Pinecone에 임베딩 및 업로드 중...")
     logger.info("⏳ OpenAI API를 사용하여 벡터 생성 중... (시간이 소요될 수 있습니다)")
     
-    vectorstore = create_vectorstore(chunks)
+    total = upload_document_batches(chunk_batches)
+    
+    if total == 0:
+        logger.warning("로드된 PDF 파일이 없습니다.")
+        logger.info(f"{reports_dir}에 PDF 파일을 추가한 후 다시 실행하세요.")
+        return
     
     logger.info("✅ Pinecone 임베딩 완료!")
-    logger.info(f"📊 총 {len(chunks)}개의 벡터가 Pinecone에 저장되었습니다.")
+    logger.info(f"📊 총 {total}개의 벡터가 Pinecone에 저장되었습니다.")
     
     # Index 통계 확인
     from utils.db_client import get_index_stats
@@ -0,0 +1,22 @@
+"""
+답변 캐시 키 정규화 테스트
+"""
+import os
+
+# 필수 설정 (실제 API는 호출하지 않음)
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("PINECONE_API_KEY", "test")
+
+from utils.answer_cache import normalize_intent
+
+
+def test_filler_phrases_are_ignored():
+    assert normalize_intent("시장 상황은 어때?") == normalize_intent("시장 상황 알려줘")
+    assert normalize_intent("삼성전자 주가는?") == normalize_intent("삼성전자 주가 알려주세요")
+
+
+def test_word_endings_are_kept():
+    # "주가"의 "가"를 조사로 지우면 "주"와 같은 키가 됨
+    assert normalize_intent("삼성전자 주가 알려줘") != normalize_intent("삼성전자 주 알려줘")
+    assert normalize_intent("물가 어때") != normalize_intent("물 어때")
+    assert normalize_intent("가을 어때") != normalize_intent("가 어때")
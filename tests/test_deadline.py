@@ -0,0 +1,77 @@
+"""
+요청 마감 시간(deadline) 전파 테스트
+"""
+import asyncio
+import os
+
+# 필수 설정 (실제 API는 호출하지 않음)
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("PINECONE_API_KEY", "test")
+
+import pytest
+
+from utils.deadline import (
+    DeadlineExceeded,
+    degraded_stages,
+    mark_degraded,
+    remaining,
+    request_deadline,
+    within_deadline
+)
+
+
+async def _value(result, delay=0.0):
+    await asyncio.sleep(delay)
+    return result
+
+
+def test_no_deadline_runs_to_completion():
+    assert remaining() is None
+    assert asyncio.run(within_deadline(_value("ok", 0.01), "stage")) == "ok"
+
+
+def test_remaining_is_scoped_to_block():
+    with request_deadline(5.0):
+        assert 4.9 < remaining() <= 5.0
+    assert remaining() is None
+
+
+def test_slow_stage_raises_deadline_exceeded():
+    async def scenario():
+        with request_deadline(0.05):
+            await within_deadline(_value("late", 1.0), "slow")
+
+    with pytest.raises(DeadlineExceeded) as error:
+        asyncio.run(scenario())
+    assert error.value.stage == "slow"
+
+
+def test_cap_applies_without_request_deadline():
+    with pytest.raises(DeadlineExceeded):
+        asyncio.run(within_deadline(_value("late", 1.0), "capped", cap=0.05))
+
+
+def test_stage_is_not_started_when_budget_is_below_minimum():
+    started = []
+
+    async def stage():
+        started.append(True)
+        return "ok"
+
+    async def scenario():
+        with request_deadline(1.0):
+            # reserve를 빼면 남은 시간이 min_seconds보다 짧음
+            await within_deadline(stage(), "llm", reserve=0.6, min_seconds=0.5)
+
+    with pytest.raises(DeadlineExceeded):
+        asyncio.run(scenario())
+    assert started == []
+
+
+def test_degraded_stages_are_collected_once_per_request():
+    with request_deadline(5.0):
+        mark_degraded("llm.answer")
+        mark_degraded("llm.answer")
+        mark_degraded("market_data")
+        assert degraded_stages() == ["llm.answer", "market_data"]
+    assert degraded_stages() == []
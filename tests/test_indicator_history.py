@@ -0,0 +1,80 @@
+"""
+경제지표 이력/추세 계산 테스트
+"""
+from datetime import datetime, timedelta
+import os
+
+# 필수 설정 (실제 API는 호출하지 않음)
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("PINECONE_API_KEY", "test")
+
+import numpy as np
+import pytest
+
+from utils.indicator_history import IndicatorHistory, compute_trend, parse_number
+
+TODAY = 740000  # 임의의 date ordinal
+
+
+def _trend(observations):
+    """{며칠 전: 값} → compute_trend 결과"""
+    days = sorted(observations, reverse=True)
+    dates = np.asarray([TODAY - d for d in days])
+    values = np.asarray([observations[d] for d in days], dtype=float)
+    return compute_trend(dates, values, TODAY)
+
+
+def test_parse_number():
+    assert parse_number("1,385.2원") == 1385.2
+    assert parse_number("-0.3%") == -0.3
+    assert parse_number(3) == 3.0
+    assert parse_number("집계 중") is None
+    assert parse_number(True) is None
+
+
+def test_changes_use_last_value_as_of_each_date():
+    trend = _trend({400: 1.0, 40: 3.0, 10: 3.2, 1: 3.5, 0: 3.6})
+    assert trend["latest"] == 3.6
+    assert trend["change_1d"] == pytest.approx(0.1)
+    assert trend["change_30d"] == pytest.approx(0.6)  # 30일 전에는 40일 전 값(3.0)이 유효
+    assert trend["change_1y"] == pytest.approx(2.6)
+    assert trend["trend"] == "상승"
+    assert trend["observations"] == 5
+
+
+def test_average_and_range_use_forward_filled_daily_values():
+    trend = _trend({100: 10.0, 44: 20.0, 0: 20.0})
+    # 최근 90일(89~0일 전) = 10.0이 45일(89~45일 전) + 20.0이 45일(44~0일 전)
+    assert trend["average_90d"] == pytest.approx(15.0)
+    assert (trend["high_1y"], trend["low_1y"]) == (20.0, 10.0)
+    assert "90일 평균 상회" in trend["flags"]
+    assert trend["change_1y"] is None  # 1년 전 관측 없음 → 최고/최저 플래그도 없음
+    assert "1년 최고" not in trend["flags"]
+
+
+def test_short_history_has_no_average_or_trend():
+    trend = _trend({5: 100.0, 0: 100.2})
+    assert trend["average_90d"] is None
+    assert trend["change_30d"] is None and trend["trend"] is None
+    assert trend["flags"] == []
+
+
+def test_flat_and_year_extremes():
+    assert _trend({31: 100.0, 0: 100.2})["trend"] == "보합"
+    trend = _trend({400: 5.0, 200: 4.0, 0: 3.0})
+    assert trend["trend"] == "하락"
+    assert "1년 최저" in trend["flags"]
+
+
+def test_record_keeps_one_value_per_day(tmp_path):
+    history = IndicatorHistory(str(tmp_path / "indicators.db"), cache_seconds=0)
+    now = datetime.now()
+    history.record({"기준금리": "3.50%", "환율": "1,385.2원", "비고": "없음"}, now=now - timedelta(days=31))
+    assert history.record({"기준금리": "3.25%"}, now=now) == 1
+    history.record({"기준금리": "3.00%"}, now=now)
+
+    trends = history.trends()
+    assert set(trends) == {"기준금리", "환율"}
+    assert trends["기준금리"]["latest"] == 3.0
+    assert trends["기준금리"]["observations"] == 2
+    assert trends["기준금리"]["change_30d"] == pytest.approx(-0.5)
@@ -0,0 +1,108 @@
+"""
+포트폴리오 분석(수익률/변동성/베타/낙폭) 테스트
+"""
+import math
+import os
+
+# 필수 설정 (실제 API는 호출하지 않음)
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("PINECONE_API_KEY", "test")
+
+import numpy as np
+import pytest
+
+import utils.portfolio as portfolio
+from utils.portfolio import MissingHistoryError, align_closes, analyze_portfolio, normalize_weights
+
+DATES = [f"2024{month:02d}{day:02d}" for month in (1, 2, 3) for day in range(1, 21)]
+
+
+def _history(dates, closes):
+    return {"dates": list(dates), "close": list(closes), "volume": [1.0] * len(closes)}
+
+
+def _random_closes(seed, n):
+    rng = np.random.default_rng(seed)
+    return list(1000 * np.exp(np.cumsum(rng.normal(0, 0.015, n))))
+
+
+@pytest.fixture
+def market(monkeypatch):
+    """종목/지수 이력 조회를 고정 데이터로 대체"""
+    histories = {
+        "A": _history(DATES, _random_closes(1, len(DATES))),
+        "B": _history(DATES, _random_closes(2, len(DATES)))
+    }
+    index = _history(DATES, _random_closes(3, len(DATES)))
+    monkeypatch.setattr(portfolio, "fetch_histories", lambda tickers: [histories.get(t) for t in tickers])
+    monkeypatch.setattr(portfolio, "fetch_index_history", lambda code: index)
+    return histories, index
+
+
+def test_normalize_weights():
+    assert normalize_weights(["A", "B"], None).tolist() == [0.5, 0.5]
+    assert normalize_weights(["A", "B"], [3, 1]).tolist() == [0.75, 0.25]
+    for weights in ([1], [1, -1], [0, 0], [1, float("nan")]):
+        with pytest.raises(ValueError):
+            normalize_weights(["A", "B"], weights)
+
+
+def test_align_closes_forward_fills_missing_days():
+    dates = ["20240101", "20240102", "20240103", "20240104"]
+    histories = [
+        _history(dates, [1.0, 2.0, 3.0, 4.0]),               # 날짜 일치 → 그대로 복사
+        _history(["20240102", "20240104"], [10.0, 12.0]),   # 하루 거래정지 → 직전 종가
+        _history(["20231229", "20240103"], [7.0, 8.0])      # 기간 밖 날짜는 무시
+    ]
+    closes = align_closes(histories, dates)
+    assert closes[0].tolist() == [1.0, 2.0, 3.0, 4.0]
+    assert np.isnan(closes[1, 0]) and closes[1, 1:].tolist() == [10.0, 10.0, 12.0]
+    assert np.isnan(closes[2, :2]).all() and closes[2, 2:].tolist() == [8.0, 8.0]
+
+
+def test_analyze_portfolio_matches_direct_computation(market):
+    histories, index = market
+    result = analyze_portfolio(["A", "B"], [0.6, 0.4], days=40)
+
+    dates = DATES[-41:]
+    closes = np.array([histories[t]["close"][-41:] for t in ("A", "B")])
+    stock_returns = closes[:, 1:] / closes[:, :-1] - 1
+    returns = 0.6 * stock_returns[0] + 0.4 * stock_returns[1]
+    market_closes = np.array(index["close"][-41:])
+    market_returns = market_closes[1:] / market_closes[:-1] - 1
+
+    wealth = np.concatenate([[1.0], np.cumprod(1 + returns)])
+    total = wealth[-1] - 1
+    beta = np.cov(returns, market_returns)[0, 1] / np.var(market_returns, ddof=1)
+
+    assert (result["start"], result["end"], result["days"]) == (dates[0], dates[-1], 40)
+    assert result["benchmark"] == "KOSPI"
+    summary = result["portfolio"]
+    assert summary["return"] == pytest.approx(round(total * 100, 2))
+    assert summary["annualized_return"] == pytest.approx(round(((1 + total) ** (252 / 40) - 1) * 100, 2))
+    assert summary["volatility"] == pytest.approx(round(returns.std(ddof=1) * math.sqrt(252) * 100, 2))
+    assert summary["beta"] == pytest.approx(round(beta, 3))
+    assert summary["max_drawdown"] == pytest.approx(round((wealth / np.maximum.accumulate(wealth) - 1).min() * 100, 2))
+
+    assert [h["weight"] for h in result["holdings"]] == [0.6, 0.4]
+    correlation = np.corrcoef(stock_returns)[0, 1]
+    assert result["correlation"][0][1] == pytest.approx(round(correlation, 3))
+    assert result["correlation"][0][0] == 1.0
+
+
+def test_analysis_starts_when_all_holdings_are_listed(market):
+    histories, _ = market
+    histories["NEW"] = _history(DATES[-30:], _random_closes(4, 30))  # 신규 상장
+    result = analyze_portfolio(["A", "NEW"], days=50)
+    assert result["start"] == DATES[-30]
+    assert result["days"] == 29
+
+
+def test_invalid_requests(market):
+    with pytest.raises(MissingHistoryError) as error:
+        analyze_portfolio(["A", "ZZZ"])
+    assert error.value.tickers == ["ZZZ"]
+    with pytest.raises(ValueError):
+        analyze_portfolio(["A", "A"])
+    with pytest.raises(ValueError):
+        analyze_portfolio([])
@@ -0,0 +1,120 @@
+"""
+LLM 호출 한도(토큰 버킷 + 우선순위 대기열) 테스트
+"""
+import asyncio
+import os
+
+# 필수 설정 (실제 API는 호출하지 않음)
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("PINECONE_API_KEY", "test")
+
+import pytest
+
+from utils.rate_limiter import LLMBackpressureError, Priority, RateLimiter, TokenBucket
+
+
+def test_token_bucket_wait_time():
+    bucket = TokenBucket(60)  # 초당 1개
+    assert bucket.wait_time(60) == 0.0
+    bucket.take(60)
+    assert bucket.wait_time(1) == pytest.approx(1.0, abs=0.05)
+    # 정산으로 음수가 되면 그만큼 더 기다림
+    bucket.take(2)
+    assert bucket.wait_time(1) == pytest.approx(3.0, abs=0.05)
+
+
+def test_oversized_call_is_clamped_to_capacity():
+    limiter = RateLimiter(rpm=0, tpm=600, max_depth=10, max_wait_seconds=5)
+    assert asyncio.run(limiter.acquire(10_000)) == 600
+
+
+def test_interactive_calls_go_before_background():
+    async def scenario():
+        limiter = RateLimiter(rpm=6000, tpm=0, max_depth=10, max_wait_seconds=5)
+        limiter._requests.level = 0  # 한도 소진 → 모두 대기열로
+        order = []
+
+        async def call(name, priority):
+            await limiter.acquire(1, priority)
+            order.append(name)
+
+        background = asyncio.create_task(call("background", Priority.BACKGROUND))
+        await asyncio.sleep(0)
+        interactive = asyncio.create_task(call("interactive", Priority.INTERACTIVE))
+        await asyncio.gather(background, interactive)
+        return order
+
+    assert asyncio.run(scenario()) == ["interactive", "background"]
+
+
+def test_same_priority_is_first_come_first_served():
+    async def scenario():
+        limiter = RateLimiter(rpm=6000, tpm=0, max_depth=10, max_wait_seconds=5)
+        limiter._requests.level = 0
+        order = []
+
+        async def call(name):
+            await limiter.acquire(1, Priority.BACKGROUND)
+            order.append(name)
+
+        tasks = []
+        for name in ("a", "b", "c"):
+            tasks.append(asyncio.create_task(call(name)))
+            await asyncio.sleep(0)
+        await asyncio.gather(*tasks)
+        return order
+
+    assert asyncio.run(scenario()) == ["a", "b", "c"]
+
+
+def test_full_queue_is_rejected():
+    async def scenario():
+        limiter = RateLimiter(rpm=60, tpm=0, max_depth=1, max_wait_seconds=5)
+        limiter._requests.level = 0
+        waiting = asyncio.create_task(limiter.acquire(1))
+        await asyncio.sleep(0)
+        try:
+            with pytest.raises(LLMBackpressureError) as error:
+                await limiter.acquire(1)
+        finally:
+            waiting.cancel()
+        return error.value
+
+    error = asyncio.run(scenario())
+    assert error.reason == "queue_full"
+    assert error.retry_after >= 1
+
+
+def test_expected_wait_over_limit_is_rejected():
+    async def scenario():
+        limiter = RateLimiter(rpm=60, tpm=0, max_depth=10, max_wait_seconds=0.5)
+        limiter._requests.level = 0  # 다음 요청까지 1초
+        await limiter.acquire(1)
+
+    with pytest.raises(LLMBackpressureError) as error:
+        asyncio.run(scenario())
+    assert error.value.reason == "wait_too_long"
+
+
+def test_settle_refunds_unused_tokens():
+    async def scenario():
+        limiter = RateLimiter(rpm=60, tpm=6000, max_depth=10, max_wait_seconds=5)
+        reserved = await limiter.acquire(1000)
+        after_acquire = limiter._tokens.level
+        limiter.settle(reserved, 200)
+        return after_acquire, limiter._tokens.level
+
+    after_acquire, after_settle = asyncio.run(scenario())
+    assert after_acquire == pytest.approx(5000, abs=1)
+    assert after_settle == pytest.approx(5800, abs=1)
+
+
+def test_settle_charges_overuse_and_returns_unused_request():
+    limiter = RateLimiter(rpm=60, tpm=6000, max_depth=10, max_wait_seconds=5)
+    reserved = asyncio.run(limiter.acquire(1000))
+    limiter.settle(reserved, 1500)
+    assert limiter._tokens.level == pytest.approx(4500, abs=1)
+
+    requests_before = limiter._requests.level
+    limiter.settle(reserved, 0, request_used=False)
+    assert limiter._requests.level == pytest.approx(requests_before + 1, abs=0.1)
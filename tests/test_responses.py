@@ -0,0 +1,117 @@
+"""
+응답 직렬화/압축(orjson, Accept-Encoding 협상, 압축 미들웨어) 테스트
+"""
+import asyncio
+import gzip
+import os
+
+# 필수 설정 (실제 API는 호출하지 않음)
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("PINECONE_API_KEY", "test")
+
+import numpy as np
+import orjson
+import pytest
+from fastapi.responses import PlainTextResponse
+
+import utils.responses as responses
+from utils.responses import CompressionMiddleware, EncodedPayload, ORJSONResponse, dumps, negotiate_encoding
+
+
+@pytest.mark.parametrize("header, expected", [
+    ("", None),
+    ("identity", None),
+    ("gzip, deflate", "gzip"),
+    ("gzip, deflate, br", "br"),
+    ("br;q=0.5, gzip;q=0.8", "gzip"),
+    ("br;q=0, gzip", "gzip"),
+    ("GZIP;q=0.9", "gzip"),
+    ("*", "br"),
+    ("*;q=0.5, br;q=0", "gzip"),
+    ("gzip;q=abc", None)
+])
+def test_negotiate_encoding(monkeypatch, header, expected):
+    monkeypatch.setattr(responses, "ENCODINGS", ("br", "gzip"))
+    assert negotiate_encoding(header) == expected
+
+
+def test_gzip_only_without_brotli(monkeypatch):
+    monkeypatch.setattr(responses, "ENCODINGS", ("gzip",))
+    assert negotiate_encoding("br") is None
+    assert negotiate_encoding("br, gzip;q=0.1") == "gzip"
+
+
+def test_dumps_numpy_values_and_nan():
+    payload = {
+        "array": np.array([1.5, 2.0]),
+        "int": np.int64(3),
+        "float": np.float32(0.5),
+        "nan": float("nan"),
+        1: {"a", "a"}
+    }
+    assert orjson.loads(dumps(payload)) == {"array": [1.5, 2.0], "int": 3, "float": 0.5, "nan": None, "1": ["a"]}
+    with pytest.raises(TypeError):
+        dumps({"value": object()})
+
+
+def test_encoded_payload_serves_precomputed_body():
+    content = {"rows": [{"code": f"{i:06d}", "price": i} for i in range(200)]}
+    payload = EncodedPayload.encode(content)
+    assert "gzip" in payload.compressed
+
+    response = payload.response("gzip")
+    assert response.headers["Content-Encoding"] == "gzip"
+    assert response.headers["Vary"] == "Accept-Encoding"
+    assert orjson.loads(gzip.decompress(response.body)) == content
+
+    plain = payload.response("")
+    assert "Content-Encoding" not in plain.headers
+    assert plain.body == payload.body
+
+
+def test_small_payload_is_not_compressed():
+    payload = EncodedPayload.encode({"ok": True})
+    assert payload.compressed == {}
+    assert "Vary" not in payload.response("gzip").headers
+
+
+def _call(app, accept_encoding):
+    """ASGI 앱 호출 → (응답 헤더, 본문)"""
+    scope = {
+        "type": "http", "method": "GET", "path": "/", "query_string": b"",
+        "headers": [(b"accept-encoding", accept_encoding.encode())]
+    }
+    messages = []
+
+    async def receive():
+        return {"type": "http.request", "body": b"", "more_body": False}
+
+    async def send(message):
+        messages.append(message)
+
+    asyncio.run(CompressionMiddleware(app, minimum_size=100)(scope, receive, send))
+    headers = {key.decode(): value.decode() for key, value in messages[0]["headers"]}
+    return headers, b"".join(m.get("body", b"") for m in messages[1:])
+
+
+LARGE = {"items": list(range(100))}
+
+
+def test_middleware_compresses_large_json():
+    headers, body = _call(ORJSONResponse(LARGE), "gzip")
+    assert headers["content-encoding"] == "gzip"
+    assert headers["content-length"] == str(len(body))
+    assert "Accept-Encoding" in headers["vary"]
+    assert orjson.loads(gzip.decompress(body)) == LARGE
+
+
+def test_middleware_skips_small_unaccepted_and_precompressed():
+    assert "content-encoding" not in _call(ORJSONResponse({"ok": True}), "gzip")[0]
+    assert "content-encoding" not in _call(ORJSONResponse(LARGE), "identity")[0]
+    assert _call(PlainTextResponse("가" * 100), "gzip")[0]["content-encoding"] == "gzip"
+
+    # 이미 압축된 본문은 다시 압축하지 않음
+    content = {"items": ["x" * 10] * 200}
+    headers, body = _call(EncodedPayload.encode(content).response("gzip"), "gzip")
+    assert headers["content-encoding"] == "gzip"
+    assert orjson.loads(gzip.decompress(body)) == content
@@ -0,0 +1,78 @@
+"""
+시장 스크리너(열 배열 마스크 필터/정렬) 테스트
+"""
+import os
+
+# 필수 설정 (실제 API는 호출하지 않음)
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("PINECONE_API_KEY", "test")
+
+import pandas as pd
+import pytest
+
+from utils.screener import MarketScreener, MarketSnapshot
+
+
+@pytest.fixture
+def snapshot():
+    tickers = ["000001", "000002", "000003", "000004"]
+    df_ohlcv = pd.DataFrame(
+        {
+            "시가": [1000, 2000, 500, 0],
+            "고가": [1100, 2100, 550, 0],
+            "저가": [900, 1900, 450, 0],
+            "종가": [1050, 2050, 520, 0],
+            "거래량": [100, 300, 50, 0],
+            "거래대금": [105000, 615000, 26000, 0],
+            "등락률": [5.0, -1.5, 2.25, 0.0]
+        },
+        index=tickers
+    )
+    # 000004는 시가총액 없음 (NaN)
+    df_cap = pd.DataFrame({"시가총액": [1_000_000, 5_000_000, 200_000]}, index=tickers[:3])
+    markets = {"KOSPI": ["000001", "000002"], "KOSDAQ": ["000003"]}
+    return MarketSnapshot.from_frames("20240102", df_ohlcv, df_cap, markets)
+
+
+def test_derived_columns(snapshot):
+    _, rows = snapshot.screen(sort="price", limit=10)
+    by_code = {row["code"]: row for row in rows}
+    assert by_code["000001"]["turnover"] == 10.5          # 105000 / 1000000 %
+    assert by_code["000001"]["range_pct"] == 20.0         # (1100 - 900) / 1000 %
+    assert by_code["000004"]["market"] == "KONEX"
+    assert by_code["000004"]["market_cap"] is None
+    assert by_code["000004"]["range_pct"] is None         # 시가 0
+
+
+def test_filters_combine_with_market(snapshot):
+    total, rows = snapshot.screen(market="KOSPI", ranges={"change_rate": (0, None)})
+    assert total == 1 and [row["code"] for row in rows] == ["000001"]
+
+    total, rows = snapshot.screen(ranges={"price": (500, 1500)}, sort="price", descending=False)
+    assert [row["code"] for row in rows] == ["000003", "000001"]
+
+
+def test_nan_values_are_excluded_by_filters_and_sorted_last(snapshot):
+    total, _ = snapshot.screen(ranges={"market_cap": (None, 10_000_000)})
+    assert total == 3
+
+    for descending in (True, False):
+        _, rows = snapshot.screen(sort="market_cap", descending=descending)
+        assert rows[-1]["code"] == "000004"
+    _, rows = snapshot.screen(sort="market_cap")
+    assert [row["code"] for row in rows[:3]] == ["000002", "000001", "000003"]
+
+
+def test_pagination_reports_full_count(snapshot):
+    total, rows = snapshot.screen(sort="volume", offset=1, limit=2)
+    assert total == 4
+    assert [row["code"] for row in rows] == ["000001", "000003"]
+    assert isinstance(rows[0]["volume"], int)
+
+
+def test_screener_staleness(snapshot):
+    screener = MarketScreener()
+    assert screener.is_stale(60)
+    screener.update(snapshot)
+    assert not screener.is_stale(60)
+    assert screener.is_stale(-1)
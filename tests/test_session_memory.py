@@ -0,0 +1,84 @@
+"""
+세션 대화 메모리(링 버퍼, 유휴 만료, LRU, 맥락 토큰 예산) 테스트
+"""
+import os
+
+# 필수 설정 (실제 API는 호출하지 않음)
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("PINECONE_API_KEY", "test")
+
+import pytest
+import tiktoken
+
+import utils.tokenizer as tokenizer
+from utils.session_memory import SessionMemory
+
+# 1바이트 = 1토큰 인코딩 (인코딩 파일 다운로드 없이 토큰 수를 예측 가능하게)
+BYTE_ENCODING = tiktoken.Encoding(
+    "bytes", pat_str=r".+", mergeable_ranks={bytes([i]): i for i in range(256)}, special_tokens={}
+)
+
+
+@pytest.fixture(autouse=True)
+def byte_tokens(monkeypatch):
+    monkeypatch.setattr(tokenizer, "get_encoding", lambda model: BYTE_ENCODING)
+
+
+def test_keeps_only_recent_turns():
+    memory = SessionMemory(max_turns=2)
+    for i in range(3):
+        memory.remember("s1", f"q{i}", f"a{i}", "stock")
+    assert [turn["question"] for turn in memory.get("s1")["turns"]] == ["q1", "q2"]
+
+
+def test_last_confirmed_stock_is_kept():
+    memory = SessionMemory()
+    memory.remember("s1", "삼성전자 주가", "...", "stock", stock_code="005930")
+    memory.remember("s1", "그럼 목표주가는?", "...", "stock")
+    assert memory.get("s1")["stock_code"] == "005930"
+
+
+def test_answer_is_truncated_without_broken_characters():
+    memory = SessionMemory(answer_tokens=10)
+    memory.remember("s1", "질문", "  가나다라마바사  ", "general")
+    answer = memory.get("s1")["turns"][-1]["answer"]
+    assert answer == "가나다"  # 10바이트 → 완성된 글자 3개 (3바이트씩)
+
+
+def test_idle_sessions_expire():
+    memory = SessionMemory(idle_seconds=60)
+    memory.remember("s1", "q", "a", "general")
+    memory.get("s1")["updated"] -= 120
+    assert memory.get("s1") is None
+    assert len(memory) == 0
+
+    memory.remember("s2", "q", "a", "general")
+    memory.get("s2")["updated"] -= 120
+    assert memory.prune_idle() == 1
+
+
+def test_least_recently_used_session_is_evicted():
+    memory = SessionMemory(max_sessions=2)
+    memory.remember("s1", "q", "a", "general")
+    memory.remember("s2", "q", "a", "general")
+    memory.get("s1")  # s1 사용 → s2가 가장 오래됨
+    memory.remember("s3", "q", "a", "general")
+    assert memory.get("s2") is None
+    assert memory.get("s1") is not None and memory.get("s3") is not None
+
+
+def test_context_fits_budget_in_chronological_order():
+    memory = SessionMemory(context_tokens=50)
+    for i in range(5):
+        memory.remember("s1", f"q{i}", f"a{i}", "general")
+    context = memory.context(memory.get("s1"))
+    # 턴 하나 = "사용자: qN\nAI: aN" 20바이트 → 최신 2턴만
+    assert context == "이전 대화 (참고용):\n사용자: q3\nAI: a3\n사용자: q4\nAI: a4\n\n"
+
+
+def test_disabled_or_missing_session():
+    memory = SessionMemory(max_turns=0)
+    memory.remember("s1", "q", "a", "general")
+    assert memory.get("s1") is None
+    assert memory.context(None) == ""
+    assert SessionMemory().get("") is None
@@ -0,0 +1,118 @@
+"""
+기술적 지표 계산(NumPy 일괄 계산) 테스트
+"""
+import math
+import os
+
+# 필수 설정 (실제 API는 호출하지 않음)
+os.environ.setdefault("OPENAI_API_KEY", "test")
+os.environ.setdefault("PINECONE_API_KEY", "test")
+
+import numpy as np
+import pytest
+
+from utils.technicals import RSI_PERIOD, compute_indicators, digest, stack_histories
+
+
+def _reference_rsi(closes, period=RSI_PERIOD):
+    """Wilder RSI 반복 계산 (비교 기준)"""
+    diffs = [b - a for a, b in zip(closes, closes[1:])]
+    gains = [max(d, 0.0) for d in diffs]
+    losses = [max(-d, 0.0) for d in diffs]
+    avg_gain = sum(gains[:period]) / period
+    avg_loss = sum(losses[:period]) / period
+    for gain, loss in zip(gains[period:], losses[period:]):
+        avg_gain = (avg_gain * (period - 1) + gain) / period
+        avg_loss = (avg_loss * (period - 1) + loss) / period
+    if avg_loss == 0:
+        return 100.0
+    return 100 - 100 / (1 + avg_gain / avg_loss)
+
+
+def _history(closes, volumes=None):
+    volumes = volumes if volumes is not None else [1000.0] * len(closes)
+    return {"dates": [f"d{i}" for i in range(len(closes))], "close": list(closes), "volume": list(volumes)}
+
+
+def _random_closes(seed, n):
+    rng = np.random.default_rng(seed)
+    return list(10000 * np.exp(np.cumsum(rng.normal(0, 0.02, n))))
+
+
+def test_stack_histories_right_aligns_short_rows():
+    closes, volumes = stack_histories([_history([1.0, 2.0, 3.0]), _history([5.0])])
+    assert closes.shape == (2, 3)
+    assert closes[0].tolist() == [1.0, 2.0, 3.0]
+    assert np.isnan(closes[1, :2]).all() and closes[1, 2] == 5.0
+    assert np.isnan(volumes[1, 0])
+
+
+def test_moving_averages_and_rsi_match_reference():
+    series = [_random_closes(1, 150), _random_closes(2, 80), _random_closes(3, 30)]
+    closes, volumes = stack_histories([_history(s) for s in series])
+    result = compute_indicators(closes, volumes)
+
+    for row, s in enumerate(series):
+        assert result["close"][row] == pytest.approx(s[-1])
+        assert result["ma5"][row] == pytest.approx(np.mean(s[-5:]))
+        assert result["ma20"][row] == pytest.approx(np.mean(s[-20:]))
+        # 이력이 행마다 달라도(앞쪽 NaN) 자기 이력 전체로 평활
+        assert result["rsi"][row] == pytest.approx(_reference_rsi(s), abs=1e-6)
+
+    assert result["ma120"][0] == pytest.approx(np.mean(series[0][-120:]))
+    assert np.isnan(result["ma120"][1]) and np.isnan(result["ma60"][2])
+
+
+def test_volatility_matches_log_return_std():
+    s = _random_closes(4, 40)
+    closes, volumes = stack_histories([_history(s)])
+    result = compute_indicators(closes, volumes)
+    returns = np.diff(np.log(s[-21:]))
+    expected = returns.std(ddof=1) * math.sqrt(252) * 100
+    assert result["volatility"][0] == pytest.approx(expected)
+
+
+def test_short_history_gives_nan():
+    closes, volumes = stack_histories([_history([100.0] * RSI_PERIOD)])  # 변화량 13개
+    result = compute_indicators(closes, volumes)
+    assert np.isnan(result["rsi"][0])
+    assert np.isnan(result["ma20"][0])
+    assert np.isnan(result["volatility"][0])
+    assert np.isnan(result["volume_z"][0])
+    assert result["ma5"][0] == pytest.approx(100.0)
+
+
+def test_rising_only_series_has_rsi_100():
+    closes, volumes = stack_histories([_history([float(i) for i in range(1, 31)])])
+    assert compute_indicators(closes, volumes)["rsi"][0] == pytest.approx(100.0)
+
+
+def test_zero_closes_are_forward_filled():
+    s = _random_closes(5, 30)
+    broken = list(s)
+    broken[20] = 0.0  # 거래정지
+    filled = list(s)
+    filled[20] = filled[19]
+    result = compute_indicators(*stack_histories([_history(broken)]))
+    expected = compute_indicators(*stack_histories([_history(filled)]))
+
+    assert np.isfinite(result["volatility"][0])
+    assert result["volatility"][0] == pytest.approx(expected["volatility"][0])
+    assert result["rsi"][0] == pytest.approx(expected["rsi"][0])
+    assert result["low_52w"][0] > 0
+
+
+def test_volume_zscore_and_52_week_position():
+    closes = [100.0 + i for i in range(21)]
+    volumes = [1000.0, 1200.0] * 10 + [5000.0]
+    result = compute_indicators(*stack_histories([_history(closes, volumes)]))
+    prior = np.array(volumes[:-1])
+    assert result["volume_z"][0] == pytest.approx((5000.0 - prior.mean()) / prior.std(ddof=1))
+    assert result["high_52w"][0] == 120.0 and result["low_52w"][0] == 100.0
+    assert result["position_52w"][0] == pytest.approx(100.0)
+
+
+def test_digest_skips_missing_values():
+    text = digest({"ma5": 100.0, "ma20": None, "ma60": None, "ma120": None, "trend": None, "rsi": 55.04})
+    assert text == "이동평균: 5일 100\nRSI(14): 55.0"
+    assert digest(None) == ""
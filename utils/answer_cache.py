@@ -0,0 +1,156 @@
+"""
+답변 캐시 모듈
+기반 데이터의 지문(fingerprint) + 정규화된 질문 의도를 키로 LLM 답변을 재사용
+(데이터가 바뀌지 않으면 같은 질문에 LLM을 다시 호출하지 않음)
+"""
+from collections import OrderedDict
+from typing import Any, Dict, Optional, Tuple
+import hashlib
+import json
+import re
+import threading
+import time
+from utils.config import settings
+from utils.logger import logger
+from utils.metrics import record_cache
+from utils.shared_cache import get_shared_cache, is_shared
+
+# 의도 비교 시 무시하는 문장 끝 표현 (예: "시장 상황은 어때?" ≈ "시장 상황 알려줘")
+# ★ 단어 단위로만 제거 (음절 단위로 지우면 "주가" → "주"처럼 다른 질문과 키가 겹침)
+_TRAILING_FILLERS = frozenset({
+    "어때", "어때요", "어떄", "어떄요", "어떻게돼", "어떻게돼요", "어떻게되나요",
+    "알려줘", "알려줘요", "알려주세요", "말해줘", "말해줘요", "말해주세요",
+    "궁금해", "궁금해요", "궁금합니다"
+})
+# 마지막 단어 끝의 조사 (세 글자 이상 단어에서만 제거 - "가을" 같은 두 글자 단어 보호,
+# "이/가"는 "주가", "물가"처럼 명사 끝과 겹치므로 제외)
+_TRAILING_PARTICLE = re.compile(r"(?<=\w{2})(은|는|을|를)$")
+_NON_WORD = re.compile(r"[\s\W_]+", re.UNICODE)
+
+def normalize_intent(question: str) -> str:
+    """
+    질문을 캐시 키용 의도 문자열로 정규화 (공백/문장부호/대소문자/끝맺음 제거)
+
+    Args:
+        question: 사용자 질문
+
+    Returns:
+        정규화된 문자열
+    """
+    words = [word for word in _NON_WORD.split(question.lower()) if word]
+    while len(words) > 1 and words[-1] in _TRAILING_FILLERS:
+        words.pop()
+    if words:
+        words[-1] = _TRAILING_PARTICLE.sub("", words[-1])
+    return "".join(words)
+
+def fingerprint(data: Any) -> str:
+    """
+    데이터 지문 생성 (키 순서와 무관한 JSON 직렬화의 SHA-256 앞 16자리)
+
+    Args:
+        data: JSON 직렬화 가능한 데이터
+
+    Returns:
+        16자리 16진수 문자열
+    """
+    payload = json.dumps(data, sort_keys=True, ensure_ascii=False, default=str)
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()[:16]
+
+def stock_data_version(stock_data: Dict[str, Any]) -> str:
+    """
+    주가 데이터 버전 (종목 + 거래일 + 시세 스냅샷 지문)
+
+    Args:
+        stock_data: get_stock_data_from_pykrx 결과
+
+    Returns:
+        "ticker:date:snapshot" 형식 문자열
+    """
+    snapshot = fingerprint({
+        k: stock_data.get(k) for k in ("price", "change_pct", "volume", "open", "high", "low")
+    })
+    return f"{stock_data.get('ticker')}:{stock_data.get('date')}:{snapshot}"
+
+class AnswerCache:
+    """
+    TTL + LRU 기반 답변 캐시
+    (공유 캐시 백엔드가 설정되면 워커 간 공유 - 한 워커가 만든 답변을 다른 워커도 재사용)
+    """
+
+    def __init__(self, max_entries: int = 1000, ttl_seconds: int = 21600):
+        """
+        초기화
+
+        Args:
+            max_entries: 최대 저장 개수 (초과 시 가장 오래 사용 안 된 항목 제거)
+            ttl_seconds: 항목 유효 시간 (초)
+        """
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self._entries: "OrderedDict[Tuple[str, str, str], Tuple[float, str]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    @staticmethod
+    def make_key(chain: str, data_version: str, question: str) -> Tuple[str, str, str]:
+        """캐시 키 생성: (체인 이름, 데이터 버전, 정규화된 의도)"""
+        return (chain, data_version, normalize_intent(question))
+
+    @staticmethod
+    def _shared_key(key: Tuple[str, str, str]) -> str:
+        return f"answer:{fingerprint(list(key))}"
+
+    def get(self, key: Tuple[str, str, str]) -> Optional[str]:
+        """캐시 조회 (만료 시 삭제 후 None)"""
+        if is_shared():
+            answer = get_shared_cache().get(self._shared_key(key))
+            self._record(key, answer is not None)
+            return answer
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None or time.time() - entry[0] > self.ttl_seconds:
+                if entry is not None:
+                    del self._entries[key]
+                self._record(key, False)
+                return None
+            self._entries.move_to_end(key)
+        self._record(key, True)
+        return entry[1]
+
+    def _record(self, key: Tuple[str, str, str], hit: bool):
+        if hit:
+            self.hits += 1
+            logger.info(f"✅ 답변 캐시 적중: {key[0]} ({key[1]})", extra={"sample_key": "answer_cache_hit"})
+        else:
+            self.misses += 1
+        record_cache(f"answer_{key[0]}", hit)
+
+    def set(self, key: Tuple[str, str, str], answer: str):
+        """캐시 저장"""
+        if self.ttl_seconds <= 0:
+            return
+        if is_shared():
+            cache = get_shared_cache()
+            cache.set(self._shared_key(key), answer, ttl=self.ttl_seconds)
+            cache.prune("answer", self.max_entries)
+            return
+
+        with self._lock:
+            self._entries[key] = (time.time(), answer)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def clear(self):
+        """캐시 전체 삭제"""
+        with self._lock:
+            self._entries.clear()
+
+# 전역 답변 캐시 인스턴스
+answer_cache = AnswerCache(
+    max_entries=settings.answer_cache_max_entries,
+    ttl_seconds=settings.answer_cache_ttl_seconds
+)
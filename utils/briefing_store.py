@@ -0,0 +1,129 @@
+"""
+장 마감 후 브리핑 저장소
+스케줄러(chains/briefing.py)가 장 마감 후 미리 만든 종목/시장 브리핑을 데이터 버전별로 보관하고,
+"삼성전자 오늘 어때?", "시장 상황은?" 같은 일반적인 질문이 오면 LLM 호출 없이 바로 제공
+
+- 키: (종류, 데이터 버전) - 종목은 stock_data_version, 시장은 경제지표 fingerprint
+  → 데이터가 바뀌면 자연히 적중하지 않음
+- 공유 캐시 백엔드가 설정되면 워커 간 공유 (리더 워커가 생성, 모든 워커가 제공)
+"""
+from collections import Counter
+from typing import Dict, List, Optional, Tuple
+import re
+import threading
+import time
+from utils.answer_cache import normalize_intent
+from utils.config import settings
+from utils.metrics import record_cache
+from utils.shared_cache import get_shared_cache, is_shared
+
+# 종목명을 뺀 나머지가 이 정도면 "오늘 어때?" 수준의 일반 질문 (정규화 후 비교)
+_GENERIC_STOCK_QUESTION = re.compile(
+    r"^(오늘|지금|요즘|현재|최근)?(주가|주식|시세|상황|흐름|분석|동향|전망)?(은|는|이|가)?$"
+)
+_GENERIC_MARKET_QUESTION = re.compile(
+    r"^(오늘|지금|요즘|현재|최근)?(국내)?(시장|증시|주식시장|경제)(상황|흐름|동향|전망|분위기)?(은|는|이|가)?$"
+)
+
+LAST_RUN_KEY = "briefing:last_run"
+
+class BriefingStore:
+    """데이터 버전별 브리핑 + 종목별 질문 횟수 (브리핑 대상 선정용)"""
+
+    def __init__(self, ttl_seconds: int = 345600):
+        """
+        초기화
+
+        Args:
+            ttl_seconds: 브리핑 유효 시간 (초, 주말/연휴에도 다음 생성까지 남도록 여유 있게)
+        """
+        self.ttl_seconds = ttl_seconds
+        self._entries: Dict[str, Tuple[float, str]] = {}
+        self._query_counts: Counter = Counter()
+        self._last_run: Optional[str] = None
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def is_generic(kind: str, question: str, subject: Optional[str] = None) -> bool:
+        """
+        브리핑으로 답할 수 있는 일반 질문인지 확인
+
+        Args:
+            kind: "stock" 또는 "indicator"
+            question: 사용자 질문
+            subject: 질문에서 뺄 종목명 (종목 브리핑일 때)
+        """
+        intent = normalize_intent(question)
+        if subject:
+            intent = normalize_intent(intent.replace(normalize_intent(subject), "", 1))
+        pattern = _GENERIC_STOCK_QUESTION if kind == "stock" else _GENERIC_MARKET_QUESTION
+        return bool(pattern.match(intent))
+
+    @staticmethod
+    def _key(kind: str, version: str) -> str:
+        return f"briefing:{kind}:{version}"
+
+    def get(self, kind: str, version: str, question: str, subject: Optional[str] = None) -> Optional[str]:
+        """
+        질문이 일반 질문이고 같은 데이터 버전의 브리핑이 있으면 반환
+
+        Args:
+            kind: "stock" 또는 "indicator"
+            version: 데이터 버전
+            question: 사용자 질문
+            subject: 종목명 (종목 브리핑일 때)
+        """
+        if not settings.briefing_enabled or not self.is_generic(kind, question, subject):
+            return None
+        briefing = self.peek(kind, version)
+        record_cache(f"briefing_{kind}", briefing is not None)
+        return briefing
+
+    def peek(self, kind: str, version: str) -> Optional[str]:
+        """질문과 무관하게 저장된 브리핑 조회 (생성 여부 확인용)"""
+        key = self._key(kind, version)
+        if is_shared():
+            return get_shared_cache().get(key)
+        with self._lock:
+            entry = self._entries.get(key)
+        if entry is None or entry[0] < time.time():
+            return None
+        return entry[1]
+
+    def put(self, kind: str, version: str, briefing: str):
+        """브리핑 저장"""
+        key = self._key(kind, version)
+        if is_shared():
+            get_shared_cache().set(key, briefing, ttl=self.ttl_seconds)
+            return
+        now = time.time()
+        with self._lock:
+            self._entries = {k: v for k, v in self._entries.items() if v[0] >= now}
+            self._entries[key] = (now + self.ttl_seconds, briefing)
+
+    def record_query(self, stock_code: str):
+        """종목 질문 횟수 기록 (워커별 집계 - 요청이 워커에 고르게 분산되므로 리더의 집계로 충분)"""
+        with self._lock:
+            self._query_counts[stock_code] += 1
+
+    def most_queried(self, n: int) -> List[str]:
+        """질문이 많은 종목 코드 상위 n개"""
+        with self._lock:
+            return [code for code, _ in self._query_counts.most_common(n)]
+
+    def last_run(self) -> Optional[str]:
+        """마지막 브리핑 생성 날짜 (YYYYMMDD)"""
+        if is_shared():
+            return get_shared_cache().get(LAST_RUN_KEY)
+        return self._last_run
+
+    def mark_run(self, date_str: str):
+        """브리핑 생성 완료 기록 (다음 날 질문 집계는 새로 시작)"""
+        if is_shared():
+            get_shared_cache().set(LAST_RUN_KEY, date_str, ttl=self.ttl_seconds)
+        self._last_run = date_str
+        with self._lock:
+            self._query_counts.clear()
+
+# 전역 브리핑 저장소 인스턴스
+briefing_store = BriefingStore(ttl_seconds=settings.briefing_ttl_seconds)
@@ -3,6 +3,7 @@
 .env 파일의 환경변수를 읽어서 애플리케이션 전체에서 사용
 """
 from pydantic_settings import BaseSettings
+from typing import Dict, List
 
 class Settings(BaseSettings):
     """환경 설정 클래스"""
@@ -10,6 +11,42 @@ class Settings(BaseSettings):
     # OpenAI API 설정
     openai_api_key: str  # OpenAI API 키 (필수)
     openai_model: str = "gpt-4o-mini"  # 기본 모델 (가성비 최적화)
+    openai_base_url: str = ""  # OpenAI 호환 엔드포인트 (비우면 공식 API, 벤치마크/스텁 서버용)
+    
+    # 체인별 모델 라우팅 (없는 체인은 openai_model 사용)
+    # 분류/단순 조회 해석은 작은 모델, 리포트 종합(rag) 등은 필요 시 큰 모델로 지정
+    llm_models: Dict[str, str] = {
+        "classifier": "gpt-4o-mini",
+        "indicator": "gpt-4o-mini",
+        "stock": "gpt-4o-mini"
+    }
+    llm_max_tokens: Dict[str, int] = {  # 체인별 최대 생성 토큰 수
+        "classifier": 30,
+        "indicator": 600,
+        "stock": 500,
+        "rag": 800,
+        "general": 600
+    }
+    llm_prices: Dict[str, List[float]] = {  # 모델별 100만 토큰당 가격 (USD, [입력, 출력, 캐시된 입력]) - 접두어 일치
+        "gpt-4o-mini": [0.15, 0.60, 0.075],
+        "gpt-4o": [2.50, 10.00, 1.25],
+        "gpt-4.1-nano": [0.10, 0.40, 0.025],
+        "gpt-4.1-mini": [0.40, 1.60, 0.10],
+        "gpt-4.1": [2.00, 8.00, 0.50]
+    }
+    llm_prompt_cache_key: str = "investai"  # 프롬프트 캐시 라우팅 키 접두어 (체인 이름이 붙음, 비우면 보내지 않음)
+
+    # OpenAI 호출 한도 (프로세스 전체, 워커가 여러 개면 워커 수로 나눠 적용 / 0이면 제한 없음)
+    openai_rpm_limit: int = 500  # 분당 요청 수
+    openai_tpm_limit: int = 200000  # 분당 토큰 수 (입력 + 최대 출력 기준으로 예약 후 실제 사용량으로 정산)
+    llm_queue_max_depth: int = 50  # 한도 대기열 최대 길이 (초과 시 503)
+    llm_queue_max_wait_seconds: float = 20.0  # 예상 대기 시간이 이보다 길면 바로 503 (Retry-After)
+
+    # /ai/query 요청 마감 시간 (예산이 바닥나면 규칙 기반 분류/시세/지표표/리포트 발췌로 대체)
+    query_deadline_seconds: float = 20.0  # 요청당 시간 예산 (요청의 deadline_seconds는 이 값 이하로만 허용)
+    deadline_classifier_seconds: float = 4.0  # 분류 LLM 최대 시간 (넘으면 규칙 기반 분류)
+    deadline_llm_min_seconds: float = 2.0  # 남은 시간이 이보다 짧으면 LLM 호출을 시작하지 않음
+    deadline_reserve_seconds: float = 0.3  # 부분 결과 조립/응답용으로 남겨두는 시간
     
     # FastAPI 서버 설정
     host: str = "0.0.0.0"  # 모든 네트워크 인터페이스에서 접근 가능
@@ -18,6 +55,48 @@ class Settings(BaseSettings):
 
     # Backend API URL (Env: BACKEND_URL)
     backend_url: str = "http://backend-svc:8080" # Default for K8s
+    indicator_cache_ttl_seconds: int = 3600  # 경제지표 캐시 유효 시간 (1시간)
+    indicator_refresh_interval_seconds: int = 1800  # 경제지표 백그라운드 갱신 주기 (30분)
+    indicator_history_path: str = "./data/indicator_history.sqlite"  # 경제지표 일별 이력 저장 파일 (추세 계산용)
+    indicator_history_days: int = 400  # 보관할 이력 기간 (일, 1년 대비 변화 계산 + 여유)
+    indicator_trend_cache_seconds: int = 60  # 추세 계산 결과 재사용 시간 (초)
+    stock_resolver_refresh_hours: int = 24  # 종목명 리졸버 재적재 주기 (시간)
+    
+    # 멀티 워커 설정
+    workers: int = 1  # uvicorn 워커 수 (python main.py로 실행 시 적용)
+    shared_cache_backend: str = "memory"  # 워커 간 공유 캐시 ("memory", "file", "redis")
+    shared_cache_dir: str = "/dev/shm/ai-service"  # file 백엔드 및 리더 락 디렉터리
+    shared_cache_url: str = "redis://localhost:6379/0"  # redis 백엔드 주소
+    shared_cache_wait_seconds: float = 10.0  # 다른 워커가 갱신 중일 때 최대 대기 시간
+    shared_follower_sync_seconds: int = 300  # 리더가 아닌 워커가 공유 데이터를 다시 읽는 주기
+    
+    # 응답 압축 (Accept-Encoding에 따라 brotli/gzip, brotli는 패키지가 설치된 경우만)
+    response_compression_min_bytes: int = 1024  # 이보다 작은 응답은 압축하지 않음
+    response_gzip_level: int = 5  # 요청마다 압축하는 응답의 gzip 레벨 (1~9, 캐시된 대시보드는 미리 최고 레벨로 압축)
+    response_brotli_quality: int = 4  # 요청마다 압축하는 응답의 brotli 품질 (0~11)
+    
+    # 서버 기동/워밍업 설정
+    startup_warmups: List[str] = ["chains", "tokenizer", "retriever", "ticker_names", "market_snapshot"]  # 준비 완료 전 실행할 워밍업
+    startup_warmup_timeout_seconds: int = 120  # 워밍업 1회 최대 대기 시간 (초과하면 실패로 보고 재시도)
+    startup_warmup_retry_seconds: float = 15.0  # 실패/시간 초과한 워밍업 재시도 간격
+    startup_required_warmups: List[str] = ["chains"]  # 성공할 때까지 준비 안 됨 상태를 유지하는 워밍업
+    startup_warmup_max_attempts: int = 3  # 그 밖의 워밍업 최대 시도 횟수 (넘으면 degraded로 준비 완료)
+    
+    # Spring Boot 클라이언트 설정
+    spring_http2: bool = True  # HTTP/2 사용 (h2 패키지 필요, 없으면 HTTP/1.1)
+    spring_max_connections: int = 50  # 커넥션 풀 최대 연결 수
+    spring_max_keepalive_connections: int = 20  # 유지할 keep-alive 연결 수
+    spring_connect_timeout: float = 2.0  # 연결 타임아웃 (초)
+    spring_default_timeout: float = 5.0  # 기본 요청 타임아웃 (초)
+    spring_timeouts: Dict[str, float] = {  # 엔드포인트별 타임아웃 (초)
+        "indicators": 5.0,
+        "stock_search": 2.0,
+        "stocks": 20.0
+    }
+    spring_max_retries: int = 2  # 멱등 GET 재시도 횟수
+    spring_retry_backoff_seconds: float = 0.2  # 재시도 기본 백오프 (지수 증가 + 지터)
+    spring_hedge_delay_ms: int = 0  # 헤징 요청 지연 (0 = 사용 안 함)
+    spring_hedged_endpoints: List[str] = ["stock_search"]  # 헤징 대상 엔드포인트
 
     
     # Pinecone 설정 (Permanent Free Tier)
@@ -25,14 +104,71 @@ class Settings(BaseSettings):
     pinecone_index_name: str = "robo-advisor-reports"  # Pinecone Index 이름
     pinecone_environment: str = "us-east-1"  # Pinecone 환경 (지역)
     
+    # 답변 캐시 설정 (데이터 버전 기반)
+    answer_cache_max_entries: int = 1000  # 최대 캐시 항목 수
+    answer_cache_ttl_seconds: int = 21600  # 항목 유효 시간 (6시간)
+    
+    # 세션 대화 메모리 (후속 질문 맥락/종목 재사용)
+    session_max_sessions: int = 5000  # 최대 세션 수 (초과 시 LRU 제거)
+    session_max_turns: int = 6  # 세션당 보관 턴 수 (0이면 비활성화)
+    session_idle_seconds: int = 1800  # 유휴 세션 만료 시간 (30분)
+    session_answer_tokens: int = 80  # 턴마다 저장할 질문/답변 앞부분 토큰 수
+    session_context_tokens: int = 400  # 후속 질문 프롬프트에 넣을 이전 대화 최대 토큰 수
+    
+    # 장 마감 후 브리핑 (시가총액/질문 상위 종목 + 시장 전망을 미리 생성해 일반 질문에 바로 제공)
+    briefing_enabled: bool = True
+    briefing_run_time: str = "16:10"  # 생성 시각 (서버 로컬 시간, 평일, 장 마감 15:30 이후 종가 확정 뒤)
+    briefing_top_market_cap: int = 20  # 시가총액 상위 종목 수
+    briefing_top_queried: int = 20  # 당일 질문이 많은 종목 수
+    briefing_concurrency: int = 4  # 동시 생성 수 (LLM은 BACKGROUND 우선순위로 호출)
+    briefing_ttl_seconds: int = 345600  # 브리핑 유효 시간 (4일 - 주말/연휴 대비, 데이터가 바뀌면 자연히 미적중)
+    
+    # 기술적 지표 (utils.technicals - 이동평균/RSI/변동성/거래량 z-score/52주 범위)
+    technicals_history_days: int = 260  # 계산에 쓰는 최근 거래일 수 (52주 + 여유)
+    technicals_cache_ttl_seconds: int = 600  # 종목별 시세 이력 캐시 유효 시간 (장중 당일 봉 갱신 고려)
+    technicals_cache_max_entries: int = 500  # 캐시할 최대 종목 수
+    technicals_fetch_concurrency: int = 8  # 여러 종목 이력 동시 조회 수
+    
+    # 포트폴리오 분석 (/api/portfolio/analytics - 기술적 지표와 같은 시세 이력 캐시 사용)
+    portfolio_max_tickers: int = 50  # 요청당 최대 종목 수
+    portfolio_default_days: int = 252  # 기본 분석 기간 (거래일, 1년)
+    
     # 로깅 설정
     log_level: str = "INFO"  # 로그 레벨
-    log_file: str = "./logs/app.log"  # 로그 파일 경로
+    log_file: str = "./logs/app.log"  # 로그 파일 경로 (워커가 여러 개면 워커별 app.<pid>.log)
+    log_format: str = "text"  # 로그 형식 ("text" 또는 "json")
+    log_max_bytes: int = 10 * 1024 * 1024  # 로그 파일 로테이션 크기 (10MB)
+    log_backup_count: int = 5  # 보관할 로테이션 파일 수
+    log_queue_size: int = 10000  # 비동기 로그 큐 크기 (가득 차면 버림)
+    log_sample_every: int = 10  # 샘플링 대상 로그는 N개 중 1개만 기록
+    
+    # 트레이싱 설정
+    tracing_enabled: bool = True  # 요청별 단계 트레이스 기록 (debug 응답의 timings도 트레이스 사용)
+    trace_sample_rate: float = 0.05  # 내보낼 트레이스 비율 (0~1, 5xx 응답은 항상 내보냄)
+    trace_file: str = "./logs/traces.jsonl"  # 트레이스 파일 경로 (수집기 미설정 시, 멀티 워커면 워커별 traces.<pid>.jsonl)
+    trace_max_bytes: int = 20 * 1024 * 1024  # 트레이스 파일 로테이션 크기 (20MB)
+    trace_backup_count: int = 3  # 보관할 로테이션 파일 수
+    trace_collector_url: str = ""  # 트레이스 수집기 URL (설정 시 파일 대신 HTTP POST)
+    
+    # 녹화/재생 설정 (오프라인 프로파일링/벤치마크)
+    replay_mode: str = "off"  # "off", "record"(실제 호출 녹화), "replay"(녹화 데이터로 응답)
+    replay_path: str = "./replay/recordings.sqlite"  # 녹화 저장 파일
+    replay_latency_scale: float = 1.0  # 재생 지연 배율 (1.0 = 원래 지연, 0 = 즉시)
+    replay_ignore_dates: bool = True  # 호출 키에서 날짜를 무시 (다른 날에도 재생 가능)
     
     # 임베딩 설정
     embedding_model: str = "text-embedding-3-small"  # OpenAI 임베딩 모델
     chunk_size: int = 500  # 텍스트 청킹 크기 (토큰 단위)
     chunk_overlap: int = 50  # 청크 간 오버랩 (문맥 유지)
+    ingest_batch_size: int = 100  # 적재 시 한 번에 분할할 페이지 수
+    embed_batch_size: int = 64  # 한 번에 임베딩/업로드할 청크 수
+    split_workers: int = 0  # 텍스트 분할 병렬 워커 수 (0 = CPU 코어 수)
+    split_parallel_min_docs: int = 32  # 이 문서 수 이상일 때만 병렬 분할
+    
+    # RAG 컨텍스트 설정
+    rag_top_k: int = 5  # 검색할 청크 수 (중복 제거/예산 적용 전)
+    rag_context_token_budget: int = 1500  # 컨텍스트 기본 토큰 예산
+    rag_context_budgets: Dict[str, int] = {}  # 카테고리별 예산 (예: {"analyst_report": 2000})
     
     class Config:
         env_file = ".env"  # .env 파일에서 자동 로드
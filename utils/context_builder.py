@@ -0,0 +1,131 @@
+"""
+RAG 컨텍스트 조립 모듈
+검색된 청크를 중복 제거 후 토큰 예산에 맞춰 잘라 프롬프트 컨텍스트로 구성
+"""
+from langchain_core.documents import Document
+from typing import Dict, List, Optional, Tuple
+from utils.config import settings
+from utils.logger import logger
+from utils.tokenizer import count_tokens, truncate_tokens
+
+# 청크 간 오버랩으로 판단할 최소 문자 수 (너무 짧은 일치는 우연으로 간주)
+MIN_OVERLAP_CHARS = 20
+
+# 예산이 이만큼도 안 남으면 청크를 잘라 넣지 않고 중단
+MIN_PARTIAL_TOKENS = 50
+
+def get_context_budget(category: Optional[str] = None) -> int:
+    """
+    카테고리별 컨텍스트 토큰 예산 조회
+
+    Args:
+        category: 질문 카테고리 (예: "analyst_report")
+
+    Returns:
+        토큰 예산 (카테고리 설정이 없으면 기본 예산)
+    """
+    if category and category in settings.rag_context_budgets:
+        return settings.rag_context_budgets[category]
+    return settings.rag_context_token_budget
+
+def _normalize(text: str) -> str:
+    """비교용 공백 정규화"""
+    return " ".join(text.split())
+
+def _strip_overlap(previous: str, text: str) -> str:
+    """
+    previous의 끝부분과 겹치는 text의 앞부분 제거
+    (RecursiveCharacterTextSplitter의 chunk_overlap으로 생긴 중복)
+    """
+    max_len = min(len(previous), len(text))
+    for size in range(max_len, MIN_OVERLAP_CHARS - 1, -1):
+        if previous.endswith(text[:size]):
+            return text[size:].lstrip()
+    return text
+
+def deduplicate_documents(documents: List[Document]) -> List[Document]:
+    """
+    중복/오버랩 청크 제거 (검색 순위 유지)
+
+    - 정규화 후 완전히 같거나 이미 선택된 청크에 포함된 청크는 제외
+    - 같은 출처 청크와 앞뒤로 겹치는 부분은 잘라냄
+
+    Args:
+        documents: 검색된 Document 리스트 (유사도 순)
+
+    Returns:
+        중복이 제거된 Document 리스트
+    """
+    selected: List[Document] = []
+    normalized_texts: List[str] = []
+
+    for doc in documents:
+        text = _normalize(doc.page_content)
+        if not text:
+            continue
+        if any(text in seen for seen in normalized_texts):
+            continue
+
+        source = doc.metadata.get("source") or doc.metadata.get("title")
+        for prev_doc, prev_text in zip(selected, normalized_texts):
+            prev_source = prev_doc.metadata.get("source") or prev_doc.metadata.get("title")
+            if source and source == prev_source:
+                text = _strip_overlap(prev_text, text)
+        if not text:
+            continue
+
+        selected.append(Document(page_content=text, metadata=doc.metadata))
+        normalized_texts.append(text)
+
+    return selected
+
+def build_context(
+    documents: List[Document],
+    category: Optional[str] = None,
+    model: Optional[str] = None
+) -> Tuple[str, List[Document], Dict[str, int]]:
+    """
+    토큰 예산 안에서 RAG 컨텍스트 문자열 생성
+
+    Args:
+        documents: 검색된 Document 리스트 (유사도 순)
+        category: 질문 카테고리 (예산 선택용)
+        model: 토큰 기준 모델명 (기본: settings.openai_model)
+
+    Returns:
+        (컨텍스트 문자열, 실제 사용된 Document 리스트, 통계 딕셔너리)
+    """
+    model = model or settings.openai_model
+    budget = get_context_budget(category)
+    unique_docs = deduplicate_documents(documents)
+
+    used_docs: List[Document] = []
+    used_tokens = 0
+    for doc in unique_docs:
+        remaining = budget - used_tokens
+        tokens = count_tokens(doc.page_content, model)
+
+        if tokens > remaining:
+            if remaining < MIN_PARTIAL_TOKENS:
+                break
+            doc = Document(
+                page_content=truncate_tokens(doc.page_content, remaining, model),
+                metadata=doc.metadata
+            )
+            tokens = remaining
+
+        used_docs.append(doc)
+        used_tokens += tokens
+
+    # stuff 체인과 동일한 구분자로 결합
+    context = "\n\n".join(doc.page_content for doc in used_docs)
+
+    stats = {
+        "retrieved": len(documents),
+        "deduplicated": len(unique_docs),
+        "used": len(used_docs),
+        "context_tokens": used_tokens,
+        "budget": budget
+    }
+    logger.info(f"RAG 컨텍스트 조립: {stats}")
+    return context, used_docs, stats
@@ -1,66 +1,141 @@
 """
 문서 로딩 모듈
 PDF, CSV, JSON 등 다양한 형식의 문서를 LangChain 형식으로 로드
+(iter_* 함수는 페이지/행/항목 단위로 지연 생성하여 메모리 사용량을 일정하게 유지)
 """
 from langchain_community.document_loaders import PyPDFLoader, CSVLoader
 from langchain_core.documents import Document
-from typing import List
-import json
+from typing import Iterator, List
+import glob
+import ijson
+import os
 from utils.logger import logger
 
+def iter_pdf(file_path: str) -> Iterator[Document]:
+    """
+    PDF 파일을 페이지 단위로 지연 로드
+
+    Args:
+        file_path: PDF 파일 경로
+
+    Yields:
+        페이지별 Document 객체
+    """
+    logger.info(f"PDF 로딩 시작: {file_path}")
+    loader = PyPDFLoader(file_path)
+    count = 0
+    for document in loader.lazy_load():  # 각 페이지가 하나의 Document
+        count += 1
+        yield document
+    logger.info(f"PDF 로딩 완료: {count}개 페이지")
+
+def iter_csv(file_path: str) -> Iterator[Document]:
+    """
+    CSV 파일을 행 단위로 지연 로드
+
+    Args:
+        file_path: CSV 파일 경로
+
+    Yields:
+        행별 Document 객체
+    """
+    logger.info(f"CSV 로딩 시작: {file_path}")
+    loader = CSVLoader(file_path)
+    count = 0
+    for document in loader.lazy_load():  # 각 행이 하나의 Document
+        count += 1
+        yield document
+    logger.info(f"CSV 로딩 완료: {count}개 행")
+
+def iter_json(file_path: str) -> Iterator[Document]:
+    """
+    JSON 배열 파일을 항목 단위로 지연 로드 (ijson 증분 파싱)
+
+    Args:
+        file_path: JSON 파일 경로 (최상위가 배열인 형식)
+
+    Yields:
+        항목별 Document 객체
+    """
+    logger.info(f"JSON 로딩 시작: {file_path}")
+    count = 0
+    with open(file_path, 'rb') as f:
+        # "item": 최상위 배열의 각 원소를 하나씩 파싱
+        for item in ijson.items(f, 'item', use_float=True):
+            if not isinstance(item, dict):
+                continue
+            content = item.get('content', str(item))
+            metadata = {k: v for k, v in item.items() if k != 'content'}
+            count += 1
+            yield Document(page_content=content, metadata=metadata)
+    logger.info(f"JSON 로딩 완료: {count}개 항목")
+
+def iter_pdfs_from_directory(directory: str) -> Iterator[Document]:
+    """
+    디렉토리의 모든 리포트 PDF를 페이지 단위로 지연 로드 (파일명 메타데이터 포함)
+
+    파일명 형식: "증권사_종목_날짜.pdf" (예: "NH투자증권_삼성전자_20251015.pdf")
+
+    Args:
+        directory: PDF 디렉토리 경로
+
+    Yields:
+        메타데이터가 채워진 페이지별 Document 객체
+    """
+    pdf_files = sorted(glob.glob(os.path.join(directory, "*.pdf")))
+    logger.info(f"총 {len(pdf_files)}개의 PDF 파일 발견: {directory}")
+
+    for pdf_file in pdf_files:
+        filename = os.path.basename(pdf_file)
+        parts = filename.replace('.pdf', '').split('_')
+
+        try:
+            for doc in iter_pdf(pdf_file):
+                doc.metadata = {
+                    "title": filename,
+                    "securities_firm": parts[0] if len(parts) > 0 else "Unknown",
+                    "company": parts[1] if len(parts) > 1 else "Unknown",
+                    "date": parts[2] if len(parts) > 2 else "Unknown",
+                    "page": doc.metadata.get("page", 0),
+                    "source": pdf_file
+                }
+                yield doc
+        except Exception as e:
+            # 손상된 PDF 하나 때문에 전체 적재가 중단되지 않도록 건너뜀
+            logger.error(f"PDF 로딩 실패, 건너뜀 ({pdf_file}): {e}")
+
 def load_pdf(file_path: str) -> List[Document]:
     """
     PDF 파일을 로드하여 Document 리스트로 반환
-    
+
     Args:
         file_path: PDF 파일 경로
-    
+
     Returns:
         Document 객체 리스트
     """
-    logger.info(f"PDF 로딩 시작: {file_path}")
-    loader = PyPDFLoader(file_path)
-    documents = loader.load()  # 각 페이지가 하나의 Document
-    logger.info(f"PDF 로딩 완료: {len(documents)}개 페이지")
-    return documents
+    return list(iter_pdf(file_path))
 
 def load_csv(file_path: str) -> List[Document]:
     """
     CSV 파일을 로드하여 Document 리스트로 반환
-    
+
     Args:
         file_path: CSV 파일 경로
-    
+
     Returns:
         Document 객체 리스트
     """
-    logger.info(f"CSV 로딩 시작: {file_path}")
-    loader = CSVLoader(file_path)
-    documents = loader.load()  # 각 행이 하나의 Document
-    logger.info(f"CSV 로딩 완료: {len(documents)}개 행")
-    return documents
+    return list(iter_csv(file_path))
 
 def load_json(file_path: str) -> List[Document]:
     """
     JSON 파일을 로드하여 Document 리스트로 반환
-    
+
     Args:
         file_path: JSON 파일 경로
-    
+
     Returns:
         Document 객체 리스트
     """
-    logger.info(f"JSON 로딩 시작: {file_path}")
-    with open(file_path, 'r', encoding='utf-8') as f:
-        data = json.load(f)
-    
-    # JSON 데이터를 Document로 변환
-    documents = []
-    if isinstance(data, list):
-        for item in data:
-            content = item.get('content', str(item))
-            metadata = {k: v for k, v in item.items() if k != 'content'}
-            documents.append(Document(page_content=content, metadata=metadata))
-    
-    logger.info(f"JSON 로딩 완료: {len(documents)}개 항목")
-    return documents
+    return list(iter_json(file_path))
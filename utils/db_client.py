@@ -5,17 +5,26 @@ Pinecone 벡터 DB 클라이언트 모듈
 from pinecone import Pinecone, ServerlessSpec
 from langchain_pinecone import PineconeVectorStore
 from langchain_core.documents import Document
-from typing import List
+from functools import lru_cache
+from typing import Iterable, List
 from utils.embedder import get_embeddings
 from utils.config import settings
 from utils.logger import logger
 
-# Pinecone 클라이언트 초기화
-pc = Pinecone(api_key=settings.pinecone_api_key)
+@lru_cache(maxsize=1)
+def get_pinecone_client() -> Pinecone:
+    """
+    Pinecone 클라이언트 (첫 사용 시 생성, 이후 재사용)
+    
+    Returns:
+        Pinecone 객체
+    """
+    return Pinecone(api_key=settings.pinecone_api_key)
 
+@lru_cache(maxsize=1)
 def get_vectorstore():
     """
-    기존 Pinecone 벡터스토어 로드
+    기존 Pinecone 벡터스토어 로드 (첫 호출 시 연결, 이후 재사용 - 서버 워밍업에서 미리 호출)
     
     Returns:
         PineconeVectorStore 객체
@@ -32,20 +41,12 @@ def get_vectorstore():
     logger.info(f"Pinecone 벡터스토어 로드 완료: {settings.pinecone_index_name}")
     return vectorstore
 
-def create_vectorstore(documents: List[Document]):
+def ensure_index():
     """
-    새로운 Pinecone 벡터스토어 생성 및 문서 업로드
-    
-    Args:
-        documents: Document 리스트
-    
-    Returns:
-        PineconeVectorStore 객체
+    Pinecone Index가 없으면 생성
     """
-    logger.info(f"Pinecone 벡터스토어 생성 시작: {len(documents)}개 문서")
-    
-    # Index 존재 여부 확인
     index_name = settings.pinecone_index_name
+    pc = get_pinecone_client()
     
     if index_name not in pc.list_indexes().names():
         logger.info(f"Index '{index_name}' 생성 중...")
@@ -59,6 +60,21 @@ def create_vectorstore(documents: List[Document]):
             )
         )
         logger.info(f"Index '{index_name}' 생성 완료")
+
+def create_vectorstore(documents: List[Document]):
+    """
+    새로운 Pinecone 벡터스토어 생성 및 문서 업로드
+    
+    Args:
+        documents: Document 리스트
+    
+    Returns:
+        PineconeVectorStore 객체
+    """
+    logger.info(f"Pinecone 벡터스토어 생성 시작: {len(documents)}개 문서")
+    
+    ensure_index()
+    index_name = settings.pinecone_index_name
     
     embeddings = get_embeddings()
     
@@ -73,6 +89,35 @@ def create_vectorstore(documents: List[Document]):
     logger.info(f"Pinecone 벡터스토어 생성 완료: {index_name}")
     return vectorstore
 
+def upload_document_batches(batches: Iterable[List[Document]]) -> int:
+    """
+    청크 배치 스트림을 순차적으로 임베딩하여 Pinecone에 업로드
+    (한 번에 한 배치만 메모리에 유지)
+    
+    Args:
+        batches: Document 리스트 이터러블 (split_document_stream 결과)
+    
+    Returns:
+        업로드된 청크 수
+    """
+    ensure_index()
+    vectorstore = get_vectorstore()
+    
+    total = 0
+    for batch in batches:
+        if not batch:
+            continue
+        vectorstore.add_documents(
+            batch,
+            batch_size=settings.embed_batch_size,
+            embedding_chunk_size=settings.embed_batch_size
+        )
+        total += len(batch)
+        logger.info(f"Pinecone 업로드 진행: 누적 {total}개 청크")
+    
+    logger.info(f"Pinecone 업로드 완료: {total}개 청크")
+    return total
+
 def get_index_stats():
     """
     Pinecone Index 통계 정보 조회
@@ -80,7 +125,7 @@ def get_index_stats():
     Returns:
         dict: Index 통계 (벡터 개수, namespace 등)
     """
-    index = pc.Index(settings.pinecone_index_name)
+    index = get_pinecone_client().Index(settings.pinecone_index_name)
     stats = index.describe_index_stats()
     logger.info(f"Pinecone Index 통계: {stats}")
     return stats
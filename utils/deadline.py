@@ -0,0 +1,91 @@
+"""
+요청 마감 시간(deadline) 모듈
+/ai/query 요청마다 시간 예산을 두고 분류 → 데이터 조회 → LLM 단계에 전파해서
+예산이 바닥나면 해당 단계를 포기하고 그때까지 모은 데이터로 답변 (응답 시간 상한 보장)
+
+사용 예:
+    with request_deadline(20.0):
+        data = await within_deadline(fetch(), "market_data")
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Awaitable, List, Optional, TypeVar
+import asyncio
+import inspect
+import time
+from utils.logger import logger
+from utils.metrics import DEADLINE_DEGRADED
+
+T = TypeVar("T")
+
+class DeadlineExceeded(Exception):
+    """단계가 요청 마감 시간 안에 끝나지 못함 (호출 측에서 부분 결과로 대체)"""
+
+    def __init__(self, stage: str):
+        self.stage = stage
+        super().__init__(f"요청 마감 시간 초과 ({stage})")
+
+# 현재 요청의 마감 시각(time.monotonic 기준)과 축소 처리된 단계 목록
+_deadline: ContextVar[Optional[float]] = ContextVar("request_deadline", default=None)
+_degraded: ContextVar[Optional[List[str]]] = ContextVar("degraded_stages", default=None)
+
+@contextmanager
+def request_deadline(seconds: float):
+    """블록 안의 작업에 마감 시간 설정"""
+    deadline_token = _deadline.set(time.monotonic() + seconds)
+    degraded_token = _degraded.set([])
+    try:
+        yield
+    finally:
+        _deadline.reset(deadline_token)
+        _degraded.reset(degraded_token)
+
+def remaining() -> Optional[float]:
+    """남은 시간 (초, 마감 시간이 없으면 None)"""
+    deadline = _deadline.get()
+    return None if deadline is None else deadline - time.monotonic()
+
+def mark_degraded(stage: str):
+    """단계를 포기하고 부분 결과로 대체했음을 기록 (응답의 degraded 필드, 메트릭)"""
+    DEADLINE_DEGRADED.labels(stage=stage).inc()
+    stages = _degraded.get()
+    if stages is not None and stage not in stages:
+        stages.append(stage)
+    logger.warning(f"⏱️ 마감 시간 부족으로 {stage} 단계 축소 (남은 시간 {remaining() or 0:.2f}초)")
+
+def degraded_stages() -> List[str]:
+    return list(_degraded.get() or [])
+
+async def within_deadline(
+    awaitable: Awaitable[T],
+    stage: str,
+    reserve: float = 0.0,
+    cap: Optional[float] = None,
+    min_seconds: float = 0.0
+) -> T:
+    """
+    마감 시간 안에서 실행 (마감 시간이 없으면 cap만 적용)
+
+    Args:
+        awaitable: 실행할 코루틴/퓨처
+        stage: 단계 이름 (로그/메트릭용)
+        reserve: 이후 단계(부분 결과 조립 등)를 위해 남겨둘 시간 (초)
+        cap: 이 단계에 쓸 최대 시간 (초)
+        min_seconds: 남은 시간이 이보다 짧으면 시작하지 않음 (예: 끝나지 못할 LLM 호출)
+
+    Raises:
+        DeadlineExceeded: 시간이 부족하거나 시간 안에 끝나지 않음
+    """
+    left = remaining()
+    timeout = None if left is None else left - reserve
+    if cap is not None:
+        timeout = cap if timeout is None else min(timeout, cap)
+
+    if timeout is not None and timeout <= max(min_seconds, 0.0):
+        if inspect.iscoroutine(awaitable):
+            awaitable.close()  # 시작하지 않은 코루틴 정리 (never awaited 경고 방지)
+        raise DeadlineExceeded(stage)
+    try:
+        return await asyncio.wait_for(awaitable, timeout=timeout)
+    except asyncio.TimeoutError:
+        raise DeadlineExceeded(stage) from None
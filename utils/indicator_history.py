@@ -0,0 +1,252 @@
+"""
+경제지표 이력/추세 모듈
+Spring Boot의 /api/indicators/latest는 최신 값만 주므로, 조회할 때마다 지표별 수치를 일별로 기록해 두고
+전일/30일/1년 대비 변화, 90일 평균, 추세·국면 플래그를 NumPy로 계산
+
+- 값은 "3.50%", "1,385.2원", "3,900조원" 같은 문자열에서 첫 번째 숫자를 추출 (숫자가 없으면 추세 없이 원문만 사용)
+- 같은 날 여러 번 조회하면 마지막 값으로 덮어씀 (지표 × 날짜당 1건)
+- 이력은 SQLite 파일에 저장 (재시작 후에도 유지, 같은 Pod의 워커끼리 공유)
+- 프롬프트에는 digest()의 지표당 한 줄 요약만 넣음
+"""
+from datetime import datetime
+from functools import lru_cache
+from typing import Any, Dict, List, Optional, Tuple
+import os
+import re
+import sqlite3
+import threading
+import time
+from utils.config import settings
+from utils.logger import logger
+from utils.lazy import lazy_import
+
+np = lazy_import("numpy")
+
+_NUMBER = re.compile(r"[-+]?\d[\d,]*(?:\.\d+)?")
+
+AVERAGE_DAYS = 90  # 이동평균 기간 (일)
+MONTH_DAYS = 30
+YEAR_DAYS = 365
+FLAT_RATIO = 0.005  # 30일 변화가 값의 0.5% 미만이면 보합
+
+def parse_number(value: Any) -> Optional[float]:
+    """지표 값에서 수치 추출 (예: "1,385.2원" → 1385.2, 없으면 None)"""
+    if isinstance(value, bool):
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    if not isinstance(value, str):
+        return None
+    match = _NUMBER.search(value)
+    if match is None:
+        return None
+    try:
+        return float(match.group().replace(",", ""))
+    except ValueError:
+        return None
+
+def _as_of(dates, values, day: int) -> Optional[float]:
+    """day(ordinal) 시점에 유효했던 값 (그 이전 마지막 관측값, 없으면 None)"""
+    index = int(np.searchsorted(dates, day, side="right")) - 1
+    return float(values[index]) if index >= 0 else None
+
+def compute_trend(dates, values, today: int) -> Dict[str, Any]:
+    """
+    지표 하나의 추세 계산
+
+    Args:
+        dates: 관측 날짜 (date.toordinal, 오름차순)
+        values: 관측 값
+        today: 기준 날짜 (ordinal)
+
+    Returns:
+        latest, change_1d, change_30d, change_1y, average_90d, high_1y, low_1y, trend, flags
+    """
+    latest = float(values[-1])
+    previous = float(values[-2]) if len(values) > 1 else None
+    month_ago = _as_of(dates, values, today - MONTH_DAYS)
+    year_ago = _as_of(dates, values, today - YEAR_DAYS)
+
+    # 관측이 없는 날은 직전 값으로 채운 일별 값으로 평균/범위 계산
+    grid = np.arange(max(dates[0], today - YEAR_DAYS + 1), today + 1)
+    daily = values[np.searchsorted(dates, grid, side="right") - 1]
+    recent = daily[-AVERAGE_DAYS:]
+    average = float(recent.mean())
+    high, low = float(daily.max()), float(daily.min())
+
+    change_30d = None if month_ago is None else latest - month_ago
+    trend = None
+    if change_30d is not None:
+        if abs(change_30d) < abs(latest) * FLAT_RATIO:
+            trend = "보합"
+        else:
+            trend = "상승" if change_30d > 0 else "하락"
+
+    flags: List[str] = []
+    if len(daily) >= AVERAGE_DAYS and not np.isclose(latest, average):
+        if latest > average:
+            flags.append("90일 평균 상회")
+        elif latest < average:
+            flags.append("90일 평균 하회")
+    if year_ago is not None and high > low:
+        if latest >= high:
+            flags.append("1년 최고")
+        elif latest <= low:
+            flags.append("1년 최저")
+
+    return {
+        "latest": latest,
+        "change_1d": None if previous is None else round(latest - previous, 4),
+        "change_30d": None if change_30d is None else round(change_30d, 4),
+        "change_1y": None if year_ago is None else round(latest - year_ago, 4),
+        "average_90d": round(average, 4) if len(daily) >= AVERAGE_DAYS else None,
+        "high_1y": high,
+        "low_1y": low,
+        "observations": int(len(values)),
+        "trend": trend,
+        "flags": flags
+    }
+
+def _signed(value: float) -> str:
+    return f"{value:+,.4g}" if abs(value) < 1000 else f"{value:+,.0f}"
+
+class IndicatorHistory:
+    """경제지표 일별 이력 저장소 (SQLite) + 추세 계산 결과 캐시"""
+
+    def __init__(self, path: str, keep_days: int = 400, cache_seconds: float = 60):
+        """
+        초기화
+
+        Args:
+            path: SQLite 파일 경로
+            keep_days: 보관 기간 (일)
+            cache_seconds: 추세 계산 결과 재사용 시간 (초)
+        """
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self.keep_days = keep_days
+        self.cache_seconds = cache_seconds
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=5)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS observations ("
+            "name TEXT NOT NULL, day INTEGER NOT NULL, value REAL NOT NULL, "
+            "raw TEXT, recorded_at REAL NOT NULL, PRIMARY KEY (name, day))"
+        )
+        self._conn.commit()
+        self._lock = threading.Lock()
+        self._trends: Optional[Tuple[float, Dict[str, Dict[str, Any]]]] = None
+
+    def record(self, indicators: Dict[str, Any], now: Optional[datetime] = None) -> int:
+        """
+        조회한 경제지표를 오늘 날짜로 기록 (숫자로 읽을 수 없는 값은 건너뜀)
+
+        Args:
+            indicators: Spring Boot 경제지표 딕셔너리
+            now: 기록 시각 (기본: 현재)
+
+        Returns:
+            기록한 지표 수
+        """
+        now = now or datetime.now()
+        day = now.toordinal()
+        rows = []
+        for name, raw in (indicators or {}).items():
+            value = parse_number(raw)
+            if value is not None:
+                rows.append((name, day, value, str(raw), time.time()))
+        if not rows:
+            return 0
+        with self._lock:
+            self._conn.executemany("INSERT OR REPLACE INTO observations VALUES (?, ?, ?, ?, ?)", rows)
+            self._conn.execute("DELETE FROM observations WHERE day < ?", (day - self.keep_days,))
+            self._conn.commit()
+            self._trends = None
+        return len(rows)
+
+    def _series(self) -> Dict[str, Tuple[List[int], List[float]]]:
+        with self._lock:
+            rows = self._conn.execute("SELECT name, day, value FROM observations ORDER BY name, day").fetchall()
+        series: Dict[str, Tuple[List[int], List[float]]] = {}
+        for name, day, value in rows:
+            days, values = series.setdefault(name, ([], []))
+            days.append(day)
+            values.append(value)
+        return series
+
+    def trends(self) -> Dict[str, Dict[str, Any]]:
+        """
+        지표별 추세 (cache_seconds 동안 재사용 - 다른 워커가 기록한 값은 그 뒤에 반영)
+
+        Returns:
+            지표 이름 → compute_trend 결과
+        """
+        cached = self._trends
+        if cached is not None and time.monotonic() - cached[0] < self.cache_seconds:
+            return cached[1]
+        today = datetime.now().toordinal()
+        trends = {
+            name: compute_trend(np.asarray(days), np.asarray(values, dtype=float), today)
+            for name, (days, values) in self._series().items()
+        }
+        self._trends = (time.monotonic(), trends)
+        return trends
+
+    def digest(self, indicators: Dict[str, Any]) -> str:
+        """
+        프롬프트용 경제지표 요약 (지표당 한 줄: 현재 값 + 변화/추세)
+
+        Args:
+            indicators: 최신 경제지표 딕셔너리
+
+        Returns:
+            "- 기준금리: 3.50% (30일 +0.25, 1년 -0.5, 추세 상승, 90일 평균 상회)" 형식 줄 목록
+        """
+        try:
+            trends = self.trends()
+        except Exception as e:
+            logger.error(f"경제지표 추세 계산 실패: {e}")
+            trends = {}
+        lines = []
+        for name, raw in indicators.items():
+            trend = trends.get(name)
+            parts = []
+            # 이력의 마지막 값이 지금 값과 다르면(아직 기록 전) 변화량이 어긋나므로 생략
+            if trend and trend["latest"] == parse_number(raw):
+                if trend["change_30d"] is not None:
+                    parts.append(f"30일 {_signed(trend['change_30d'])}")
+                if trend["change_1y"] is not None:
+                    parts.append(f"1년 {_signed(trend['change_1y'])}")
+                if trend["trend"]:
+                    parts.append(f"추세 {trend['trend']}")
+                parts.extend(trend["flags"])
+            suffix = f" ({', '.join(parts)})" if parts else ""
+            lines.append(f"- {name}: {raw}{suffix}")
+        return "\n".join(lines)
+
+    def summary(self, indicators: Optional[Dict[str, Any]] = None) -> List[Dict[str, Any]]:
+        """
+        API 응답용 지표별 추세 목록
+
+        Args:
+            indicators: 최신 경제지표 (있으면 원문 값과 순서를 따름)
+        """
+        trends = self.trends()
+        names = list(indicators) if indicators else sorted(trends)
+        result = []
+        for name in names:
+            item: Dict[str, Any] = {"name": name}
+            if indicators and name in indicators:
+                item["value"] = indicators[name]
+            item.update(trends.get(name) or {})
+            result.append(item)
+        return result
+
+@lru_cache(maxsize=1)
+def get_indicator_history() -> IndicatorHistory:
+    """전역 경제지표 이력 저장소 (첫 사용 시 파일 생성)"""
+    return IndicatorHistory(
+        settings.indicator_history_path,
+        keep_days=settings.indicator_history_days,
+        cache_seconds=settings.indicator_trend_cache_seconds
+    )
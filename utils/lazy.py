@@ -0,0 +1,62 @@
+"""
+지연 import 모듈
+pykrx, yfinance, pandas, langchain 등 import 비용이 큰 라이브러리를
+첫 속성 접근(또는 서버 워밍업) 시점에 import하여 서버 기동 시간을 줄임
+"""
+from types import ModuleType
+from typing import Any, Dict
+import importlib
+import threading
+import time
+
+# 모듈별 실제 import 소요 시간 (초) - /ready 응답에 포함
+import_timings: Dict[str, float] = {}
+
+_lock = threading.Lock()
+
+class LazyModule(ModuleType):
+    """첫 속성 접근 시 실제 모듈을 import하는 프록시 (사용법은 일반 모듈과 같음)"""
+
+    def __init__(self, name: str):
+        super().__init__(name)
+        self.__dict__["_module"] = None
+
+    def load(self) -> ModuleType:
+        """실제 모듈 import (이미 import되었으면 그대로 반환)"""
+        module = self.__dict__["_module"]
+        if module is None:
+            with _lock:
+                module = self.__dict__["_module"]
+                if module is None:
+                    started = time.perf_counter()
+                    module = importlib.import_module(self.__name__)
+                    import_timings[self.__name__] = round(time.perf_counter() - started, 3)
+                    self.__dict__["_module"] = module
+        return module
+
+    @property
+    def loaded(self) -> bool:
+        return self.__dict__["_module"] is not None
+
+    def __getattr__(self, name: str) -> Any:
+        return getattr(self.load(), name)
+
+    def __dir__(self):
+        return dir(self.load())
+
+    def __repr__(self) -> str:
+        state = "loaded" if self.loaded else "not loaded"
+        return f"<lazy module '{self.__name__}' ({state})>"
+
+def lazy_import(name: str) -> LazyModule:
+    """
+    지연 import 모듈 생성
+
+    사용 예:
+        stock = lazy_import("pykrx.stock")   # 여기서는 import하지 않음
+        stock.get_market_ohlcv(...)          # 첫 호출 시 import
+
+    Args:
+        name: 모듈 경로 (예: "pykrx.stock")
+    """
+    return LazyModule(name)
@@ -0,0 +1,69 @@
+"""
+LLM 클라이언트 생성 모듈
+모든 체인이 같은 방식(모델, API 키, 엔드포인트)으로 ChatOpenAI를 생성하도록 일원화
+체인별 모델 라우팅(settings.llm_models)과 생성 토큰 상한(settings.llm_max_tokens) 적용
+"""
+from typing import Optional
+from langchain_core.prompts import ChatPromptTemplate
+from langchain_openai import ChatOpenAI
+from utils.config import settings
+from utils import replay
+
+def get_model(chain: Optional[str] = None) -> str:
+    """
+    체인에 배정된 모델명 (settings.llm_models에 없으면 settings.openai_model)
+
+    Args:
+        chain: 체인 이름 (classifier, indicator, stock, rag, general)
+    """
+    return settings.llm_models.get(chain or "", settings.openai_model)
+
+def get_llm(temperature: float, chain: Optional[str] = None, **kwargs) -> ChatOpenAI:
+    """
+    ChatOpenAI 인스턴스 생성
+
+    Args:
+        temperature: 샘플링 온도
+        chain: 체인 이름 (모델 라우팅 및 max_tokens 상한 선택용)
+        **kwargs: ChatOpenAI 추가 인자
+
+    Returns:
+        ChatOpenAI 객체 (settings.openai_base_url이 있으면 해당 OpenAI 호환 서버 사용)
+    """
+    max_tokens = settings.llm_max_tokens.get(chain or "")
+    if max_tokens:
+        kwargs.setdefault("max_tokens", max_tokens)
+
+    if settings.llm_prompt_cache_key and chain:
+        # ★ 같은 체인의 요청을 같은 캐시로 보내서 고정 앞부분(system 프롬프트) 캐시 적중률을 높임
+        extra_body = dict(kwargs.pop("extra_body", None) or {})
+        extra_body.setdefault("prompt_cache_key", f"{settings.llm_prompt_cache_key}-{chain}")
+        kwargs["extra_body"] = extra_body
+
+    if replay.is_enabled():
+        # ★ 녹화/재생 모드: OpenAI 요청을 ReplayTransport로 보냄
+        http_client, http_async_client = replay.http_clients("openai")
+        kwargs.setdefault("http_client", http_client)
+        kwargs.setdefault("http_async_client", http_async_client)
+
+    return ChatOpenAI(
+        model=get_model(chain),
+        temperature=temperature,
+        openai_api_key=settings.openai_api_key,
+        base_url=settings.openai_base_url or None,
+        **kwargs
+    )
+
+def cacheable_prompt(system: str, user: str) -> ChatPromptTemplate:
+    """
+    프로바이더 프롬프트 캐시용 2단 프롬프트
+
+    고정 지침/형식/예시는 system 메시지(매 호출 동일한 앞부분)에,
+    질문·데이터·이전 대화 같은 가변 값은 항상 뒤쪽 user 메시지에 둬서
+    OpenAI가 앞부분을 캐시로 재사용하도록 함 (캐시는 1,024토큰 이상 일치하는 앞부분부터 적용)
+
+    Args:
+        system: 변수 없는 고정 지침
+        user: 가변 입력 템플릿 (예: "질문: {question}")
+    """
+    return ChatPromptTemplate.from_messages([("system", system.strip()), ("human", user.strip())])
@@ -1,22 +1,159 @@
+"""
+로깅 설정 모듈
+큐 기반 비동기 로깅: 요청 처리 코드는 큐에 넣기만 하고(블로킹 없음),
+파일/콘솔 출력은 별도 리스너 스레드에서 수행
+"""
+import atexit
+import copy
+import json
 import logging
-from utils.config import settings
+import logging.handlers
 import os
+import queue
+from contextvars import ContextVar
+from datetime import datetime, timezone
+from typing import Dict, Optional
+from utils.config import settings
+
+# 현재 요청 ID (main.py 미들웨어에서 설정, 로그 레코드에 자동 포함)
+request_id_var: ContextVar[str] = ContextVar("request_id", default="-")
+
+class RequestIdFilter(logging.Filter):
+    """로그 레코드에 현재 요청 ID 추가"""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        record.request_id = request_id_var.get()
+        return True
+
+class SamplingFilter(logging.Filter):
+    """
+    대량 로그 샘플링 필터
+    extra={"sample_key": "..."}가 붙은 레코드는 키별로 N개 중 1개만 기록
+    (WARNING 이상은 항상 기록)
+    """
+
+    def __init__(self, every: int):
+        super().__init__()
+        self.every = max(1, every)
+        self._counts: Dict[str, int] = {}
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        key = getattr(record, "sample_key", None)
+        if key is None or record.levelno >= logging.WARNING:
+            return True
+        count = self._counts.get(key, 0)
+        self._counts[key] = count + 1
+        return count % self.every == 0
+
+class JsonFormatter(logging.Formatter):
+    """JSON 한 줄 형식의 구조화 로그"""
+
+    def format(self, record: logging.LogRecord) -> str:
+        payload = {
+            "timestamp": datetime.fromtimestamp(record.created, tz=timezone.utc).isoformat(),
+            "level": record.levelname,
+            "logger": record.name,
+            "request_id": getattr(record, "request_id", "-"),
+            "message": record.getMessage(),
+        }
+        # 큐를 거친 레코드는 exc_info 대신 미리 포맷된 exc_text만 가짐 (NonBlockingQueueHandler.prepare)
+        exc_text = record.exc_text or (self.formatException(record.exc_info) if record.exc_info else None)
+        if exc_text:
+            payload["exc_info"] = exc_text
+        return json.dumps(payload, ensure_ascii=False)
+
+_exception_formatter = logging.Formatter()
+
+class NonBlockingQueueHandler(logging.handlers.QueueHandler):
+    """큐가 가득 차면 기다리지 않고 레코드를 버리는 QueueHandler"""
+
+    dropped = 0
+
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        """
+        큐에 넣을 레코드 준비 (스레드 간 전달 가능하도록 메시지 인자/예외를 문자열로)
+        기본 구현은 트레이스백을 msg에 합쳐 버리므로, 트레이스백은 exc_text에 따로 보관
+        → 텍스트 형식은 기존처럼 메시지 뒤에, JSON 형식은 "exc_info" 필드로 출력
+        """
+        record = copy.copy(record)
+        record.msg = record.getMessage()
+        record.args = None
+        if record.exc_info:
+            record.exc_text = _exception_formatter.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+    def enqueue(self, record: logging.LogRecord):
+        try:
+            self.queue.put_nowait(record)
+        except queue.Full:
+            NonBlockingQueueHandler.dropped += 1
+
+_listener: Optional[logging.handlers.QueueListener] = None
+
+def stop_logging():
+    """리스너 스레드 종료 (큐에 남은 로그를 모두 기록한 뒤 반환)"""
+    global _listener
+    if _listener is not None:
+        _listener.stop()
+        _listener = None
+
+def per_worker_path(path: str) -> str:
+    """
+    워커별 파일 경로 (멀티 워커면 "app.log" → "app.<pid>.log")
+    크기 기반 로테이션은 프로세스 간에 안전하지 않으므로 로그/트레이스 파일은 워커마다 따로 씀
+    """
+    if settings.workers <= 1:
+        return path
+    root, ext = os.path.splitext(path)
+    return f"{root}.{os.getpid()}{ext}"
 
 def setup_logger():
-    log_file_path = settings.log_file  
+    log_file_path = per_worker_path(settings.log_file)
     log_dir = os.path.dirname(log_file_path)
-    if not os.path.exists(log_dir):
+    if log_dir and not os.path.exists(log_dir):
         os.makedirs(log_dir)
-   
+
     """로깅 설정"""
-    logging.basicConfig(
-        level=settings.log_level,
-        format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-        handlers=[
-            logging.FileHandler(settings.log_file),
-            logging.StreamHandler()
-        ]
+    global _listener
+
+    if settings.log_format == "json":
+        formatter: logging.Formatter = JsonFormatter()
+    else:
+        formatter = logging.Formatter(
+            "%(asctime)s - %(name)s - %(levelname)s - [%(request_id)s] %(message)s"
+        )
+
+    # ★ 실제 출력 핸들러 (리스너 스레드에서만 실행) - 크기 기반 로테이션
+    file_handler = logging.handlers.RotatingFileHandler(
+        log_file_path,
+        maxBytes=settings.log_max_bytes,
+        backupCount=settings.log_backup_count,
+        encoding="utf-8"
+    )
+    stream_handler = logging.StreamHandler()
+    for handler in (file_handler, stream_handler):
+        handler.setFormatter(formatter)
+
+    # ★ 요청 처리 쪽 핸들러: 큐에 넣기만 함
+    log_queue: queue.Queue = queue.Queue(maxsize=settings.log_queue_size)
+    queue_handler = NonBlockingQueueHandler(log_queue)
+    queue_handler.addFilter(RequestIdFilter())
+    queue_handler.addFilter(SamplingFilter(settings.log_sample_every))
+
+    root = logging.getLogger()
+    root.setLevel(settings.log_level)
+    for handler in list(root.handlers):
+        root.removeHandler(handler)
+    root.addHandler(queue_handler)
+
+    stop_logging()
+    _listener = logging.handlers.QueueListener(
+        log_queue, file_handler, stream_handler, respect_handler_level=True
     )
+    _listener.start()
+
     return logging.getLogger(__name__)
 
 logger = setup_logger()
+atexit.register(stop_logging)
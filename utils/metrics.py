@@ -0,0 +1,342 @@
+"""
+Prometheus 메트릭 모듈
+/ai/query 단계별 지연 시간, LLM 호출/토큰/비용, 캐시 적중률, 처리 중 요청 수 등을 수집
+(main.py의 /metrics 엔드포인트에서 노출)
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+from uuid import UUID
+import os
+import shutil
+import time
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+from prometheus_client import REGISTRY, CollectorRegistry, Counter, Gauge, Histogram, multiprocess
+from utils.config import settings
+from utils.tracing import record_span, span
+
+# 멀티 워커 모드: 워커별 메트릭 파일 디렉터리가 메트릭 생성 전에 있어야 함
+if os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+    os.makedirs(os.environ["PROMETHEUS_MULTIPROC_DIR"], exist_ok=True)
+
+# 초 단위 버킷 (로컬 조회 수 ms ~ LLM 수십 초)
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 20.0, 30.0, 60.0)
+
+REQUEST_LATENCY = Histogram(
+    "ai_http_request_duration_seconds",
+    "HTTP 요청 처리 시간",
+    ["method", "route", "status"],
+    buckets=LATENCY_BUCKETS
+)
+
+IN_FLIGHT = Gauge(
+    "ai_http_requests_in_flight",
+    "처리 중인 HTTP 요청 수",
+    ["route"],
+    multiprocess_mode="livesum"
+)
+
+QUERY_LATENCY = Histogram(
+    "ai_query_duration_seconds",
+    "/ai/query 전체 처리 시간 (카테고리별)",
+    ["category"],
+    buckets=LATENCY_BUCKETS
+)
+
+STAGE_LATENCY = Histogram(
+    "ai_stage_duration_seconds",
+    "질문 처리 단계별 소요 시간 (classification, stock_code_resolution, market_data, retrieval 등)",
+    ["stage", "source"],
+    buckets=LATENCY_BUCKETS
+)
+
+LLM_LATENCY = Histogram(
+    "ai_llm_call_duration_seconds",
+    "LLM 호출 소요 시간",
+    ["chain", "model"],
+    buckets=LATENCY_BUCKETS
+)
+
+LLM_TOKENS = Counter(
+    "ai_llm_tokens_total",
+    "LLM 사용 토큰 수 (kind: prompt, completion, cached_prompt = prompt 중 프롬프트 캐시 적중분)",
+    ["chain", "model", "kind"]
+)
+
+LLM_COST = Counter(
+    "ai_llm_cost_usd_total",
+    "LLM 사용 추정 비용 (USD, settings.llm_prices 기준)",
+    ["chain", "model"]
+)
+
+QUERY_TOKENS = Histogram(
+    "ai_query_tokens",
+    "/ai/query 요청당 LLM 토큰 수 (카테고리별, 입력+출력)",
+    ["category"],
+    buckets=(0, 100, 250, 500, 1000, 2000, 4000, 8000, 16000)
+)
+
+QUERY_COST = Histogram(
+    "ai_query_cost_usd",
+    "/ai/query 요청당 LLM 추정 비용 (USD, 카테고리별)",
+    ["category"],
+    buckets=(0, 0.0001, 0.0005, 0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1)
+)
+
+LLM_ERRORS = Counter(
+    "ai_llm_errors_total",
+    "LLM 호출 실패 수",
+    ["chain"]
+)
+
+LLM_QUEUE_DEPTH = Gauge(
+    "ai_llm_queue_depth",
+    "OpenAI 호출 한도 대기열 길이",
+    ["priority"],
+    multiprocess_mode="livesum"
+)
+
+LLM_QUEUE_WAIT = Histogram(
+    "ai_llm_queue_wait_seconds",
+    "OpenAI 호출 한도 대기 시간",
+    ["priority"],
+    buckets=LATENCY_BUCKETS
+)
+
+LLM_REJECTED = Counter(
+    "ai_llm_rejected_total",
+    "호출 한도 초과로 거절된 LLM 호출 수 (503 Retry-After)",
+    ["priority", "reason"]
+)
+
+DEADLINE_DEGRADED = Counter(
+    "ai_deadline_degraded_total",
+    "요청 마감 시간 부족으로 포기하고 부분 결과로 대체한 단계 수",
+    ["stage"]
+)
+
+BRIEFINGS = Counter(
+    "ai_briefings_total",
+    "장 마감 후 브리핑 생성 결과 수",
+    ["kind", "result"]
+)
+
+CACHE_EVENTS = Counter(
+    "ai_cache_events_total",
+    "캐시 적중/미스 수",
+    ["cache", "result"]
+)
+
+DASHBOARD_REFRESH = Histogram(
+    "ai_dashboard_refresh_duration_seconds",
+    "대시보드 데이터 갱신 소요 시간",
+    ["source"],
+    buckets=LATENCY_BUCKETS
+)
+
+SPRING_LATENCY = Histogram(
+    "ai_spring_request_duration_seconds",
+    "Spring Boot 요청 소요 시간 (재시도/헤징 개별 시도 단위)",
+    ["endpoint"],
+    buckets=LATENCY_BUCKETS
+)
+
+STARTUP_DURATION = Gauge(
+    "ai_startup_duration_seconds",
+    "서버 기동 단계별 소요 시간 (import, startup, warmup.*)",
+    ["phase"],
+    multiprocess_mode="max"
+)
+
+READY = Gauge(
+    "ai_ready",
+    "요청 처리 준비 완료 여부 (워밍업 완료 시 1)",
+    multiprocess_mode="livemin"
+)
+
+def metrics_registry() -> CollectorRegistry:
+    """
+    /metrics에서 내보낼 레지스트리
+    (PROMETHEUS_MULTIPROC_DIR이 설정된 멀티 워커 모드면 모든 워커의 값을 합산)
+    """
+    if not os.environ.get("PROMETHEUS_MULTIPROC_DIR"):
+        return REGISTRY
+    registry = CollectorRegistry()
+    multiprocess.MultiProcessCollector(registry)
+    return registry
+
+def reset_multiprocess_metrics():
+    """이전 실행의 워커별 메트릭 파일 삭제 (워커를 띄우기 전 마스터 프로세스에서 호출)"""
+    directory = os.environ.get("PROMETHEUS_MULTIPROC_DIR")
+    if not directory:
+        return
+    shutil.rmtree(directory, ignore_errors=True)
+    os.makedirs(directory, exist_ok=True)
+
+@contextmanager
+def track_stage(stage: str, source: str = "-"):
+    """
+    단계 소요 시간 측정 컨텍스트 매니저 (Prometheus 히스토그램 + 트레이스 스팬)
+
+    사용 예:
+        with track_stage("market_data", "pykrx"):
+            df = stock.get_market_ohlcv(...)
+    """
+    started = time.perf_counter()
+    try:
+        with span(stage if source == "-" else f"{stage}.{source}"):
+            yield
+    finally:
+        STAGE_LATENCY.labels(stage=stage, source=source).observe(time.perf_counter() - started)
+
+def estimate_cost(model: str, prompt_tokens: int, completion_tokens: int, cached_tokens: int = 0) -> float:
+    """
+    LLM 호출 추정 비용 (USD)
+
+    Args:
+        model: 응답의 모델명 (예: "gpt-4o-mini-2024-07-18" → 가장 긴 접두어 "gpt-4o-mini" 가격 사용)
+        prompt_tokens: 입력 토큰 수 (캐시된 입력 포함)
+        completion_tokens: 출력 토큰 수
+        cached_tokens: 입력 중 프롬프트 캐시에서 읽은 토큰 수 (캐시 가격이 없으면 입력 가격의 절반)
+
+    Returns:
+        비용 (가격표에 없는 모델이면 0.0)
+    """
+    matches = [name for name in settings.llm_prices if model.startswith(name)]
+    if not matches:
+        return 0.0
+    prices = settings.llm_prices[max(matches, key=len)]
+    input_price, output_price = prices[:2]
+    cached_price = prices[2] if len(prices) > 2 else input_price / 2
+    cached_tokens = min(cached_tokens, prompt_tokens)
+    return (
+        (prompt_tokens - cached_tokens) * input_price
+        + cached_tokens * cached_price
+        + completion_tokens * output_price
+    ) / 1_000_000
+
+class RequestUsage:
+    """요청 하나의 LLM 토큰/비용 누계 (체인별 포함)"""
+
+    def __init__(self):
+        self.prompt_tokens = 0
+        self.cached_tokens = 0
+        self.completion_tokens = 0
+        self.cost_usd = 0.0
+        self.calls: List[Dict[str, Any]] = []
+
+    def add(
+        self, chain: str, model: str, prompt_tokens: int, completion_tokens: int, cost: float, cached_tokens: int = 0
+    ):
+        self.prompt_tokens += prompt_tokens
+        self.cached_tokens += cached_tokens
+        self.completion_tokens += completion_tokens
+        self.cost_usd += cost
+        self.calls.append({
+            "chain": chain,
+            "model": model,
+            "prompt_tokens": prompt_tokens,
+            "cached_tokens": cached_tokens,
+            "completion_tokens": completion_tokens
+        })
+
+    @property
+    def total_tokens(self) -> int:
+        return self.prompt_tokens + self.completion_tokens
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "prompt_tokens": self.prompt_tokens,
+            "cached_tokens": self.cached_tokens,
+            "completion_tokens": self.completion_tokens,
+            "cost_usd": round(self.cost_usd, 6),
+            "calls": self.calls
+        }
+
+_request_usage: ContextVar[Optional[RequestUsage]] = ContextVar("request_usage", default=None)
+
+def start_request_usage() -> RequestUsage:
+    """현재 요청의 토큰/비용 집계 시작 (이후 LLM 호출이 자동으로 누적됨)"""
+    usage = RequestUsage()
+    _request_usage.set(usage)
+    return usage
+
+def record_query_usage(category: str, usage: RequestUsage):
+    """요청 단위 토큰/비용 히스토그램 기록"""
+    QUERY_TOKENS.labels(category=category).observe(usage.total_tokens)
+    QUERY_COST.labels(category=category).observe(usage.cost_usd)
+
+def record_cache(cache: str, hit: bool):
+    """캐시 적중/미스 기록"""
+    CACHE_EVENTS.labels(cache=cache, result="hit" if hit else "miss").inc()
+
+class LLMMetricsHandler(BaseCallbackHandler):
+    """LLM 호출 시간/토큰 수를 Prometheus와 트레이스 스팬으로 기록하는 LangChain 콜백"""
+
+    def __init__(self, chain: str):
+        self.chain = chain
+        self._started: Dict[UUID, float] = {}
+
+    def on_chat_model_start(self, serialized: Dict[str, Any], messages: List[Any], *, run_id: UUID, **kwargs: Any):
+        self._started[run_id] = time.time()
+
+    def on_llm_start(self, serialized: Dict[str, Any], prompts: List[str], *, run_id: UUID, **kwargs: Any):
+        self._started[run_id] = time.time()
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any):
+        started = self._started.pop(run_id, None)
+        ended = time.time()
+        llm_output = response.llm_output or {}
+        model = llm_output.get("model_name", "unknown")
+        usage = llm_output.get("token_usage") or {}
+
+        prompt_tokens = usage.get("prompt_tokens", 0)
+        completion_tokens = usage.get("completion_tokens", 0)
+        # ★ 프롬프트 캐시에서 읽은 입력 토큰 (고정 system 프롬프트 앞부분이 재사용된 양)
+        cached_tokens = (usage.get("prompt_tokens_details") or {}).get("cached_tokens") or 0
+        cost = estimate_cost(model, prompt_tokens, completion_tokens, cached_tokens)
+
+        if started is not None:
+            LLM_LATENCY.labels(chain=self.chain, model=model).observe(ended - started)
+            record_span(
+                f"llm.{self.chain}", started, ended,
+                model=model,
+                prompt_tokens=prompt_tokens,
+                cached_tokens=cached_tokens,
+                completion_tokens=completion_tokens,
+                cost_usd=round(cost, 6)
+            )
+
+        for kind in ("prompt_tokens", "completion_tokens"):
+            if usage.get(kind):
+                LLM_TOKENS.labels(chain=self.chain, model=model, kind=kind.replace("_tokens", "")).inc(usage[kind])
+        if cached_tokens:
+            LLM_TOKENS.labels(chain=self.chain, model=model, kind="cached_prompt").inc(cached_tokens)
+        if cost:
+            LLM_COST.labels(chain=self.chain, model=model).inc(cost)
+
+        request_usage = _request_usage.get()
+        if request_usage is not None:
+            request_usage.add(self.chain, model, prompt_tokens, completion_tokens, cost, cached_tokens)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any):
+        started = self._started.pop(run_id, None)
+        LLM_ERRORS.labels(chain=self.chain).inc()
+        if started is not None:
+            record_span(f"llm.{self.chain}", started, time.time(), error=type(error).__name__)
+
+def llm_config(chain: str, config: Optional[Dict[str, Any]] = None) -> Dict[str, Any]:
+    """
+    체인 invoke용 config (메트릭 콜백 포함)
+
+    Args:
+        chain: 메트릭 라벨용 체인 이름 (예: "classifier")
+        config: 추가 config
+
+    Returns:
+        {"callbacks": [...], ...}
+    """
+    merged = dict(config or {})
+    merged["callbacks"] = list(merged.get("callbacks", [])) + [LLMMetricsHandler(chain)]
+    return merged
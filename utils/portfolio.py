@@ -0,0 +1,190 @@
+"""
+포트폴리오 분석 모듈
+보유 종목과 비중을 받아 수익률, 변동성, 상관계수 행렬, KOSPI 대비 베타, 낙폭(drawdown)을 계산
+(시세 이력은 utils.technicals의 캐시를 같이 사용 → 캐시가 차 있으면 pykrx 호출 없이 NumPy 연산만)
+
+- 거래일 기준은 KOSPI 지수 날짜 (지수 조회 실패 시 종목 날짜의 합집합)
+- 거래가 없는 날(거래정지 등)은 직전 종가로 채움
+- 모든 종목의 시세가 있는 구간만 분석 (신규 상장 종목이 있으면 기간이 짧아짐)
+- 포트폴리오 수익률은 매일 같은 비중으로 재조정한다고 가정
+"""
+from typing import Any, Dict, List, Optional
+import math
+from utils.config import settings
+from utils.lazy import lazy_import
+from utils.technicals import TRADING_DAYS_PER_YEAR, fetch_histories, fetch_index_history
+
+np = lazy_import("numpy")
+
+KOSPI_INDEX = "1001"
+MIN_RETURN_DAYS = 20  # 이보다 짧은 구간은 변동성/베타를 믿기 어려움
+
+class MissingHistoryError(LookupError):
+    """시세 이력을 찾을 수 없는 종목이 있음"""
+
+    def __init__(self, tickers: List[str]):
+        self.tickers = tickers
+        super().__init__(f"시세 이력을 찾을 수 없는 종목: {', '.join(tickers)}")
+
+def normalize_weights(tickers: List[str], weights: Optional[List[float]]):
+    """
+    비중 검증 및 합계 1로 정규화 (비중이 없으면 동일 비중)
+
+    Raises:
+        ValueError: 종목 수와 비중 수가 다르거나, 음수이거나, 합계가 0
+    """
+    if weights is None:
+        return np.full(len(tickers), 1.0 / len(tickers))
+    if len(weights) != len(tickers):
+        raise ValueError("종목 수와 비중 수가 다릅니다.")
+    array = np.asarray(weights, dtype=float)
+    if not np.isfinite(array).all() or (array < 0).any() or array.sum() <= 0:
+        raise ValueError("비중은 0 이상이고 합계가 0보다 커야 합니다.")
+    return array / array.sum()
+
+def align_closes(histories: List[Dict[str, List[float]]], dates: List[str]):
+    """
+    종목별 종가를 공통 거래일 축에 맞춤 (없는 날은 직전 종가, 상장 전은 NaN)
+
+    Args:
+        histories: 종목별 이력 (fetch_history 결과)
+        dates: 공통 거래일 (YYYYMMDD, 오름차순)
+
+    Returns:
+        (종목 수 × 거래일) 종가 배열
+    """
+    grid = None
+    closes = np.full((len(histories), len(dates)), np.nan)
+    for row, history in enumerate(histories):
+        # 대부분은 거래일이 그대로 일치 → 뒤쪽에 그대로 복사 (날짜 검색 생략)
+        tail = history["dates"][-len(dates):]
+        if tail == dates[len(dates) - len(tail):]:
+            if tail:
+                closes[row, len(dates) - len(tail):] = history["close"][-len(tail):]
+            continue
+        if grid is None:
+            grid = np.asarray(dates)
+        history_dates = np.asarray(history["dates"])
+        positions = np.searchsorted(grid, history_dates)
+        inside = positions < len(grid)
+        positions, values = positions[inside], np.asarray(history["close"])[inside]
+        exact = grid[positions] == history_dates[inside]
+        closes[row, positions[exact]] = values[exact]
+
+    # 직전 값으로 채우기 (행마다 마지막으로 값이 있던 열 인덱스를 누적 최대로 전파)
+    filled = np.where(np.isnan(closes), 0, np.arange(closes.shape[1]))
+    np.maximum.accumulate(filled, axis=1, out=filled)
+    return closes[np.arange(closes.shape[0])[:, None], filled]
+
+def _drawdowns(returns):
+    """행별 (최대 낙폭, 현재 낙폭) - 누적 자산의 직전 고점 대비 하락률"""
+    wealth = np.cumprod(1 + returns, axis=1)
+    wealth = np.concatenate([np.ones((returns.shape[0], 1)), wealth], axis=1)
+    drawdown = wealth / np.maximum.accumulate(wealth, axis=1) - 1
+    return drawdown.min(axis=1), drawdown[:, -1]
+
+def _pct(value: float) -> Optional[float]:
+    return round(float(value) * 100, 2) if math.isfinite(value) else None
+
+def _ratio(value: float) -> Optional[float]:
+    return round(float(value), 3) if math.isfinite(value) else None
+
+def analyze_portfolio(
+    tickers: List[str],
+    weights: Optional[List[float]] = None,
+    days: Optional[int] = None
+) -> Dict[str, Any]:
+    """
+    포트폴리오 분석
+
+    Args:
+        tickers: 종목 코드 목록
+        weights: 종목별 비중 (합계가 1이 아니면 정규화, 없으면 동일 비중)
+        days: 분석 기간 (거래일, 기본 settings.portfolio_default_days)
+
+    Returns:
+        {"portfolio": {...}, "holdings": [...], "correlation": [[...]], "start", "end", "days"}
+        (수익률/변동성/낙폭은 %, 변동성은 연율화)
+
+    Raises:
+        ValueError: 입력 오류 또는 분석할 기간이 너무 짧음
+        MissingHistoryError: 시세 이력이 없는 종목이 있음
+    """
+    if not tickers:
+        raise ValueError("종목을 하나 이상 입력해 주세요.")
+    if len(set(tickers)) != len(tickers):
+        raise ValueError("같은 종목이 중복되었습니다.")
+    if len(tickers) > settings.portfolio_max_tickers:
+        raise ValueError(f"종목은 최대 {settings.portfolio_max_tickers}개까지 분석할 수 있습니다.")
+    w = normalize_weights(tickers, weights)
+    days = max(MIN_RETURN_DAYS, min(days or settings.portfolio_default_days, settings.technicals_history_days - 1))
+
+    histories = fetch_histories(tickers)
+    missing = [ticker for ticker, history in zip(tickers, histories) if not history]
+    if missing:
+        raise MissingHistoryError(missing)
+
+    market = fetch_index_history(KOSPI_INDEX)
+    if market:
+        dates = market["dates"]
+    else:
+        dates = sorted(set().union(*(history["dates"] for history in histories)))
+    dates = dates[-(days + 1):]
+
+    closes = align_closes(histories, dates)
+    market_closes = align_closes([market], dates)[0] if market else None
+
+    # 모든 종목(+ 지수)의 시세가 있는 첫 거래일부터 분석
+    available = ~np.isnan(closes).any(axis=0)
+    if market_closes is not None:
+        available &= ~np.isnan(market_closes)
+    if not available.any():
+        raise ValueError("모든 종목의 시세가 있는 공통 기간이 없습니다.")
+    first = int(np.argmax(available))
+    closes = closes[:, first:]
+    if closes.shape[1] - 1 < MIN_RETURN_DAYS:
+        raise ValueError(f"공통 기간이 너무 짧습니다 ({closes.shape[1] - 1}거래일).")
+
+    # ★ 종목별 일간 수익률 + 포트폴리오 수익률을 한 배열로 쌓아서 같은 연산으로 계산
+    stock_returns = closes[:, 1:] / closes[:, :-1] - 1
+    returns = np.vstack([stock_returns, w @ stock_returns])
+    n_days = returns.shape[1]
+
+    total = np.prod(1 + returns, axis=1) - 1
+    annualized = (1 + total) ** (TRADING_DAYS_PER_YEAR / n_days) - 1
+    volatility = returns.std(axis=1, ddof=1) * np.sqrt(TRADING_DAYS_PER_YEAR)
+    max_drawdown, current_drawdown = _drawdowns(returns)
+
+    beta = np.full(returns.shape[0], np.nan)
+    if market_closes is not None:
+        market_closes = market_closes[first:]
+        market_returns = market_closes[1:] / market_closes[:-1] - 1
+        centered = market_returns - market_returns.mean()
+        variance = (centered ** 2).sum()
+        if variance > 0:
+            beta = (returns - returns.mean(axis=1, keepdims=True)) @ centered / variance
+
+    correlation = np.corrcoef(stock_returns) if len(tickers) > 1 else np.ones((1, 1))
+
+    def metrics(row: int) -> Dict[str, Any]:
+        return {
+            "return": _pct(total[row]),
+            "annualized_return": _pct(annualized[row]),
+            "volatility": _pct(volatility[row]),
+            "beta": _ratio(beta[row]),
+            "max_drawdown": _pct(max_drawdown[row]),
+            "current_drawdown": _pct(current_drawdown[row])
+        }
+
+    return {
+        "start": dates[first],
+        "end": dates[-1],
+        "days": n_days,
+        "benchmark": "KOSPI" if market_closes is not None else None,
+        "portfolio": metrics(len(tickers)),
+        "holdings": [
+            {"ticker": ticker, "weight": round(float(w[row]), 4), **metrics(row)}
+            for row, ticker in enumerate(tickers)
+        ],
+        "correlation": [[_ratio(value) for value in row] for row in correlation.tolist()]
+    }
@@ -0,0 +1,316 @@
+"""
+OpenAI 호출 한도 모듈
+분당 요청 수(RPM)/토큰 수(TPM) 토큰 버킷 + 우선순위 대기열로 LLM 호출 속도를 조절해
+429 폭주 대신 한도 안에서 처리하고, 대기열이 넘치면 503 Retry-After로 거절
+
+- 사용자 질문(INTERACTIVE)이 브리핑 등 백그라운드 작업(BACKGROUND)보다 먼저 처리됨
+- 토큰은 "입력 토큰 + 최대 출력 토큰"으로 예약하고 호출이 끝나면 실제 사용량으로 정산
+- 이벤트 루프 하나(서버 프로세스)를 기준으로 동작, 워커가 여러 개면 한도를 워커 수로 나눔
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from enum import IntEnum
+from typing import TYPE_CHECKING, Any, Dict, List, Optional, Tuple
+from uuid import UUID
+import asyncio
+import heapq
+import itertools
+import math
+import time
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+from utils.config import settings
+from utils.deadline import within_deadline
+from utils.logger import logger
+from utils.metrics import LLM_QUEUE_DEPTH, LLM_QUEUE_WAIT, LLM_REJECTED, llm_config, track_stage
+
+if TYPE_CHECKING:
+    from langchain_core.runnables import Runnable  # import 비용이 커서 타입 검사 때만
+
+class Priority(IntEnum):
+    """LLM 호출 우선순위 (작을수록 먼저)"""
+    INTERACTIVE = 0
+    BACKGROUND = 1
+
+class LLMBackpressureError(Exception):
+    """호출 한도 대기열이 가득 찼거나 대기 시간이 너무 길 때 (API에서 503 Retry-After로 변환)"""
+
+    def __init__(self, retry_after: float, reason: str):
+        self.retry_after = max(1, math.ceil(retry_after))
+        self.reason = reason
+        super().__init__(f"LLM 호출 한도 초과 ({reason}), {self.retry_after}초 후 재시도")
+
+class TokenBucket:
+    """분당 한도를 초당 보충 속도로 바꾼 토큰 버킷 (정산으로 음수가 되면 그만큼 다음 호출이 대기)"""
+
+    def __init__(self, per_minute: float):
+        self.capacity = float(per_minute)
+        self.rate = per_minute / 60.0
+        self.level = self.capacity
+        self._updated = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.level = min(self.capacity, self.level + (now - self._updated) * self.rate)
+        self._updated = now
+
+    def wait_time(self, amount: float) -> float:
+        """amount만큼 꺼낼 수 있을 때까지 남은 시간 (초)"""
+        self._refill()
+        if self.level >= amount:
+            return 0.0
+        return (amount - self.level) / self.rate
+
+    def take(self, amount: float):
+        self._refill()
+        self.level -= amount
+
+    def give_back(self, amount: float):
+        self._refill()
+        self.level = min(self.capacity, self.level + amount)
+
+# 대기열 항목: (우선순위, 순번, 예약 토큰 수, 완료 future)
+_Waiter = Tuple[int, int, int, asyncio.Future]
+
+class RateLimiter:
+    """RPM/TPM 토큰 버킷 + 우선순위 대기열"""
+
+    def __init__(self, rpm: int, tpm: int, max_depth: int, max_wait_seconds: float):
+        self._requests = TokenBucket(rpm) if rpm > 0 else None
+        self._tokens = TokenBucket(tpm) if tpm > 0 else None
+        self.max_depth = max_depth
+        self.max_wait_seconds = max_wait_seconds
+        self._waiters: List[_Waiter] = []
+        self._counter = itertools.count()
+        self._dispatcher: Optional[asyncio.Task] = None
+
+    @property
+    def enabled(self) -> bool:
+        return self._requests is not None or self._tokens is not None
+
+    @property
+    def depth(self) -> int:
+        return sum(1 for waiter in self._waiters if not waiter[3].done())
+
+    def _clamp(self, tokens: int) -> int:
+        # 한 번의 호출이 버킷 용량보다 크면 영원히 못 나가므로 용량으로 제한
+        return int(min(tokens, self._tokens.capacity)) if self._tokens else tokens
+
+    def _wait_time(self, tokens: int) -> float:
+        wait = 0.0
+        if self._requests:
+            wait = self._requests.wait_time(1)
+        if self._tokens:
+            wait = max(wait, self._tokens.wait_time(tokens))
+        return wait
+
+    def _take(self, tokens: int):
+        if self._requests:
+            self._requests.take(1)
+        if self._tokens:
+            self._tokens.take(tokens)
+
+    def estimate_wait(self, tokens: int, priority: Priority) -> float:
+        """앞선(같거나 높은 우선순위) 대기 호출까지 고려한 예상 대기 시간 (초)"""
+        ahead = [w for w in self._waiters if w[0] <= priority and not w[3].done()]
+        wait = 0.0
+        if self._requests:
+            wait = self._requests.wait_time(len(ahead) + 1)
+        if self._tokens:
+            wait = max(wait, self._tokens.wait_time(sum(w[2] for w in ahead) + tokens))
+        return wait
+
+    async def acquire(self, tokens: int, priority: Priority = Priority.INTERACTIVE) -> int:
+        """
+        호출 한도 확보 (필요하면 대기)
+
+        Args:
+            tokens: 예약할 토큰 수 (입력 + 최대 출력)
+            priority: 우선순위
+
+        Returns:
+            실제 예약된 토큰 수 (settle에 전달)
+
+        Raises:
+            LLMBackpressureError: 대기열이 가득 찼거나 예상/실제 대기 시간이 max_wait_seconds 초과
+        """
+        if not self.enabled:
+            return tokens
+        tokens = self._clamp(tokens)
+        label = priority.name.lower()
+
+        # 대기 중인 호출이 없고 바로 꺼낼 수 있으면 대기열을 거치지 않음
+        if self.depth == 0 and self._wait_time(tokens) <= 0:
+            self._take(tokens)
+            LLM_QUEUE_WAIT.labels(priority=label).observe(0.0)
+            return tokens
+
+        if self.depth >= self.max_depth:
+            LLM_REJECTED.labels(priority=label, reason="queue_full").inc()
+            raise LLMBackpressureError(self.estimate_wait(tokens, priority), "queue_full")
+        expected = self.estimate_wait(tokens, priority)
+        if expected > self.max_wait_seconds:
+            LLM_REJECTED.labels(priority=label, reason="wait_too_long").inc()
+            raise LLMBackpressureError(expected, "wait_too_long")
+
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (int(priority), next(self._counter), tokens, future))
+        LLM_QUEUE_DEPTH.labels(priority=label).inc()
+        if self._dispatcher is None or self._dispatcher.done():
+            self._dispatcher = asyncio.create_task(self._dispatch())
+
+        started = time.perf_counter()
+        try:
+            with track_stage("llm_queue"):
+                await asyncio.wait_for(asyncio.shield(future), timeout=self.max_wait_seconds)
+        except asyncio.TimeoutError:
+            # 뒤늦게 더 높은 우선순위 호출이 몰려 계속 밀린 경우
+            if not future.done():
+                future.cancel()
+            elif not future.cancelled():
+                return tokens  # 시간 초과 직전에 한도를 받은 경우
+            LLM_REJECTED.labels(priority=label, reason="timeout").inc()
+            raise LLMBackpressureError(self.estimate_wait(tokens, priority), "timeout")
+        except asyncio.CancelledError:
+            # 요청이 취소되면 대기열에서 빠짐 (이미 한도를 받았다면 반납)
+            if future.done() and not future.cancelled():
+                self.settle(tokens, 0, request_used=False)
+            else:
+                future.cancel()
+            raise
+        finally:
+            LLM_QUEUE_DEPTH.labels(priority=label).dec()
+            LLM_QUEUE_WAIT.labels(priority=label).observe(time.perf_counter() - started)
+        return tokens
+
+    async def _dispatch(self):
+        """대기열 맨 앞(우선순위→도착 순) 호출부터 한도가 생기는 대로 내보냄"""
+        while self._waiters:
+            _, _, tokens, future = self._waiters[0]
+            if future.done():
+                heapq.heappop(self._waiters)
+                continue
+            wait = self._wait_time(tokens)
+            if wait > 0:
+                await asyncio.sleep(wait)
+                continue
+            heapq.heappop(self._waiters)
+            self._take(tokens)
+            future.set_result(None)
+
+    def settle(self, reserved: int, used: int, request_used: bool = True):
+        """
+        예약 토큰을 실제 사용량으로 정산
+
+        Args:
+            reserved: acquire에서 예약한 토큰 수
+            used: 실제 사용 토큰 수 (모르면 reserved와 같게 전달)
+            request_used: False면 요청 수 한도도 반납 (호출 전에 취소된 경우)
+        """
+        if self._tokens:
+            if used < reserved:
+                self._tokens.give_back(reserved - used)
+            elif used > reserved:
+                self._tokens.take(used - reserved)
+        if not request_used and self._requests:
+            self._requests.give_back(1)
+
+    def status(self) -> Dict[str, Any]:
+        return {
+            "queue_depth": self.depth,
+            "requests_available": round(self._requests.level, 1) if self._requests else None,
+            "tokens_available": round(self._tokens.level) if self._tokens else None
+        }
+
+def _per_worker(limit: int) -> int:
+    return max(1, limit // max(1, settings.workers)) if limit > 0 else 0
+
+# 전역 호출 한도 인스턴스
+rate_limiter = RateLimiter(
+    rpm=_per_worker(settings.openai_rpm_limit),
+    tpm=_per_worker(settings.openai_tpm_limit),
+    max_depth=settings.llm_queue_max_depth,
+    max_wait_seconds=settings.llm_queue_max_wait_seconds
+)
+
+# ★ 현재 컨텍스트의 LLM 호출 우선순위 (백그라운드 작업은 llm_priority(Priority.BACKGROUND)로 감쌈)
+_priority: ContextVar[Priority] = ContextVar("llm_priority", default=Priority.INTERACTIVE)
+
+@contextmanager
+def llm_priority(priority: Priority):
+    """블록 안의 LLM 호출 우선순위 지정"""
+    token = _priority.set(priority)
+    try:
+        yield
+    finally:
+        _priority.reset(token)
+
+class _UsageCapture(BaseCallbackHandler):
+    """호출 1회의 실제 토큰 사용량 수집 (정산용)"""
+
+    def __init__(self):
+        self.total_tokens: Optional[int] = None
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any):
+        usage = (response.llm_output or {}).get("token_usage") or {}
+        if usage.get("total_tokens") is not None:
+            self.total_tokens = (self.total_tokens or 0) + usage["total_tokens"]
+
+def estimate_tokens(chain: "Runnable", inputs: Dict[str, Any], name: str) -> int:
+    """
+    호출 1회의 예약 토큰 수 (프롬프트 토큰 + 체인별 최대 출력 토큰)
+
+    Args:
+        chain: prompt | llm | parser 체인
+        inputs: 체인 입력
+        name: 체인 이름 (모델/최대 출력 토큰 선택용)
+    """
+    # main import 시간을 늘리지 않도록 체인이 처음 호출될 때 로드
+    from utils.llm import get_model
+    from utils.tokenizer import count_tokens
+
+    try:
+        prompt_text = chain.first.format(**inputs)
+    except Exception:
+        prompt_text = "\n".join(str(value) for value in inputs.values())
+    return count_tokens(prompt_text, get_model(name)) + settings.llm_max_tokens.get(name, 1000)
+
+async def ainvoke(
+    chain: "Runnable",
+    inputs: Dict[str, Any],
+    name: str,
+    cap: Optional[float] = None,
+    reserve: Optional[float] = None
+) -> Any:
+    """
+    호출 한도를 확보한 뒤 체인을 비동기 실행 (메트릭 콜백 포함, 한도 대기 포함 요청 마감 시간 적용)
+
+    Args:
+        chain: prompt | llm | parser 체인
+        inputs: 체인 입력
+        name: 체인 이름 (메트릭 라벨, 모델 라우팅)
+        cap: 이 호출에 쓸 최대 시간 (초)
+        reserve: 이후 단계를 위해 남겨둘 시간 (초, 기본 settings.deadline_reserve_seconds)
+
+    Raises:
+        LLMBackpressureError: 호출 한도 대기열 초과
+        DeadlineExceeded: 요청 마감 시간 안에 끝나지 못함
+    """
+    return await within_deadline(
+        _ainvoke(chain, inputs, name),
+        f"llm.{name}",
+        reserve=settings.deadline_reserve_seconds if reserve is None else reserve,
+        cap=cap,
+        min_seconds=settings.deadline_llm_min_seconds
+    )
+
+async def _ainvoke(chain: "Runnable", inputs: Dict[str, Any], name: str) -> Any:
+    reserved = await rate_limiter.acquire(estimate_tokens(chain, inputs, name), _priority.get())
+    capture = _UsageCapture()
+    try:
+        return await chain.ainvoke(inputs, config=llm_config(name, {"callbacks": [capture]}))
+    finally:
+        used = capture.total_tokens if capture.total_tokens is not None else reserved
+        rate_limiter.settle(reserved, used)
+        if capture.total_tokens is None:
+            logger.debug(f"LLM 사용량 없음 ({name}) - 예약 토큰 {reserved}개로 정산")
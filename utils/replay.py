@@ -0,0 +1,361 @@
+"""
+녹화/재생(Record & Replay) 모듈
+실제 세션의 외부 호출(OpenAI, pykrx, yfinance, Spring Boot)을 SQLite 파일에 녹화하고,
+재생 모드에서는 네트워크 없이 녹화된 응답을 원래 지연 시간(또는 배율 적용)으로 돌려줌
+
+- REPLAY_MODE=off     : 사용 안 함 (기본값)
+- REPLAY_MODE=record  : 실제 호출 결과를 녹화
+- REPLAY_MODE=replay  : 녹화된 결과만 사용 (없으면 ReplayMissError)
+
+pykrx/yfinance는 install()이 모듈 함수를 직접 감싸고,
+HTTP 호출(OpenAI, Spring)은 클라이언트 생성 시 ReplayTransport를 끼워 넣으므로 호출부 수정이 필요 없음
+"""
+from datetime import date, datetime
+from decimal import Decimal
+from functools import lru_cache, wraps
+from typing import Any, Callable, Dict, Optional, Tuple
+import asyncio
+import hashlib
+import inspect
+import json
+import os
+import pickle
+import re
+import sqlite3
+import threading
+import time
+import zlib
+import httpx
+from utils.config import settings
+from utils.logger import logger
+
+# 키에서 날짜를 지우는 패턴 (다른 날 재생해도 같은 호출로 인식, 예: 20250115, 2025-01-15)
+_DATE_PATTERN = re.compile(r"(?<!\d)(?:19|20)\d{2}-?(?:0[1-9]|1[0-2])-?(?:0[1-9]|[12]\d|3[01])(?!\d)")
+
+@lru_cache(maxsize=1)
+def _data_types() -> Tuple[type, ...]:
+    """그대로 저장하는 값 타입 (그 외 객체는 속성/메서드 접근을 녹화하는 프록시로 감쌈)"""
+    import numpy as np
+    import pandas as pd
+    return (
+        type(None), bool, int, float, str, bytes, list, tuple, dict, set,
+        pd.DataFrame, pd.Series, pd.Index, np.ndarray, np.generic, datetime, date, Decimal
+    )
+
+# 재생 응답에 다시 붙이면 안 되는 헤더 (본문은 이미 디코딩되어 저장됨)
+_DROPPED_HEADERS = {"content-encoding", "content-length", "transfer-encoding", "connection"}
+
+class ReplayMissError(LookupError):
+    """재생 모드에서 녹화되지 않은 호출"""
+
+def is_enabled() -> bool:
+    """녹화/재생 사용 여부"""
+    return settings.replay_mode in ("record", "replay")
+
+def _replaying() -> bool:
+    return settings.replay_mode == "replay"
+
+def _normalize(text: str) -> str:
+    if settings.replay_ignore_dates:
+        return _DATE_PATTERN.sub("<date>", text)
+    return text
+
+def _call_key(name: str, args: Tuple, kwargs: Dict[str, Any]) -> str:
+    """호출 키 생성 (예: "get_market_ohlcv('<date>', market='ALL')")"""
+    parts = [repr(arg) for arg in args] + [f"{k}={v!r}" for k, v in sorted(kwargs.items())]
+    return _normalize(f"{name}({', '.join(parts)})")
+
+class ReplayStore:
+    """녹화 저장소 (SQLite, 값은 zlib 압축 pickle)"""
+
+    def __init__(self, path: str):
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS recordings ("
+            "namespace TEXT NOT NULL, key TEXT NOT NULL, kind TEXT NOT NULL, "
+            "latency REAL NOT NULL, payload BLOB, recorded_at REAL NOT NULL, "
+            "PRIMARY KEY (namespace, key))"
+        )
+        self._conn.commit()
+        self._lock = threading.Lock()
+
+    def put(self, namespace: str, key: str, kind: str, payload: Any, latency: float):
+        """
+        호출 결과 저장 (같은 키는 최신 녹화로 덮어씀)
+
+        Args:
+            namespace: 호출 대상 (pykrx, yfinance, openai, spring)
+            key: 호출 키
+            kind: "value" | "object" | "error" | "http"
+            payload: 반환값/예외/HTTP 응답
+            latency: 실제 소요 시간 (초)
+        """
+        blob = zlib.compress(pickle.dumps(payload, protocol=pickle.HIGHEST_PROTOCOL))
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO recordings VALUES (?, ?, ?, ?, ?, ?)",
+                (namespace, key, kind, latency, blob, time.time())
+            )
+            self._conn.commit()
+
+    def get(self, namespace: str, key: str) -> Optional[Tuple[str, Any, float]]:
+        """녹화 조회 → (kind, payload, latency) 또는 None"""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT kind, payload, latency FROM recordings WHERE namespace = ? AND key = ?",
+                (namespace, key)
+            ).fetchone()
+        if row is None:
+            return None
+        return row[0], pickle.loads(zlib.decompress(row[1])), row[2]
+
+    def count(self) -> Dict[str, int]:
+        """네임스페이스별 녹화 수"""
+        with self._lock:
+            rows = self._conn.execute("SELECT namespace, COUNT(*) FROM recordings GROUP BY namespace").fetchall()
+        return dict(rows)
+
+@lru_cache(maxsize=1)
+def get_store() -> ReplayStore:
+    """전역 녹화 저장소"""
+    return ReplayStore(settings.replay_path)
+
+def _replay_delay(latency: float) -> float:
+    return max(0.0, latency * settings.replay_latency_scale)
+
+def _lookup(namespace: str, key: str) -> Tuple[str, Any, float]:
+    entry = get_store().get(namespace, key)
+    if entry is None:
+        logger.warning(f"재생 데이터 없음: {namespace} {key}")
+        raise ReplayMissError(f"{namespace}: {key}")
+    return entry
+
+def _store_error(namespace: str, key: str, error: Exception, latency: float):
+    try:
+        get_store().put(namespace, key, "error", error, latency)
+    except Exception:
+        # pickle 불가능한 예외는 메시지만 보존
+        get_store().put(namespace, key, "error", RuntimeError(f"{type(error).__name__}: {error}"), latency)
+
+def _store_result(namespace: str, key: str, result: Any, latency: float) -> Any:
+    if isinstance(result, _data_types()):
+        try:
+            get_store().put(namespace, key, "value", result, latency)
+            return result
+        except Exception as e:
+            logger.warning(f"녹화 실패 ({namespace} {key}): {e}")
+            return result
+    get_store().put(namespace, key, "object", None, latency)
+    return _ReplayObject(namespace, key, result)
+
+def _restore(namespace: str, key: str, kind: str, payload: Any) -> Any:
+    if kind == "error":
+        raise payload
+    if kind == "object":
+        return _ReplayObject(namespace, key, None)
+    return payload
+
+def _run(namespace: str, key: str, func: Callable, args: Tuple, kwargs: Dict[str, Any]) -> Any:
+    """동기 호출 녹화/재생"""
+    if _replaying():
+        kind, payload, latency = _lookup(namespace, key)
+        time.sleep(_replay_delay(latency))
+        return _restore(namespace, key, kind, payload)
+
+    started = time.perf_counter()
+    try:
+        result = func(*args, **kwargs)
+    except Exception as e:
+        _store_error(namespace, key, e, time.perf_counter() - started)
+        raise
+    return _store_result(namespace, key, result, time.perf_counter() - started)
+
+class _ReplayObject:
+    """
+    데이터가 아닌 반환값(예: yf.Ticker 객체)의 프록시
+    속성 접근과 메서드 호출을 "생성 키.이름" 단위로 녹화/재생
+    """
+
+    __slots__ = ("_namespace", "_key", "_target")
+
+    def __init__(self, namespace: str, key: str, target: Any):
+        object.__setattr__(self, "_namespace", namespace)
+        object.__setattr__(self, "_key", key)
+        object.__setattr__(self, "_target", target)
+
+    def __getattr__(self, name: str) -> Any:
+        key = f"{self._key}.{name}"
+
+        if _replaying():
+            entry = get_store().get(self._namespace, key)
+            if entry is None:
+                # 속성으로 녹화된 적이 없으면 메서드로 간주
+                return _wrap_callable(self._namespace, key, None)
+            kind, payload, latency = entry
+            time.sleep(_replay_delay(latency))
+            return _restore(self._namespace, key, kind, payload)
+
+        started = time.perf_counter()
+        try:
+            attr = getattr(self._target, name)
+        except Exception as e:
+            _store_error(self._namespace, key, e, time.perf_counter() - started)
+            raise
+        if inspect.ismethod(attr) or inspect.isfunction(attr) or inspect.isbuiltin(attr):
+            return _wrap_callable(self._namespace, key, attr)
+        return _store_result(self._namespace, key, attr, time.perf_counter() - started)
+
+    def __repr__(self) -> str:
+        return f"<ReplayObject {self._namespace}:{self._key}>"
+
+def _wrap_callable(namespace: str, name: str, func: Optional[Callable]) -> Callable:
+    """함수를 녹화/재생 래퍼로 감쌈 (재생 모드에서는 func가 None이어도 됨)"""
+    def wrapper(*args, **kwargs):
+        return _run(namespace, _call_key(name, args, kwargs), func, args, kwargs)
+    if func is not None:
+        wrapper = wraps(func, updated=())(wrapper)
+    return wrapper
+
+class ReplayTransport(httpx.BaseTransport, httpx.AsyncBaseTransport):
+    """
+    HTTP 응답 녹화/재생 트랜스포트 (OpenAI, Spring Boot 클라이언트에 끼워 넣음)
+    키: 메서드 + 경로/쿼리 + 본문 해시 (호스트 무시, 날짜 정규화)
+    스트리밍 응답은 본문 전체를 한 번에 녹화/재생
+    """
+
+    def __init__(
+        self,
+        namespace: str,
+        transport: Optional[httpx.BaseTransport] = None,
+        async_transport: Optional[httpx.AsyncBaseTransport] = None
+    ):
+        self.namespace = namespace
+        self._transport = transport or httpx.HTTPTransport()
+        self._async_transport = async_transport or httpx.AsyncHTTPTransport()
+
+    def _key(self, request: httpx.Request) -> str:
+        body = _normalize(request.content.decode("utf-8", errors="replace"))
+        if body:
+            try:
+                # 키 순서가 달라도 같은 요청으로 인식
+                body = json.dumps(json.loads(body), sort_keys=True, ensure_ascii=False)
+            except ValueError:
+                pass
+        digest = hashlib.sha256(body.encode("utf-8")).hexdigest()[:16]
+        etag = request.headers.get("if-none-match", "")
+        return _normalize(f"{request.method} {request.url.raw_path.decode()} {etag} {digest}")
+
+    @staticmethod
+    def _build(request: httpx.Request, payload: Dict[str, Any]) -> httpx.Response:
+        return httpx.Response(
+            payload["status_code"],
+            headers=payload["headers"],
+            content=payload["content"],
+            request=request
+        )
+
+    @staticmethod
+    def _payload(response: httpx.Response) -> Dict[str, Any]:
+        return {
+            "status_code": response.status_code,
+            "headers": [(k, v) for k, v in response.headers.items() if k.lower() not in _DROPPED_HEADERS],
+            "content": response.content
+        }
+
+    def handle_request(self, request: httpx.Request) -> httpx.Response:
+        key = self._key(request)
+        if _replaying():
+            _, payload, latency = _lookup(self.namespace, key)
+            time.sleep(_replay_delay(latency))
+            return self._build(request, payload)
+
+        started = time.perf_counter()
+        response = self._transport.handle_request(request)
+        try:
+            response.read()
+        finally:
+            response.close()
+        payload = self._payload(response)
+        get_store().put(self.namespace, key, "http", payload, time.perf_counter() - started)
+        return self._build(request, payload)
+
+    async def handle_async_request(self, request: httpx.Request) -> httpx.Response:
+        key = self._key(request)
+        if _replaying():
+            _, payload, latency = await asyncio.to_thread(_lookup, self.namespace, key)
+            await asyncio.sleep(_replay_delay(latency))
+            return self._build(request, payload)
+
+        started = time.perf_counter()
+        response = await self._async_transport.handle_async_request(request)
+        try:
+            await response.aread()
+        finally:
+            await response.aclose()
+        payload = self._payload(response)
+        await asyncio.to_thread(
+            get_store().put, self.namespace, key, "http", payload, time.perf_counter() - started
+        )
+        return self._build(request, payload)
+
+    def close(self):
+        self._transport.close()
+
+    async def aclose(self):
+        await self._async_transport.aclose()
+
+def async_transport(namespace: str, **transport_kwargs) -> Optional[httpx.AsyncBaseTransport]:
+    """
+    비동기 클라이언트용 트랜스포트 (사용 안 하면 None → httpx 기본 트랜스포트)
+
+    Args:
+        namespace: 녹화 네임스페이스 (예: "spring")
+        **transport_kwargs: httpx.AsyncHTTPTransport 인자 (http2, limits 등)
+    """
+    if not is_enabled():
+        return None
+    return ReplayTransport(namespace, async_transport=httpx.AsyncHTTPTransport(**transport_kwargs))
+
+@lru_cache(maxsize=None)
+def http_clients(namespace: str) -> Tuple[httpx.Client, httpx.AsyncClient]:
+    """
+    녹화/재생 트랜스포트를 쓰는 (동기, 비동기) httpx 클라이언트 (네임스페이스별 1쌍 재사용)
+
+    Args:
+        namespace: 녹화 네임스페이스 (예: "openai")
+    """
+    transport = ReplayTransport(namespace)
+    timeout = httpx.Timeout(600.0, connect=5.0)
+    return httpx.Client(transport=transport, timeout=timeout), httpx.AsyncClient(transport=transport, timeout=timeout)
+
+_installed = False
+
+def install():
+    """
+    pykrx.stock의 get_* 함수와 yfinance.Ticker/download를 녹화/재생 래퍼로 교체
+    (모듈 속성을 직접 바꾸므로 `from pykrx import stock`, `import yfinance as yf` 호출부는 그대로 동작)
+    """
+    global _installed
+    if _installed or not is_enabled():
+        return
+
+    from pykrx import stock
+    import yfinance
+
+    wrapped = 0
+    for name in dir(stock):
+        func = getattr(stock, name)
+        if name.startswith("get_") and callable(func):
+            setattr(stock, name, _wrap_callable("pykrx", name, func))
+            wrapped += 1
+    for name in ("Ticker", "download"):
+        setattr(yfinance, name, _wrap_callable("yfinance", name, getattr(yfinance, name)))
+
+    _installed = True
+    logger.info(
+        f"🎞️ 녹화/재생 모드: {settings.replay_mode} ({settings.replay_path}, "
+        f"pykrx 함수 {wrapped}개, 지연 배율 {settings.replay_latency_scale})"
+    )
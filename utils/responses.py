@@ -0,0 +1,175 @@
+"""
+응답 직렬화/압축 모듈
+orjson으로 JSON을 만들고 (NumPy 스칼라/배열을 변환 없이 직렬화, NaN → null),
+Accept-Encoding에 따라 brotli 또는 gzip으로 압축
+
+- ORJSONResponse: 앱 기본 응답 클래스
+  (엔드포인트가 dict를 반환하면 FastAPI가 먼저 jsonable_encoder로 변환하므로 NumPy 값은 지원되지 않음
+   → NumPy 값이 섞일 수 있는 엔드포인트는 ORJSONResponse(...)를 직접 반환해서 변환 없이 직렬화)
+- EncodedPayload: 캐시에 넣는 응답을 JSON 바이트 + 압축본으로 한 번만 만들어 두고 요청마다 그대로 전송
+- CompressionMiddleware: 그 밖의 응답을 요청마다 압축 (이미 압축된 응답, 스트리밍 응답, 작은 응답은 그대로)
+- brotli 패키지는 선택 사항 (없으면 gzip만 사용)
+"""
+from typing import Any, Dict, Optional
+import gzip
+import orjson
+from fastapi.responses import JSONResponse, Response
+from starlette.datastructures import Headers, MutableHeaders
+from utils.config import settings
+
+try:
+    import brotli
+except ImportError:  # 선택 의존성
+    brotli = None
+
+# 선호 순서 (같은 q 값이면 앞쪽 우선)
+ENCODINGS = ("br", "gzip") if brotli is not None else ("gzip",)
+
+# 미리 만들어 두는 압축본은 한 번만 계산하므로 최고 압축률 사용
+PRECOMPUTED_GZIP_LEVEL = 9
+PRECOMPUTED_BROTLI_QUALITY = 11
+
+COMPRESSIBLE_TYPES = ("application/json", "text/")
+
+_OPTIONS = orjson.OPT_SERIALIZE_NUMPY | orjson.OPT_NON_STR_KEYS
+
+def _default(value: Any) -> Any:
+    """orjson이 직접 처리하지 못하는 값 (NumPy 스칼라 하위 타입, pandas Timestamp 등)"""
+    if hasattr(value, "item"):
+        return value.item()
+    if hasattr(value, "isoformat"):
+        return value.isoformat()
+    if isinstance(value, (set, frozenset)):
+        return list(value)
+    raise TypeError(f"JSON으로 직렬화할 수 없는 타입: {type(value).__name__}")
+
+def dumps(content: Any) -> bytes:
+    """JSON 바이트 직렬화 (NumPy 스칼라/배열 지원, NaN/Infinity는 null)"""
+    return orjson.dumps(content, default=_default, option=_OPTIONS)
+
+def negotiate_encoding(accept_encoding: str) -> Optional[str]:
+    """
+    Accept-Encoding 헤더에서 사용할 압축 방식 선택
+
+    Returns:
+        "br", "gzip" 또는 None (압축하지 않음)
+    """
+    if not accept_encoding:
+        return None
+    accepted: Dict[str, float] = {}
+    for part in accept_encoding.lower().split(","):
+        name, _, params = part.partition(";")
+        quality = 1.0
+        params = params.strip()
+        if params.startswith("q="):
+            try:
+                quality = float(params[2:])
+            except ValueError:
+                quality = 0.0
+        accepted[name.strip()] = quality
+    wildcard = accepted.get("*", 0.0)
+    best, best_quality = None, 0.0
+    for encoding in ENCODINGS:
+        quality = accepted.get(encoding, wildcard)
+        if quality > best_quality:
+            best, best_quality = encoding, quality
+    return best
+
+def compress(body: bytes, encoding: str, precomputed: bool = False) -> bytes:
+    """본문 압축 (precomputed=True면 최고 압축률)"""
+    if encoding == "br":
+        quality = PRECOMPUTED_BROTLI_QUALITY if precomputed else settings.response_brotli_quality
+        return brotli.compress(body, quality=quality)
+    level = PRECOMPUTED_GZIP_LEVEL if precomputed else settings.response_gzip_level
+    return gzip.compress(body, compresslevel=level, mtime=0)
+
+class ORJSONResponse(JSONResponse):
+    """orjson 기반 JSON 응답"""
+
+    def render(self, content: Any) -> bytes:
+        return dumps(content)
+
+class EncodedPayload:
+    """직렬화/압축을 미리 끝낸 JSON 응답 본문 (공유 캐시에 그대로 저장 가능)"""
+
+    def __init__(self, body: bytes, compressed: Optional[Dict[str, bytes]] = None):
+        """
+        초기화
+
+        Args:
+            body: JSON 바이트
+            compressed: 압축 방식 → 압축된 본문
+        """
+        self.body = body
+        self.compressed = compressed or {}
+
+    @classmethod
+    def encode(cls, content: Any) -> "EncodedPayload":
+        """content를 JSON으로 직렬화하고, 충분히 크면 지원하는 모든 방식으로 압축해 둠"""
+        body = dumps(content)
+        compressed = {}
+        if len(body) >= settings.response_compression_min_bytes:
+            compressed = {encoding: compress(body, encoding, precomputed=True) for encoding in ENCODINGS}
+        return cls(body, compressed)
+
+    def response(self, accept_encoding: str = "", status_code: int = 200) -> Response:
+        """요청의 Accept-Encoding에 맞는 본문으로 응답 생성 (직렬화/압축 없이 바이트만 전송)"""
+        headers = {"Vary": "Accept-Encoding"} if self.compressed else None
+        response = Response(self.body, status_code=status_code, media_type="application/json", headers=headers)
+        encoding = negotiate_encoding(accept_encoding)
+        if encoding in self.compressed:
+            response.body = self.compressed[encoding]
+            response.headers["Content-Encoding"] = encoding
+            response.headers["Content-Length"] = str(len(response.body))
+        return response
+
+class CompressionMiddleware:
+    """
+    응답 압축 ASGI 미들웨어 (brotli 우선, 없으면 gzip)
+
+    본문이 한 번에 전달되는 응답만 압축 - 이미 Content-Encoding이 있거나(EncodedPayload),
+    스트리밍이거나, JSON/텍스트가 아니거나, minimum_size보다 작으면 그대로 전달
+    """
+
+    def __init__(self, app, minimum_size: int = 1024):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+        encoding = negotiate_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start = None
+
+        async def send_compressed(message):
+            nonlocal start
+            if message["type"] == "http.response.start":
+                start = message
+                return
+            if start is None or message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            headers = MutableHeaders(raw=start["headers"])
+            body = message.get("body", b"")
+            if (
+                not message.get("more_body", False)
+                and len(body) >= self.minimum_size
+                and "content-encoding" not in headers
+                and headers.get("content-type", "").startswith(COMPRESSIBLE_TYPES)
+            ):
+                body = compress(body, encoding)
+                headers["Content-Encoding"] = encoding
+                headers["Content-Length"] = str(len(body))
+                headers.add_vary_header("Accept-Encoding")
+                message = {**message, "body": body}
+            await send(start)
+            start = None
+            await send(message)
+
+        await self.app(scope, receive, send_compressed)
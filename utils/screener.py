@@ -0,0 +1,160 @@
+"""
+시장 스크리너 모듈
+전 종목 OHLCV + 시가총액을 열(column)별 NumPy 배열로 보관하고,
+조건(가격/등락률/거래량/거래대금/시가총액/회전율/일중 변동폭)을 불리언 마스크로 한 번에 평가해서 정렬·페이지네이션
+
+- 스냅샷은 워커별 메모리에 보관 (대시보드 갱신 때 받은 데이터를 그대로 재사용)
+- 값이 없는(NaN) 종목은 해당 항목으로 거르거나 정렬하면 제외/맨 뒤
+"""
+from typing import Any, Dict, Iterable, List, Optional, Tuple
+import threading
+import time
+from utils.lazy import lazy_import
+
+np = lazy_import("numpy")
+
+# 필터/정렬 가능한 항목 (응답 키 그대로 사용)
+FIELDS = ("price", "change_rate", "volume", "trading_value", "market_cap", "turnover", "range_pct")
+
+Range = Tuple[Optional[float], Optional[float]]
+
+class MarketSnapshot:
+    """한 거래일의 전 종목 열 배열"""
+
+    def __init__(self, date: str, tickers, markets, columns: Dict[str, Any]):
+        """
+        초기화
+
+        Args:
+            date: 거래일 (YYYYMMDD)
+            tickers: 종목 코드 배열
+            markets: 시장 구분 배열 ("KOSPI"/"KOSDAQ"/"KONEX")
+            columns: 항목 이름 → float 배열 (FIELDS)
+        """
+        self.date = date
+        self.tickers = tickers
+        self.markets = markets
+        self.columns = columns
+        self.loaded_at = time.monotonic()
+
+    @classmethod
+    def from_frames(cls, date: str, df_ohlcv, df_cap, market_tickers: Dict[str, Iterable[str]]) -> "MarketSnapshot":
+        """
+        pykrx 전 종목 OHLCV(market="ALL")와 시가총액 DataFrame으로 스냅샷 생성
+
+        Args:
+            date: 거래일
+            df_ohlcv: get_market_ohlcv(date, market="ALL") 결과 (index = 종목 코드)
+            df_cap: get_market_cap(date, market="ALL") 결과
+            market_tickers: 시장 → 종목 코드 (예: {"KOSPI": [...], "KOSDAQ": [...]}, 나머지는 KONEX)
+        """
+        df_ohlcv = df_ohlcv[~df_ohlcv.index.duplicated()]
+        tickers = df_ohlcv.index.to_numpy(dtype=str)
+
+        def column(frame, name):
+            if name not in frame.columns:
+                return np.full(len(tickers), np.nan)
+            return frame[name].to_numpy(dtype=float, na_value=np.nan)
+
+        close = column(df_ohlcv, "종가")
+        high, low, open_ = column(df_ohlcv, "고가"), column(df_ohlcv, "저가"), column(df_ohlcv, "시가")
+        trading_value = column(df_ohlcv, "거래대금")
+        market_cap = column(df_cap.reindex(df_ohlcv.index), "시가총액")
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            columns = {
+                "price": close,
+                "change_rate": column(df_ohlcv, "등락률"),
+                "volume": column(df_ohlcv, "거래량"),
+                "trading_value": trading_value,
+                "market_cap": market_cap,
+                # 회전율: 거래대금 / 시가총액 (%)
+                "turnover": np.where(market_cap > 0, trading_value / market_cap * 100, np.nan),
+                # 일중 변동폭: (고가 - 저가) / 시가 (%)
+                "range_pct": np.where(open_ > 0, (high - low) / open_ * 100, np.nan)
+            }
+
+        markets = np.full(len(tickers), "KONEX", dtype=object)
+        for market, codes in market_tickers.items():
+            markets[np.isin(tickers, list(codes))] = market
+        return cls(date, tickers, markets, columns)
+
+    def screen(
+        self,
+        market: str = "ALL",
+        ranges: Optional[Dict[str, Range]] = None,
+        sort: str = "market_cap",
+        descending: bool = True,
+        offset: int = 0,
+        limit: int = 20
+    ) -> Tuple[int, List[Dict[str, Any]]]:
+        """
+        조건에 맞는 종목 조회
+
+        Args:
+            market: "ALL", "KOSPI", "KOSDAQ"
+            ranges: 항목 → (최솟값, 최댓값) (None이면 그 쪽 제한 없음)
+            sort: 정렬 항목 (FIELDS)
+            descending: 내림차순 여부
+            offset: 건너뛸 개수
+            limit: 반환 개수
+
+        Returns:
+            (조건에 맞는 전체 종목 수, 현재 페이지 종목 목록)
+        """
+        mask = np.ones(len(self.tickers), dtype=bool)
+        if market != "ALL":
+            mask &= self.markets == market
+        with np.errstate(invalid="ignore"):
+            for field, (low, high) in (ranges or {}).items():
+                values = self.columns[field]
+                if low is not None:
+                    mask &= values >= low
+                if high is not None:
+                    mask &= values <= high
+
+        matched = np.flatnonzero(mask)
+        keys = self.columns[sort][matched]
+        # NaN은 오름차순/내림차순 모두 맨 뒤 (argsort는 NaN을 끝에 둠)
+        order = np.argsort(-keys if descending else keys, kind="stable")
+        page = matched[order[offset:offset + limit]]
+
+        rows = []
+        values = {field: self.columns[field][page].tolist() for field in FIELDS}
+        for i, row in enumerate(page.tolist()):
+            item: Dict[str, Any] = {"code": str(self.tickers[row]), "market": self.markets[row]}
+            for field in FIELDS:
+                value = values[field][i]
+                item[field] = None if value != value else _compact(field, value)  # NaN → None
+            rows.append(item)
+        return len(matched), rows
+
+def _compact(field: str, value: float):
+    """정수 항목은 int, 비율 항목은 소수 2자리"""
+    if field in ("price", "volume", "trading_value", "market_cap"):
+        return int(value)
+    return round(value, 2)
+
+class MarketScreener:
+    """현재 거래일 스냅샷 보관 (워커별)"""
+
+    def __init__(self):
+        self._snapshot: Optional[MarketSnapshot] = None
+        self._lock = threading.Lock()
+
+    def update(self, snapshot: MarketSnapshot):
+        """스냅샷 교체"""
+        with self._lock:
+            self._snapshot = snapshot
+
+    @property
+    def snapshot(self) -> Optional[MarketSnapshot]:
+        return self._snapshot
+
+    def is_stale(self, max_age_seconds: float) -> bool:
+        """스냅샷이 없거나 max_age_seconds보다 오래됨"""
+        snapshot = self._snapshot
+        return snapshot is None or time.monotonic() - snapshot.loaded_at > max_age_seconds
+
+# 전역 스크리너 인스턴스
+market_screener = MarketScreener()
@@ -0,0 +1,176 @@
+"""
+세션 대화 메모리 모듈
+session_id별 최근 대화(질문 + 답변 앞부분)와 마지막으로 확정된 종목을 보관해서
+"그럼 목표주가는?" 같은 후속 질문에 이전 맥락과 종목 코드를 재사용
+
+메모리 상한:
+- 세션당 최근 session_max_turns턴만 보관 (링 버퍼)
+- 답변은 앞 session_answer_tokens 토큰으로 잘라 저장, 프롬프트용 맥락은 session_context_tokens 이하
+- session_idle_seconds 동안 사용 없는 세션은 삭제, 전체 세션 수는 session_max_sessions 이하 (LRU)
+(공유 캐시 백엔드가 설정되면 워커 간 공유 - TTL이 유휴 만료를 대신함)
+"""
+from collections import OrderedDict, deque
+from typing import Any, Dict, Optional
+import threading
+import time
+from utils.answer_cache import fingerprint
+from utils.config import settings
+from utils.logger import logger
+from utils.shared_cache import get_shared_cache, is_shared
+from utils.tokenizer import count_tokens, truncate_tokens
+
+Session = Dict[str, Any]  # {"turns": deque[dict], "stock_code": str | None, "updated": float}
+
+class SessionMemory:
+    """세션별 대화 링 버퍼 (유휴 만료 + 전체 개수 LRU 상한)"""
+
+    def __init__(
+        self,
+        max_sessions: int = 5000,
+        max_turns: int = 6,
+        idle_seconds: int = 1800,
+        answer_tokens: int = 80,
+        context_tokens: int = 400
+    ):
+        """
+        초기화
+
+        Args:
+            max_sessions: 최대 세션 수 (초과 시 가장 오래 사용 안 된 세션 제거)
+            max_turns: 세션당 보관할 최근 턴 수
+            idle_seconds: 유휴 세션 만료 시간 (초)
+            answer_tokens: 턴마다 저장할 답변 앞부분 토큰 수
+            context_tokens: 프롬프트에 넣을 맥락 최대 토큰 수
+        """
+        self.max_sessions = max_sessions
+        self.max_turns = max_turns
+        self.idle_seconds = idle_seconds
+        self.answer_tokens = answer_tokens
+        self.context_tokens = context_tokens
+        self._sessions: "OrderedDict[str, Session]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._last_prune = time.time()
+
+    @staticmethod
+    def _shared_key(session_id: str) -> str:
+        return f"session:{fingerprint(session_id)}"
+
+    def get(self, session_id: str) -> Optional[Session]:
+        """세션 조회 (없거나 유휴 만료면 None)"""
+        if not session_id or self.max_turns <= 0:
+            return None
+        if is_shared():
+            return get_shared_cache().get(self._shared_key(session_id))
+
+        with self._lock:
+            session = self._sessions.get(session_id)
+            if session is None:
+                return None
+            if time.time() - session["updated"] > self.idle_seconds:
+                del self._sessions[session_id]
+                return None
+            self._sessions.move_to_end(session_id)
+            return session
+
+    def remember(
+        self,
+        session_id: str,
+        question: str,
+        answer: str,
+        category: str,
+        stock_code: Optional[str] = None
+    ):
+        """
+        턴 저장 (답변은 앞부분만 토큰 단위로 잘라서 보관)
+
+        Args:
+            session_id: 세션 ID
+            question: 사용자 질문
+            answer: 생성된 답변
+            category: 질문 카테고리
+            stock_code: 이번 턴에서 확정된 종목 코드 (없으면 이전 종목 유지)
+        """
+        if not session_id or self.max_turns <= 0:
+            return
+        turn = {
+            "question": truncate_tokens(question, self.answer_tokens, settings.openai_model),
+            "answer": truncate_tokens(answer.strip(), self.answer_tokens, settings.openai_model),
+            "category": category,
+            "stock_code": stock_code
+        }
+
+        if is_shared():
+            cache = get_shared_cache()
+            key = self._shared_key(session_id)
+            session = cache.get(key) or self._new_session()
+            self._append(session, turn)
+            cache.set(key, session, ttl=self.idle_seconds)
+            cache.prune("session", self.max_sessions)
+            return
+
+        with self._lock:
+            session = self._sessions.get(session_id) or self._new_session()
+            self._append(session, turn)
+            self._sessions[session_id] = session
+            self._sessions.move_to_end(session_id)
+            while len(self._sessions) > self.max_sessions:
+                self._sessions.popitem(last=False)
+        if time.time() - self._last_prune > 60:
+            self.prune_idle()
+
+    def _new_session(self) -> Session:
+        return {"turns": deque(maxlen=self.max_turns), "stock_code": None, "updated": 0.0}
+
+    @staticmethod
+    def _append(session: Session, turn: Dict[str, Any]):
+        session["turns"].append(turn)
+        if turn["stock_code"]:
+            session["stock_code"] = turn["stock_code"]
+        session["updated"] = time.time()
+
+    def context(self, session: Optional[Session]) -> str:
+        """
+        프롬프트용 최근 대화 블록 (최신 턴부터 context_tokens 안에 들어가는 만큼, 시간순 정렬)
+
+        Returns:
+            "이전 대화 (참고용):\\n사용자: ...\\nAI: ...\\n\\n" 형식 문자열
+            (프롬프트의 {history} 자리에 그대로 삽입, 대화가 없으면 빈 문자열)
+        """
+        if not session:
+            return ""
+        blocks = []
+        used = 0
+        for turn in reversed(session["turns"]):
+            block = f"사용자: {turn['question']}\nAI: {turn['answer']}"
+            tokens = count_tokens(block, settings.openai_model)
+            if used + tokens > self.context_tokens:
+                break
+            blocks.append(block)
+            used += tokens
+        if not blocks:
+            return ""
+        return "이전 대화 (참고용):\n" + "\n".join(reversed(blocks)) + "\n\n"
+
+    def prune_idle(self) -> int:
+        """유휴 만료 세션 삭제 (공유 백엔드는 TTL로 처리)"""
+        now = time.time()
+        with self._lock:
+            expired = [sid for sid, s in self._sessions.items() if now - s["updated"] > self.idle_seconds]
+            for sid in expired:
+                del self._sessions[sid]
+            self._last_prune = now
+        if expired:
+            logger.debug(f"유휴 세션 {len(expired)}개 삭제")
+        return len(expired)
+
+    def __len__(self) -> int:
+        return len(self._sessions)
+
+# 전역 세션 메모리 인스턴스
+session_memory = SessionMemory(
+    max_sessions=settings.session_max_sessions,
+    max_turns=settings.session_max_turns,
+    idle_seconds=settings.session_idle_seconds,
+    answer_tokens=settings.session_answer_tokens,
+    context_tokens=settings.session_context_tokens
+)
@@ -0,0 +1,272 @@
+"""
+워커 간 공유 캐시 모듈
+uvicorn 워커 여러 개가 시장 스냅샷/답변/경제지표/종목명 캐시를 공유하고,
+상위 데이터(pykrx, Spring Boot) 갱신은 리더 워커 하나만 수행하도록 조정
+
+백엔드 (settings.shared_cache_backend):
+- "memory": 프로세스 내부 dict (워커 1개일 때 기본값)
+- "file"  : 공유 메모리 디렉터리(/dev/shm) 파일 - 같은 Pod의 워커끼리 공유
+- "redis" : Redis 호환 캐시 서버 (redis 패키지 필요, 로컬 캐시 서버로 대체 가능)
+
+리더 선출/단일 갱신은 같은 디렉터리의 파일 락(fcntl.flock)으로 처리 (프로세스가 죽으면 자동 해제)
+"""
+from functools import lru_cache
+from typing import Any, Dict, Optional, Set, Tuple
+import asyncio
+import hashlib
+import os
+import pickle
+import tempfile
+import threading
+import time
+from utils.config import settings
+from utils.logger import logger
+
+try:
+    import fcntl
+except ImportError:  # Windows: 파일 락 없이 항상 리더로 동작
+    fcntl = None
+
+def _safe_name(key: str) -> str:
+    return hashlib.sha1(key.encode("utf-8")).hexdigest()
+
+def _namespace(key: str) -> str:
+    return key.split(":", 1)[0] if ":" in key else "default"
+
+class MemoryBackend:
+    """프로세스 내부 캐시 (워커 1개용)"""
+
+    def __init__(self):
+        self._entries: Dict[str, Tuple[float, Any]] = {}
+        self._lock = threading.Lock()
+
+    def get(self, key: str) -> Optional[Any]:
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            if entry[0] and entry[0] < time.time():
+                del self._entries[key]
+                return None
+            return entry[1]
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        with self._lock:
+            self._entries[key] = (time.time() + ttl if ttl else 0.0, value)
+
+    def delete(self, key: str):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def prune(self, namespace: str, max_entries: int):
+        with self._lock:
+            keys = [k for k in self._entries if _namespace(k) == namespace]
+            for key in keys[:max(0, len(keys) - max_entries)]:
+                del self._entries[key]
+
+class FileBackend:
+    """공유 메모리 디렉터리 기반 캐시 (키마다 파일 1개, 원자적 교체로 쓰기)"""
+
+    def __init__(self, directory: str):
+        self.directory = directory
+        os.makedirs(directory, exist_ok=True)
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, _namespace(key), _safe_name(key))
+
+    def get(self, key: str) -> Optional[Any]:
+        path = self._path(key)
+        try:
+            with open(path, "rb") as f:
+                expires_at, value = pickle.load(f)
+        except FileNotFoundError:
+            return None
+        except Exception as e:
+            logger.warning(f"공유 캐시 읽기 실패 ({key}): {e}")
+            return None
+        if expires_at and expires_at < time.time():
+            self.delete(key)
+            return None
+        return value
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        path = self._path(key)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        tmp_path = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            pickle.dump((time.time() + ttl if ttl else 0.0, value), f, protocol=pickle.HIGHEST_PROTOCOL)
+        os.replace(tmp_path, path)
+
+    def delete(self, key: str):
+        try:
+            os.remove(self._path(key))
+        except FileNotFoundError:
+            pass
+
+    def prune(self, namespace: str, max_entries: int):
+        """네임스페이스 항목이 max_entries를 넘으면 오래된 것부터 삭제"""
+        directory = os.path.join(self.directory, namespace)
+        try:
+            entries = [e for e in os.scandir(directory) if not e.name.endswith(".tmp")]
+        except FileNotFoundError:
+            return
+        if len(entries) <= max_entries:
+            return
+        entries.sort(key=lambda e: e.stat().st_mtime)
+        for entry in entries[:len(entries) - max_entries]:
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:
+                pass
+
+class RedisBackend:
+    """Redis 호환 캐시 서버 (만료/용량 관리는 서버의 TTL, maxmemory 정책에 맡김)"""
+
+    def __init__(self, url: str):
+        import redis  # 선택 의존성: redis 백엔드를 쓸 때만 필요
+        self._client = redis.Redis.from_url(url)
+        self._prefix = "ai-service:"
+
+    def get(self, key: str) -> Optional[Any]:
+        try:
+            raw = self._client.get(self._prefix + key)
+        except Exception as e:
+            logger.warning(f"공유 캐시 읽기 실패 ({key}): {e}")
+            return None
+        return pickle.loads(raw) if raw is not None else None
+
+    def set(self, key: str, value: Any, ttl: Optional[float] = None):
+        try:
+            self._client.set(
+                self._prefix + key,
+                pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL),
+                px=int(ttl * 1000) if ttl else None
+            )
+        except Exception as e:
+            logger.warning(f"공유 캐시 쓰기 실패 ({key}): {e}")
+
+    def delete(self, key: str):
+        try:
+            self._client.delete(self._prefix + key)
+        except Exception as e:
+            logger.warning(f"공유 캐시 삭제 실패 ({key}): {e}")
+
+    def prune(self, namespace: str, max_entries: int):
+        return
+
+# 파일 락을 쓰지 않을 때의 프로세스 내부 락 상태
+_local_lock = threading.Lock()
+_local_held: Set[str] = set()
+
+class ProcessLock:
+    """
+    프로세스 간 파일 락 (같은 Pod의 워커끼리 배타적)
+    락마다 파일을 새로 열어서 같은 프로세스의 다른 코루틴/스레드와도 배타적
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._fd: Optional[int] = None
+
+    @property
+    def held(self) -> bool:
+        return self._fd is not None
+
+    def acquire(self) -> bool:
+        """논블로킹 획득 시도 (이미 보유 중이면 True)"""
+        if self._fd is not None:
+            return True
+        if fcntl is None or not is_shared():
+            # 공유 캐시를 안 쓰면 프로세스 안에서만 배타적 (같은 호스트의 다른 서버와 락을 나누지 않음)
+            with _local_lock:
+                if self.name in _local_held:
+                    return False
+                _local_held.add(self.name)
+            self._fd = -1
+            return True
+        path = os.path.join(lock_directory(), f"{self.name}.lock")
+        fd = os.open(path, os.O_RDWR | os.O_CREAT, 0o644)
+        try:
+            fcntl.flock(fd, fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            os.close(fd)
+            return False
+        self._fd = fd
+        return True
+
+    def release(self):
+        if self._fd is None:
+            return
+        if self._fd == -1:
+            with _local_lock:
+                _local_held.discard(self.name)
+        else:
+            fcntl.flock(self._fd, fcntl.LOCK_UN)
+            os.close(self._fd)
+        self._fd = None
+
+@lru_cache(maxsize=1)
+def lock_directory() -> str:
+    """락/파일 캐시 디렉터리 (/dev/shm이 없으면 임시 디렉터리)"""
+    directory = settings.shared_cache_dir
+    parent = os.path.dirname(directory.rstrip("/")) or "/"
+    if not os.path.isdir(parent):
+        directory = os.path.join(tempfile.gettempdir(), os.path.basename(directory.rstrip("/")))
+    os.makedirs(directory, exist_ok=True)
+    return directory
+
+@lru_cache(maxsize=1)
+def get_shared_cache():
+    """설정에 맞는 공유 캐시 백엔드 (프로세스당 1개)"""
+    backend = settings.shared_cache_backend
+    if backend == "file":
+        cache = FileBackend(os.path.join(lock_directory(), "cache"))
+    elif backend == "redis":
+        cache = RedisBackend(settings.shared_cache_url)
+    else:
+        if settings.workers > 1:
+            logger.warning("⚠️ 워커가 여러 개인데 공유 캐시가 memory 백엔드입니다 (SHARED_CACHE_BACKEND=file 권장)")
+        cache = MemoryBackend()
+    logger.info(f"공유 캐시 백엔드: {type(cache).__name__}")
+    return cache
+
+def is_shared() -> bool:
+    """캐시가 프로세스 밖에 있는지 여부 (memory 백엔드가 아니면 True)"""
+    return settings.shared_cache_backend in ("file", "redis")
+
+async def wait_for(key: str, timeout: float, interval: float = 0.1) -> Optional[Any]:
+    """
+    다른 워커가 공유 캐시에 값을 채울 때까지 대기
+
+    Args:
+        key: 캐시 키
+        timeout: 최대 대기 시간 (초)
+        interval: 확인 간격 (초)
+
+    Returns:
+        값 또는 None (시간 초과)
+    """
+    cache = get_shared_cache()
+    deadline = time.monotonic() + timeout
+    while time.monotonic() < deadline:
+        value = cache.get(key)
+        if value is not None:
+            return value
+        await asyncio.sleep(interval)
+    return None
+
+# ★ 리더 워커 (주기적 상위 데이터 갱신 담당) - 리더가 죽으면 다음 확인 시 다른 워커가 승계
+_leader_lock: Optional[ProcessLock] = None
+
+def is_leader() -> bool:
+    """이 워커가 리더인지 확인 (리더가 없으면 획득 시도, 공유 캐시를 안 쓰면 항상 리더)"""
+    global _leader_lock
+    if not is_shared():
+        return True
+    if _leader_lock is None:
+        _leader_lock = ProcessLock("leader")
+    was_leader = _leader_lock.held
+    leader = _leader_lock.acquire()
+    if leader and not was_leader:
+        logger.info(f"👑 리더 워커로 선출됨 (pid={os.getpid()})")
+    return leader
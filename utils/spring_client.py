@@ -3,9 +3,38 @@ Spring Boot 백엔드와 통신하는 클라이언트 모듈
 경제지표 데이터를 Spring Boot의 MariaDB에서 가져옴
 """
 import httpx
-from typing import Dict, Optional
+import asyncio
+import random
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
 from utils.logger import logger
 from utils.config import settings
+from utils.metrics import SPRING_LATENCY, record_cache
+from utils.tracing import span
+from utils.shared_cache import get_shared_cache, is_leader, is_shared
+from utils.indicator_history import get_indicator_history
+from utils import replay
+
+# 경제지표 갱신 실패 후 요청 기반 재시도까지 최소 대기 시간 (초)
+INDICATOR_RETRY_SECONDS = 30
+
+# 워커 간 공유 경제지표 스냅샷 키
+INDICATORS_CACHE_KEY = "spring:indicators"
+
+# 재시도 대상 HTTP 상태 코드 (일시적 오류)
+RETRYABLE_STATUS_CODES = {429, 502, 503, 504}
+
+# 엔드포인트별 지연 시간 샘플 보관 개수
+LATENCY_SAMPLE_SIZE = 1000
+
+def _http2_available() -> bool:
+    """HTTP/2 사용 가능 여부 (h2 패키지 필요)"""
+    try:
+        import h2  # noqa: F401
+        return True
+    except ImportError:
+        return False
 
 class SpringBootClient:
     """Spring Boot API 클라이언트"""
@@ -21,35 +50,314 @@ class SpringBootClient:
                      - Kubernetes: http://backend-svc:8080
         """
         self.base_url = base_url
-        self.client = httpx.AsyncClient(timeout=30.0)  # 30초 타임아웃
+        
+        self.http2 = settings.spring_http2 and _http2_available()
+        if settings.spring_http2 and not self.http2:
+            logger.warning("h2 패키지가 없어 HTTP/1.1로 Spring Boot에 연결합니다")
+        
+        # ★ httpx 클라이언트는 첫 사용(또는 서버 시작) 시 이벤트 루프 안에서 생성
+        self._client: Optional[httpx.AsyncClient] = None
+        
+        # ★ 엔드포인트별 호출 통계 (지연 시간, 재시도, 헤징 등)
+        self._latencies: Dict[str, Deque[float]] = {}
+        self._counters: Dict[str, Dict[str, int]] = {}
+        self._in_flight = 0
+        
+        # ★ 경제지표 캐시 (하루 1회 수준으로 바뀌는 데이터)
+        self._indicators: Optional[Dict] = None
+        self._indicators_fetched_at: float = 0.0
+        self._indicators_etag: Optional[str] = None
+        self._indicators_attempted_at: float = 0.0
+        self._indicators_lock = asyncio.Lock()
+        self._pending_refresh: Optional[asyncio.Task] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+    
+    @property
+    def client(self) -> httpx.AsyncClient:
+        """커넥션 풀 + 기본 타임아웃을 설정한 httpx 클라이언트 (엔드포인트별 타임아웃은 요청 시 지정)"""
+        if self._client is None:
+            limits = httpx.Limits(
+                max_connections=settings.spring_max_connections,
+                max_keepalive_connections=settings.spring_max_keepalive_connections
+            )
+            self._client = httpx.AsyncClient(
+                http2=self.http2,
+                timeout=httpx.Timeout(
+                    settings.spring_default_timeout,
+                    connect=settings.spring_connect_timeout
+                ),
+                limits=limits,
+                # 녹화/재생 모드에서만 ReplayTransport (그 외 None → httpx 기본 트랜스포트)
+                transport=replay.async_transport("spring", http2=self.http2, limits=limits)
+            )
+        return self._client
+    
+    def _timeout_for(self, endpoint: str) -> httpx.Timeout:
+        """엔드포인트별 타임아웃 (설정 없으면 기본값)"""
+        total = settings.spring_timeouts.get(endpoint, settings.spring_default_timeout)
+        return httpx.Timeout(total, connect=min(settings.spring_connect_timeout, total))
+    
+    def _count(self, endpoint: str, name: str):
+        """엔드포인트별 카운터 증가"""
+        counters = self._counters.setdefault(
+            endpoint, {"requests": 0, "errors": 0, "retries": 0, "hedges": 0}
+        )
+        counters[name] += 1
+    
+    async def _send(self, endpoint: str, url: str, **kwargs) -> httpx.Response:
+        """단일 GET 요청 (지연 시간 기록)"""
+        started = time.perf_counter()
+        self._in_flight += 1
+        try:
+            with span(f"spring.{endpoint}"):
+                return await self.client.get(url, timeout=self._timeout_for(endpoint), **kwargs)
+        finally:
+            self._in_flight -= 1
+            elapsed = time.perf_counter() - started
+            self._latencies.setdefault(
+                endpoint, deque(maxlen=LATENCY_SAMPLE_SIZE)
+            ).append(elapsed)
+            SPRING_LATENCY.labels(endpoint=endpoint).observe(elapsed)
+    
+    async def _send_hedged(self, endpoint: str, url: str, **kwargs) -> httpx.Response:
+        """
+        헤징 요청: 첫 요청이 hedge 지연 안에 끝나지 않으면 같은 요청을 하나 더 보내
+        먼저 성공한 응답 사용 (꼬리 지연 완화)
+        """
+        delay = settings.spring_hedge_delay_ms / 1000
+        if delay <= 0 or endpoint not in settings.spring_hedged_endpoints:
+            return await self._send(endpoint, url, **kwargs)
+        
+        first = asyncio.create_task(self._send(endpoint, url, **kwargs))
+        done, _ = await asyncio.wait({first}, timeout=delay)
+        if done:
+            return first.result()
+        
+        self._count(endpoint, "hedges")
+        second = asyncio.create_task(self._send(endpoint, url, **kwargs))
+        pending = {first, second}
+        error: Optional[BaseException] = None
+        try:
+            while pending:
+                done, pending = await asyncio.wait(pending, return_when=asyncio.FIRST_COMPLETED)
+                for task in done:
+                    if task.exception() is None:
+                        return task.result()
+                    error = task.exception()
+            raise error
+        finally:
+            for task in pending:
+                task.cancel()
+    
+    async def _get(self, endpoint: str, path: str, **kwargs) -> httpx.Response:
+        """
+        멱등 GET 요청 (엔드포인트별 타임아웃 + 지터 재시도 + 선택적 헤징)
+        
+        Args:
+            endpoint: 설정/통계용 엔드포인트 이름 (예: "indicators")
+            path: 요청 경로 (예: "/api/indicators/latest")
+            **kwargs: httpx.get 인자 (params, headers 등)
+        
+        Returns:
+            httpx.Response (재시도 후에도 실패하면 예외 발생)
+        """
+        url = f"{self.base_url}{path}"
+        self._count(endpoint, "requests")
+        
+        attempt = 0
+        while True:
+            last = attempt >= settings.spring_max_retries
+            try:
+                response = await self._send_hedged(endpoint, url, **kwargs)
+            except httpx.TransportError as e:
+                # 연결 실패/타임아웃 등 전송 계층 오류만 재시도
+                if last:
+                    self._count(endpoint, "errors")
+                    raise
+                logger.warning(f"Spring Boot {endpoint} 요청 실패 ({type(e).__name__}) - 재시도 {attempt + 1}")
+            else:
+                if response.status_code not in RETRYABLE_STATUS_CODES:
+                    return response
+                if last:
+                    # 재시도 후에도 5xx/429면 오류로 집계하고 응답은 그대로 반환 (호출 측에서 raise_for_status)
+                    self._count(endpoint, "errors")
+                    return response
+                logger.warning(f"Spring Boot {endpoint} 일시 오류 {response.status_code} - 재시도 {attempt + 1}")
+            
+            self._count(endpoint, "retries")
+            # 지수 백오프 + full jitter
+            backoff = settings.spring_retry_backoff_seconds * (2 ** attempt)
+            await asyncio.sleep(random.uniform(0, backoff))
+            attempt += 1
+    
+    def get_stats(self) -> Dict[str, Any]:
+        """
+        커넥션 풀/엔드포인트별 지연 시간 통계
+        
+        Returns:
+            {"pool": {...}, "endpoints": {endpoint: {"requests", "p50_ms", "p95_ms", ...}}}
+        """
+        endpoints: Dict[str, Any] = {}
+        for endpoint, counters in self._counters.items():
+            samples = sorted(self._latencies.get(endpoint, ()))
+            stats: Dict[str, Any] = dict(counters)
+            if samples:
+                stats["p50_ms"] = round(samples[len(samples) // 2] * 1000, 1)
+                stats["p95_ms"] = round(samples[min(len(samples) - 1, int(len(samples) * 0.95))] * 1000, 1)
+                stats["max_ms"] = round(samples[-1] * 1000, 1)
+            endpoints[endpoint] = stats
+        
+        return {
+            "pool": {
+                "in_flight": self._in_flight,
+                "max_connections": settings.spring_max_connections,
+                "max_keepalive_connections": settings.spring_max_keepalive_connections,
+                "http2": self.http2
+            },
+            "endpoints": endpoints
+        }
     
     async def get_economic_indicators(self) -> Optional[Dict]:
         """
-        경제지표 데이터 조회 (MariaDB)
+        경제지표 데이터 조회 (MariaDB, 캐시 우선)
+        
+        - 캐시가 신선하면 즉시 반환
+        - 만료됐으면 기존 값을 즉시 반환하고 백그라운드에서 갱신
+        - 캐시가 없을 때(최초 1회)만 Spring Boot 응답을 기다림
         
         Returns:
             경제지표 딕셔너리 {"기준금리": "3.5%", "M2 통화량": "3500조원", ...}
             실패 시 None
         """
-        try:
-            logger.info("Spring Boot에서 경제지표 조회 시작")
+        if self._indicators is not None:
+            age = time.monotonic() - self._indicators_fetched_at
+            fresh = age < settings.indicator_cache_ttl_seconds
+            record_cache("indicators", fresh)
+            if not fresh:
+                self._schedule_indicator_refresh()
+            return self._indicators
+        
+        record_cache("indicators", False)
+        return await self.refresh_economic_indicators()
+    
+    def _schedule_indicator_refresh(self):
+        """진행 중인 갱신이 없으면 백그라운드 갱신 예약 (실패 직후에는 재시도 간격 유지)"""
+        if time.monotonic() - self._indicators_attempted_at < INDICATOR_RETRY_SECONDS:
+            return
+        if self._pending_refresh is None or self._pending_refresh.done():
+            self._pending_refresh = asyncio.create_task(self.refresh_economic_indicators())
+    
+    async def refresh_economic_indicators(self, force: bool = False) -> Optional[Dict]:
+        """
+        Spring Boot에서 경제지표를 다시 조회하여 캐시 갱신
+        (ETag가 있으면 If-None-Match 조건부 요청, 실패 시 기존 캐시 유지)
+        
+        Args:
+            force: True면 캐시가 신선해도 조회
+        
+        Returns:
+            최신(또는 기존) 경제지표 딕셔너리, 둘 다 없으면 None
+        """
+        async with self._indicators_lock:
+            # 대기 중 다른 요청(또는 다른 워커)이 이미 갱신했으면 재요청하지 않음
+            self._load_shared_indicators()
+            if (not force and self._indicators is not None and
+                    time.monotonic() - self._indicators_fetched_at < settings.indicator_cache_ttl_seconds):
+                return self._indicators
             
-            # ★ Spring Boot의 /api/indicators/latest 엔드포인트 호출
-            response = await self.client.get(
-                f"{self.base_url}/api/indicators/latest"
-            )
-            response.raise_for_status()
+            self._indicators_attempted_at = time.monotonic()
+            headers = {}
+            if self._indicators_etag and self._indicators is not None:
+                headers["If-None-Match"] = self._indicators_etag
             
-            data = response.json()
-            logger.info(f"경제지표 조회 성공: {data}")
-            return data
+            try:
+                logger.info("Spring Boot에서 경제지표 조회 시작")
+                
+                # ★ Spring Boot의 /api/indicators/latest 엔드포인트 호출
+                response = await self._get(
+                    "indicators",
+                    "/api/indicators/latest",
+                    headers=headers
+                )
+                
+                if response.status_code == 304:
+                    logger.info("경제지표 변경 없음 (304 Not Modified)")
+                else:
+                    response.raise_for_status()
+                    self._indicators = response.json()
+                    self._indicators_etag = response.headers.get("ETag")
+                    logger.info(f"경제지표 조회 성공: {len(self._indicators)}개 항목")
+                    logger.debug(f"경제지표 데이터: {self._indicators}")
+                
+                self._indicators_fetched_at = time.monotonic()
+                self._publish_shared_indicators()
+                # ★ 추세 계산용 일별 이력 기록 (304여도 오늘 날짜 관측으로 남김)
+                await self._record_indicator_history()
+                
+            except httpx.HTTPStatusError as e:
+                logger.error(f"경제지표 조회 HTTP 오류: {e.response.status_code}")
+            except Exception as e:
+                logger.error(f"경제지표 조회 실패: {str(e)}")
             
-        except httpx.HTTPStatusError as e:
-            logger.error(f"경제지표 조회 HTTP 오류: {e.response.status_code}")
-            return None
+            if self._indicators is not None and time.monotonic() - self._indicators_fetched_at >= settings.indicator_cache_ttl_seconds:
+                logger.warning("⚠️ 경제지표 갱신 실패 - 기존 캐시 데이터 사용")
+            return self._indicators
+    
+    async def _record_indicator_history(self):
+        """조회한 경제지표를 일별 이력에 기록 (실패해도 조회 결과에는 영향 없음)"""
+        try:
+            await asyncio.to_thread(get_indicator_history().record, self._indicators)
         except Exception as e:
-            logger.error(f"경제지표 조회 실패: {str(e)}")
-            return None
+            logger.error(f"경제지표 이력 기록 실패: {e}")
+    
+    def _load_shared_indicators(self):
+        """다른 워커가 공유 캐시에 올린 경제지표가 더 최신이면 가져옴"""
+        if not is_shared():
+            return
+        snapshot = get_shared_cache().get(INDICATORS_CACHE_KEY)
+        if snapshot is None:
+            return
+        # 공유 스냅샷은 벽시계 기준 → 이 프로세스의 monotonic 기준으로 변환
+        fetched_at = time.monotonic() - max(0.0, time.time() - snapshot["fetched_at"])
+        if self._indicators is None or fetched_at > self._indicators_fetched_at:
+            self._indicators = snapshot["data"]
+            self._indicators_etag = snapshot["etag"]
+            self._indicators_fetched_at = fetched_at
+    
+    def _publish_shared_indicators(self):
+        """갱신한 경제지표를 공유 캐시에 올림"""
+        if not is_shared() or self._indicators is None:
+            return
+        age = time.monotonic() - self._indicators_fetched_at
+        get_shared_cache().set(INDICATORS_CACHE_KEY, {
+            "data": self._indicators,
+            "etag": self._indicators_etag,
+            "fetched_at": time.time() - age
+        })
+    
+    def start_indicator_refresh(self):
+        """경제지표 주기적 백그라운드 갱신 시작 (서버 시작 시 호출)"""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._indicator_refresh_loop())
+    
+    async def _indicator_refresh_loop(self):
+        """
+        TTL이 만료되기 전에 미리 경제지표 갱신
+        (멀티 워커면 리더 워커만 Spring Boot를 호출하고, 나머지는 공유 스냅샷을 읽음)
+        """
+        while True:
+            leader = is_leader()
+            # ★ 한 번 실패해도 (공유 캐시/redis 오류 등) 루프는 계속 - 다음 주기에 다시 시도
+            try:
+                if leader:
+                    await self.refresh_economic_indicators(force=True)
+                else:
+                    self._load_shared_indicators()
+            except Exception as e:
+                logger.error(f"경제지표 백그라운드 갱신 실패: {e}")
+            await asyncio.sleep(
+                settings.indicator_refresh_interval_seconds if leader else settings.shared_follower_sync_seconds
+            )
     
     async def get_stock_code_from_name(self, stock_name: str) -> Optional[str]:
         """
@@ -65,8 +373,9 @@ class SpringBootClient:
             logger.info(f"종목 코드 조회: {stock_name}")
             
             # Spring Boot의 /api/stocks/search?query={종목명} 엔드포인트 호출
-            response = await self.client.get(
-                f"{self.base_url}/api/stocks/search",
+            response = await self._get(
+                "stock_search",
+                "/api/stocks/search",
                 params={"query": stock_name}
             )
             response.raise_for_status()
@@ -84,9 +393,35 @@ class SpringBootClient:
             logger.error(f"종목 코드 조회 실패: {str(e)}")
             return None
     
+    async def get_all_stocks(self) -> Optional[List[Dict]]:
+        """
+        전체 종목 목록 일괄 조회 (종목 리졸버 적재용)
+        
+        Returns:
+            [{"stockId": "005930", "stockName": "삼성전자"}, ...] 또는 실패 시 None
+        """
+        try:
+            logger.info("Spring Boot에서 전체 종목 목록 조회 시작")
+            
+            # Spring Boot의 /api/stocks 엔드포인트 호출
+            response = await self._get("stocks", "/api/stocks")
+            response.raise_for_status()
+            
+            stocks = response.json()
+            logger.info(f"전체 종목 목록 조회 성공: {len(stocks)}개")
+            return stocks
+            
+        except Exception as e:
+            logger.error(f"전체 종목 목록 조회 실패: {str(e)}")
+            return None
+    
     async def close(self):
         """클라이언트 종료"""
-        await self.client.aclose()
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+        if self._client is not None:
+            await self._client.aclose()
+            self._client = None
 
 # 전역 클라이언트 인스턴스
 # ★ Kubernetes 환경에서는 "http://backend-svc:8080" 사용
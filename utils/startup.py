@@ -0,0 +1,138 @@
+"""
+서버 기동/준비 상태 관리 모듈
+lifespan에서 설정된 워밍업(체인 import, 토크나이저, 리트리버, 종목명, 시장 스냅샷)을 백그라운드로 실행하고
+준비 완료로 표시 (/ready, Kubernetes readinessProbe에서 사용)
+
+- 필수 워밍업(settings.startup_required_warmups): 성공할 때까지 재시도, 그동안은 준비 안 됨
+- 그 밖의 워밍업(외부 의존성 - Pinecone, pykrx 등): 최대 settings.startup_warmup_max_attempts회 시도,
+  실패해도 준비 완료로 전환하고 "degraded" 상태와 실패한 워밍업 목록을 보고 (해당 기능은 첫 요청에서 처리)
+- 재시도 간격: settings.startup_warmup_retry_seconds
+"""
+from typing import Any, Awaitable, Callable, Dict, List, Optional
+import asyncio
+import time
+from utils.config import settings
+from utils.lazy import import_timings
+from utils.logger import logger
+from utils.metrics import READY, STARTUP_DURATION
+
+Warmup = Callable[[], Awaitable[Any]]
+
+class Readiness:
+    """기동 시간 측정 + 워밍업 실행/상태 보고"""
+
+    def __init__(self):
+        self.import_seconds: Optional[float] = None
+        self.startup_seconds: Optional[float] = None
+        self.ready = False
+        self.degraded: List[str] = []  # 시도 횟수를 다 쓰고도 실패한 선택 워밍업
+        self.warmups: Dict[str, Dict[str, Any]] = {}
+        self._registry: Dict[str, Warmup] = {}
+        self._task: Optional[asyncio.Task] = None
+
+    def record_import(self, seconds: float):
+        """main 모듈 import 소요 시간 기록"""
+        self.import_seconds = round(seconds, 3)
+        STARTUP_DURATION.labels(phase="import").set(seconds)
+
+    def record_startup(self, seconds: float):
+        """lifespan 시작 단계(클라이언트 생성 등) 소요 시간 기록"""
+        self.startup_seconds = round(seconds, 3)
+        STARTUP_DURATION.labels(phase="startup").set(seconds)
+
+    def register(self, name: str, warmup: Warmup):
+        """
+        워밍업 등록 (settings.startup_warmups에 포함된 것만 실행)
+
+        Args:
+            name: 워밍업 이름 (예: "retriever")
+            warmup: 인자 없는 async 함수
+        """
+        self._registry[name] = warmup
+
+    def start(self):
+        """등록된 워밍업을 백그라운드로 시작 (서버 시작 시 호출)"""
+        if self._task is None or self._task.done():
+            self._task = asyncio.create_task(self._run())
+
+    async def _run_one(self, name: str, warmup: Warmup, attempt: int):
+        self.warmups[name] = {"status": "running", "attempts": attempt}
+        started = time.perf_counter()
+        try:
+            await warmup()
+            status = "ok"
+        except Exception as e:
+            logger.warning(f"워밍업 실패 ({name}): {e}")
+            status = "failed"
+        elapsed = time.perf_counter() - started
+        self.warmups[name] = {"status": status, "seconds": round(elapsed, 3), "attempts": attempt}
+        STARTUP_DURATION.labels(phase=f"warmup.{name}").set(elapsed)
+
+    async def _run(self):
+        started = time.perf_counter()
+        selected = [name for name in settings.startup_warmups if name in self._registry]
+        for name in settings.startup_warmups:
+            if name not in self._registry:
+                logger.warning(f"알 수 없는 워밍업: {name}")
+
+        # ★ 필수 워밍업은 성공할 때까지, 선택 워밍업은 최대 시도 횟수까지 (실패/시간 초과한 것만 다시 시도)
+        required = set(settings.startup_required_warmups)
+        pending = list(selected)
+        attempt = 0
+        while pending:
+            attempt += 1
+            try:
+                await asyncio.wait_for(
+                    asyncio.gather(*(self._run_one(name, self._registry[name], attempt) for name in pending)),
+                    timeout=settings.startup_warmup_timeout_seconds
+                )
+            except asyncio.TimeoutError:
+                logger.warning(f"워밍업 시간 초과 ({settings.startup_warmup_timeout_seconds}초)")
+                for name in pending:
+                    if self.warmups.get(name, {}).get("status") == "running":
+                        self.warmups[name] = {"status": "timeout", "attempts": attempt}
+
+            pending = [name for name in pending if self.warmups[name]["status"] != "ok"]
+            if attempt >= settings.startup_warmup_max_attempts:
+                # 선택 워밍업은 포기 (준비 완료는 막지 않음)
+                given_up = [name for name in pending if name not in required]
+                if given_up:
+                    logger.warning(f"선택 워밍업 실패 ({', '.join(given_up)}) - {attempt}회 시도 후 포기, degraded로 준비 완료")
+                self.degraded.extend(given_up)
+                pending = [name for name in pending if name in required]
+            if not self.ready and not any(name in required for name in pending):
+                self._mark_ready(time.perf_counter() - started, selected)
+            if pending:
+                logger.warning(
+                    f"워밍업 미완료 ({', '.join(pending)}) - {settings.startup_warmup_retry_seconds}초 후 재시도"
+                    + ("" if self.ready else " (준비 안 됨 유지)")
+                )
+                await asyncio.sleep(settings.startup_warmup_retry_seconds)
+
+        if not self.ready:
+            self._mark_ready(time.perf_counter() - started, selected)
+
+    def _mark_ready(self, elapsed: float, selected: List[str]):
+        STARTUP_DURATION.labels(phase="warmup").set(elapsed)
+        self.ready = True
+        READY.set(1)
+        logger.info(f"✅ 서버 준비 완료 (워밍업 {elapsed:.2f}초: {', '.join(selected) or '없음'})")
+
+    def stop(self):
+        """진행 중인 워밍업 취소"""
+        if self._task is not None:
+            self._task.cancel()
+
+    def status(self) -> Dict[str, Any]:
+        """/ready 응답 본문"""
+        return {
+            "status": ("degraded" if self.degraded else "ready") if self.ready else "warming_up",
+            "degraded": self.degraded,
+            "import_seconds": self.import_seconds,
+            "startup_seconds": self.startup_seconds,
+            "warmups": self.warmups,
+            "lazy_imports": dict(import_timings)
+        }
+
+# 전역 준비 상태 인스턴스
+readiness = Readiness()
@@ -0,0 +1,244 @@
+"""
+종목명 → 종목 코드 로컬 리졸버
+Spring Boot 종목 테이블과 KRX 티커 목록을 한 번에 미리 적재하여
+질문 처리 중에는 네트워크 호출 없이 메모리에서 조회
+"""
+from datetime import datetime
+from typing import Dict, Optional, Tuple
+import asyncio
+import re
+from utils.config import settings
+from utils.lazy import lazy_import
+from utils.logger import logger
+from utils.spring_client import spring_client
+from utils.shared_cache import get_shared_cache, is_leader, is_shared, wait_for
+
+stock = lazy_import("pykrx.stock")
+
+# 워커 간 공유 종목명 테이블 키
+NAMES_CACHE_KEY = "resolver:names"
+
+# ★ 별칭/영문명 (KRX 공식 종목명에 없는 표현) - 적재 전에도 사용 가능한 기본값
+STOCK_ALIASES: Dict[str, str] = {
+    # 주요 종목 공식명 (적재 실패 시 Fallback)
+    "삼성전자": "005930",
+    "SK하이닉스": "000660",
+    "LG에너지솔루션": "373220",
+    "삼성바이오로직스": "207940",
+    "현대차": "005380",
+    "기아": "000270",
+    "셀트리온": "068270",
+    "POSCO홀딩스": "005490",
+    "NAVER": "035420",
+    "카카오": "035720",
+    # 줄임말/통칭
+    "삼전": "005930",
+    "하이닉스": "000660",
+    "하닉": "000660",
+    "LG엔솔": "373220",
+    "엔솔": "373220",
+    "삼성바이오": "207940",
+    "삼바": "207940",
+    "로직스": "207940",
+    "현대자동차": "005380",
+    "기아차": "000270",
+    "포스코": "005490",
+    "포스코홀딩스": "005490",
+    "네이버": "035420",
+    "카뱅": "323410",
+    "삼성SDI": "006400",
+    "LG화학": "051910",
+    # 영문명
+    "Samsung Electronics": "005930",
+    "Samsung": "005930",
+    "SK hynix": "000660",
+    "Hynix": "000660",
+    "LG Energy Solution": "373220",
+    "Samsung Biologics": "207940",
+    "Hyundai Motor": "005380",
+    "Hyundai": "005380",
+    "Kia": "000270",
+    "Celltrion": "068270",
+    "POSCO": "005490",
+    "Kakao": "035720",
+}
+
+_ALIAS_KEYS = {"".join(alias.split()).lower() for alias in STOCK_ALIASES}
+
+_STOCK_CODE_PATTERN = re.compile(r"^\d{6}$")
+_CORP_SUFFIX = re.compile(r"\(주\)|주식회사|㈜")
+
+# 문장 검색 시 KRX 종목명 최소 길이 ("대상", "조선" 같은 일반 명사 오탐 방지, 별칭은 예외)
+MIN_TEXT_MATCH_LENGTH = 3
+
+def normalize_name(name: str) -> str:
+    """
+    종목명 정규화 (공백 제거, 영문 소문자, 법인 표기 제거)
+
+    Args:
+        name: 종목명 (예: "SK 하이닉스", "Samsung Electronics")
+
+    Returns:
+        정규화된 종목명 (예: "sk하이닉스", "samsungelectronics")
+    """
+    return _CORP_SUFFIX.sub("", "".join(name.split())).lower()
+
+class StockResolver:
+    """인메모리 종목명 → 종목 코드 리졸버"""
+
+    def __init__(self):
+        """초기화 (별칭만 적재된 상태로 시작)"""
+        self._names: Dict[str, str] = {}
+        self._display_names: Dict[str, str] = {}
+        self._code_names: Dict[str, str] = {}
+        self._install(STOCK_ALIASES)
+        self.loaded_at: Optional[datetime] = None
+        self._refresh_task: Optional[asyncio.Task] = None
+        self._first_refresh = asyncio.Event()
+
+    def _install(self, names: Dict[str, str]):
+        """정규화 이름 테이블 교체 (별칭을 항상 포함, dict 통째 교체로 조회 중 안전)"""
+        table = {normalize_name(n): code for n, code in names.items()}
+        for alias, code in STOCK_ALIASES.items():
+            table.setdefault(normalize_name(alias), code)
+        display = {normalize_name(n): n for n in STOCK_ALIASES}
+        display.update({normalize_name(n): n for n in names})
+        code_names = {code: n for n, code in names.items()}  # KRX 공식 종목명 우선
+        for alias, code in STOCK_ALIASES.items():
+            code_names.setdefault(code, alias)  # 별칭 목록은 공식명이 먼저 나옴
+        self._names = table
+        self._display_names = display
+        self._code_names = code_names
+
+    def resolve(self, name: str) -> Optional[str]:
+        """
+        종목명(또는 종목 코드) → 종목 코드
+
+        Args:
+            name: 종목명, 별칭, 영문명 또는 6자리 코드
+
+        Returns:
+            종목 코드 (6자리) 또는 None
+        """
+        name = name.strip()
+        if _STOCK_CODE_PATTERN.match(name):
+            return name
+        return self._names.get(normalize_name(name))
+
+    def find_in_text(self, text: str) -> Tuple[Optional[str], Optional[str]]:
+        """
+        문장에 포함된 가장 긴 종목명 찾기 (규칙 기반 분류용)
+
+        Args:
+            text: 사용자 질문
+
+        Returns:
+            (일치한 종목명, 종목 코드), 없으면 (None, None)
+        """
+        normalized = normalize_name(text)
+        best: Optional[str] = None
+        for name in self._names:
+            min_length = 2 if name in _ALIAS_KEYS else MIN_TEXT_MATCH_LENGTH
+            if len(name) >= min_length and name in normalized and (best is None or len(name) > len(best)):
+                best = name
+        if best is None:
+            return None, None
+        return self._display_names.get(best, best), self._names[best]
+
+    def name_of(self, stock_code: str) -> Optional[str]:
+        """종목 코드 → 종목명 (모르면 None)"""
+        return self._code_names.get(stock_code)
+
+    def __len__(self) -> int:
+        return len(self._names)
+
+    async def refresh(self):
+        """
+        Spring Boot 종목 테이블 + KRX 티커 목록을 일괄 적재
+        (한쪽이 실패해도 다른 쪽 데이터로 갱신, 둘 다 실패하면 기존 테이블 유지)
+        """
+        names: Dict[str, str] = {}
+
+        # 1. KRX 전체 티커 (pykrx는 동기 라이브러리이므로 스레드에서 실행)
+        try:
+            names.update(await asyncio.to_thread(_load_krx_names))
+        except Exception as e:
+            logger.error(f"KRX 종목 목록 적재 실패: {e}")
+
+        # 2. Spring Boot 종목 테이블 (서비스에서 쓰는 표기가 우선)
+        stocks = await spring_client.get_all_stocks()
+        for item in stocks or []:
+            code = item.get("stockId")
+            name = item.get("stockName") or item.get("name")
+            if code and name:
+                names[name] = code
+
+        if not names:
+            logger.warning("⚠️ 종목 목록 적재 실패 - 기존 종목 테이블 유지")
+            return
+
+        self._install(names)
+        self.loaded_at = datetime.now()
+        logger.info(f"종목 리졸버 적재 완료: {len(self._names)}개 이름")
+        if is_shared():
+            get_shared_cache().set(NAMES_CACHE_KEY, {"names": names, "loaded_at": self.loaded_at})
+
+    def load_shared(self) -> bool:
+        """
+        리더 워커가 공유 캐시에 올린 종목명 테이블 적재
+
+        Returns:
+            적재 여부
+        """
+        snapshot = get_shared_cache().get(NAMES_CACHE_KEY)
+        if snapshot is None:
+            return False
+        if self.loaded_at is None or snapshot["loaded_at"] > self.loaded_at:
+            self._install(snapshot["names"])
+            self.loaded_at = snapshot["loaded_at"]
+            logger.info(f"공유 종목명 테이블 적재: {len(self._names)}개 이름")
+        return True
+
+    def start_daily_refresh(self):
+        """주기적 적재 시작 (서버 시작 시 호출)"""
+        if self._refresh_task is None or self._refresh_task.done():
+            self._refresh_task = asyncio.create_task(self._refresh_loop())
+
+    async def _refresh_loop(self):
+        """
+        settings.stock_resolver_refresh_hours마다 재적재
+        (멀티 워커면 리더 워커만 KRX/Spring Boot를 조회하고, 나머지는 공유 테이블을 읽음)
+        """
+        while True:
+            if is_leader():
+                await self.refresh()
+                self._first_refresh.set()
+                await asyncio.sleep(settings.stock_resolver_refresh_hours * 3600)
+                continue
+
+            # 첫 적재는 리더의 결과를 기다리되, 없으면 직접 적재
+            if self.loaded_at is None and not self.load_shared():
+                if await wait_for(NAMES_CACHE_KEY, settings.shared_cache_wait_seconds) is None:
+                    await self.refresh()
+                self.load_shared()
+            self._first_refresh.set()
+            await asyncio.sleep(settings.shared_follower_sync_seconds)
+            self.load_shared()
+
+    async def wait_until_loaded(self):
+        """첫 적재 시도가 끝날 때까지 대기 (서버 워밍업용)"""
+        await self._first_refresh.wait()
+
+    def stop(self):
+        """주기적 적재 중지"""
+        if self._refresh_task is not None:
+            self._refresh_task.cancel()
+
+def _load_krx_names() -> Dict[str, str]:
+    """KRX(KOSPI+KOSDAQ) 전체 종목명 → 코드 조회"""
+    date_str = datetime.now().strftime("%Y%m%d")
+    tickers = stock.get_market_ticker_list(date_str, market="ALL")
+    return {stock.get_market_ticker_name(ticker): ticker for ticker in tickers}
+
+# 전역 리졸버 인스턴스
+stock_resolver = StockResolver()
@@ -0,0 +1,303 @@
+"""
+기술적 지표 모듈
+종목별 최근 시세 이력(종가/거래량)을 캐시해 두고, 여러 종목을 (종목 × 거래일) 배열로 쌓아서
+이동평균, RSI, 변동성, 거래량 z-score, 52주 범위를 NumPy로 한 번에 계산
+
+- 이력은 최신 거래일이 마지막 열이 되도록 오른쪽 정렬, 이력이 짧은 종목은 앞쪽을 NaN으로 채움
+  → 창(window)보다 이력이 짧으면 해당 지표는 None
+- 종가가 0 이하인 날(거래정지 등)은 직전 종가로 채움 (로그수익률 -inf 방지)
+- 주가 분석 프롬프트에는 digest()의 몇 줄짜리 요약만 넣음
+"""
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import Any, Dict, List, Optional
+import warnings
+from utils.config import settings
+from utils.logger import logger
+from utils.lazy import lazy_import
+from utils.shared_cache import get_shared_cache
+
+np = lazy_import("numpy")
+stock = lazy_import("pykrx.stock")
+
+MA_WINDOWS = (5, 20, 60, 120)
+RSI_PERIOD = 14
+VOLATILITY_WINDOW = 20
+VOLUME_WINDOW = 20
+YEAR_WINDOW = 252  # 52주 거래일 수
+TRADING_DAYS_PER_YEAR = 252
+
+def _history_key(ticker: str, date_str: str) -> str:
+    return f"history:{ticker}:{date_str}"
+
+def _cached_history(key: str, label: str, load) -> Optional[Dict[str, List[float]]]:
+    """
+    시세 이력 조회 (캐시 우선)
+
+    Args:
+        key: 캐시 키 이름 (종목 코드, 지수는 "index:코드")
+        label: 로그용 이름
+        load: (시작일, 종료일) → OHLCV DataFrame
+
+    Returns:
+        {"dates": [...], "close": [...], "volume": [...]} (오래된 순) 또는 None
+    """
+    today = datetime.now()
+    cache_key = _history_key(key, today.strftime("%Y%m%d"))
+    cache = get_shared_cache()
+    history = cache.get(cache_key)
+    if history is not None:
+        return history or None  # 빈 dict = 조회했지만 데이터 없음
+
+    # 거래일 수의 1.5배 달력일이면 주말/공휴일을 넣어도 충분
+    start = today - timedelta(days=int(settings.technicals_history_days * 1.5))
+    try:
+        df = load(start.strftime("%Y%m%d"), today.strftime("%Y%m%d"))
+    except Exception as e:
+        logger.error(f"시세 이력 조회 실패 ({label}): {e}")
+        return None
+
+    history = {}
+    if not df.empty:
+        df = df.tail(settings.technicals_history_days)
+        history = {
+            "dates": [d.strftime("%Y%m%d") for d in df.index],
+            "close": df["종가"].astype(float).tolist(),
+            "volume": df["거래량"].astype(float).tolist()
+        }
+    cache.set(cache_key, history, ttl=settings.technicals_cache_ttl_seconds)
+    cache.prune("history", settings.technicals_cache_max_entries)
+    return history or None
+
+def fetch_history(ticker: str) -> Optional[Dict[str, List[float]]]:
+    """
+    종목의 최근 시세 이력 조회 (캐시 우선)
+
+    Args:
+        ticker: 종목 코드
+
+    Returns:
+        {"dates": [...], "close": [...], "volume": [...]} (오래된 순) 또는 None
+    """
+    return _cached_history(ticker, ticker, lambda start, end: stock.get_market_ohlcv(start, end, ticker))
+
+def fetch_histories(tickers: List[str]) -> List[Optional[Dict[str, List[float]]]]:
+    """
+    여러 종목의 이력 (캐시에 없는 종목만 병렬 조회)
+
+    Args:
+        tickers: 종목 코드 목록
+
+    Returns:
+        tickers와 같은 순서의 이력 목록 (없으면 None)
+    """
+    date_str = datetime.now().strftime("%Y%m%d")
+    cache = get_shared_cache()
+    fetched = {}
+    for ticker in tickers:
+        history = cache.get(_history_key(ticker, date_str))
+        if history is not None:
+            fetched[ticker] = history or None
+    missing = [ticker for ticker in tickers if ticker not in fetched]
+    if missing:
+        workers = max(1, min(settings.technicals_fetch_concurrency, len(missing)))
+        with ThreadPoolExecutor(max_workers=workers) as pool:
+            fetched.update(zip(missing, pool.map(fetch_history, missing)))
+    return [fetched[ticker] for ticker in tickers]
+
+def fetch_index_history(index_code: str = "1001") -> Optional[Dict[str, List[float]]]:
+    """
+    지수의 최근 이력 조회 (캐시 우선, 기본: KOSPI)
+
+    Args:
+        index_code: KRX 지수 코드 ("1001" = KOSPI)
+    """
+    return _cached_history(
+        f"index:{index_code}", f"지수 {index_code}",
+        lambda start, end: stock.get_index_ohlcv(start, end, index_code)
+    )
+
+def stack_histories(histories: List[Dict[str, List[float]]]):
+    """
+    이력 목록을 (종목 수 × 최대 길이) 종가/거래량 배열로 변환 (오른쪽 정렬, 빈 칸은 NaN)
+
+    Returns:
+        (closes, volumes) 튜플
+    """
+    length = max((len(h["close"]) for h in histories), default=0)
+    closes = np.full((len(histories), length), np.nan)
+    volumes = np.full((len(histories), length), np.nan)
+    for row, history in enumerate(histories):
+        n = len(history["close"])
+        if n:
+            closes[row, length - n:] = history["close"]
+            volumes[row, length - n:] = history["volume"]
+    return closes, volumes
+
+def _window(values, window: int):
+    """마지막 window개 열 (이력이 짧으면 NaN으로 왼쪽 채움)"""
+    if values.shape[1] >= window:
+        return values[:, -window:]
+    pad = np.full((values.shape[0], window - values.shape[1]), np.nan)
+    return np.concatenate([pad, values], axis=1)
+
+def _full(window_values):
+    """창 전체에 값이 있는 행만 True"""
+    return ~np.isnan(window_values).any(axis=1)
+
+def _fill_invalid_closes(closes):
+    """0 이하 종가를 NaN으로 가린 뒤 직전 종가로 채움 (첫 유효 종가 이전은 NaN)"""
+    closes = np.where(closes > 0, closes, np.nan)
+    filled = np.where(np.isnan(closes), 0, np.arange(closes.shape[1]))
+    np.maximum.accumulate(filled, axis=1, out=filled)
+    return closes[np.arange(closes.shape[0])[:, None], filled]
+
+def _wilder_average(values, period: int):
+    """
+    행별 Wilder 평활 평균 (첫 period개는 단순 평균, 이후 avg = (avg × (period - 1) + x) / period)
+    재귀식을 열별 가중치 합으로 풀어서 한 번에 계산 - 값은 오른쪽 정렬(앞쪽만 NaN)이라고 가정
+
+    Returns:
+        (행 수,) 배열 (값이 period개보다 적으면 NaN)
+    """
+    n = values.shape[1]
+    valid = ~np.isnan(values)
+    counts = valid.sum(axis=1)
+    start = (n - counts)[:, None]
+    alpha = 1.0 / period
+    columns = np.arange(n)
+    # 시드 이후 값: 뒤에 남은 평활 횟수만큼 감쇠, 시드 값: 시드 평균이 받는 감쇠를 나눠 가짐
+    weights = np.broadcast_to(alpha * (1 - alpha) ** (n - 1 - columns), values.shape)
+    seed_weight = (alpha * (1 - alpha) ** np.maximum(counts - period, 0))[:, None]
+    weights = np.where(columns < start + period, seed_weight, weights)
+    weights = np.where(columns < start, 0.0, weights)
+    result = (np.where(valid, values, 0.0) * weights).sum(axis=1)
+    return np.where(counts >= period, result, np.nan)
+
+def compute_indicators(closes, volumes) -> Dict[str, Any]:
+    """
+    종목별 최신 기술적 지표를 한 번에 계산
+
+    Args:
+        closes: (종목 수 × 거래일) 종가 배열
+        volumes: (종목 수 × 거래일) 거래량 배열
+
+    Returns:
+        지표 이름 → (종목 수,) 배열 (계산할 수 없으면 NaN)
+    """
+    with warnings.catch_warnings(), np.errstate(divide="ignore", invalid="ignore"):
+        warnings.simplefilter("ignore", category=RuntimeWarning)  # 전부 NaN인 행의 nanmean 등
+        closes = _fill_invalid_closes(closes)
+        last = closes[:, -1]
+        result: Dict[str, Any] = {"close": last}
+
+        # 이동평균
+        for window in MA_WINDOWS:
+            values = _window(closes, window)
+            result[f"ma{window}"] = np.where(_full(values), values.mean(axis=1), np.nan)
+
+        # RSI (Wilder 평활 - 이력 전체의 상승폭/하락폭을 RSI_PERIOD 기준으로 평활)
+        diffs = np.diff(closes, axis=1)
+        gain = _wilder_average(np.clip(diffs, 0, None), RSI_PERIOD)
+        loss = _wilder_average(np.clip(-diffs, 0, None), RSI_PERIOD)
+        rsi = np.where(loss == 0, 100.0, 100 - 100 / (1 + gain / loss))
+        result["rsi"] = np.where(np.isnan(gain), np.nan, rsi)
+
+        # 변동성 (일간 로그수익률 표준편차, 연율화 %)
+        values = _window(closes, VOLATILITY_WINDOW + 1)
+        returns = np.diff(np.log(values), axis=1)
+        volatility = returns.std(axis=1, ddof=1) * np.sqrt(TRADING_DAYS_PER_YEAR) * 100
+        result["volatility"] = np.where(_full(values), volatility, np.nan)
+
+        # 거래량 z-score (당일 거래량 vs 직전 VOLUME_WINDOW일)
+        values = _window(volumes, VOLUME_WINDOW + 1)
+        prior = values[:, :-1]
+        std = prior.std(axis=1, ddof=1)
+        z = np.where(std > 0, (values[:, -1] - prior.mean(axis=1)) / std, 0.0)
+        result["volume_z"] = np.where(_full(values), z, np.nan)
+
+        # 52주 범위 (이력이 1년보다 짧으면 있는 만큼)
+        values = _window(closes, YEAR_WINDOW)
+        high = np.nanmax(values, axis=1)
+        low = np.nanmin(values, axis=1)
+        result["high_52w"] = high
+        result["low_52w"] = low
+        result["position_52w"] = np.where(high > low, (last - low) / (high - low) * 100, np.nan)
+
+    return result
+
+def _trend(ma5: Optional[float], ma20: Optional[float], ma60: Optional[float]) -> Optional[str]:
+    """이동평균 배열 (정배열/역배열/혼조)"""
+    if ma5 is None or ma20 is None or ma60 is None:
+        return None
+    if ma5 > ma20 > ma60:
+        return "정배열"
+    if ma5 < ma20 < ma60:
+        return "역배열"
+    return "혼조"
+
+def _records(tickers: List[str], histories: List[Dict[str, List[float]]], indicators: Dict[str, Any]) -> Dict[str, Dict[str, Any]]:
+    """지표 배열을 종목별 dict로 변환 (NaN → None)"""
+    records = {}
+    for row, ticker in enumerate(tickers):
+        record: Dict[str, Any] = {"ticker": ticker, "date": histories[row]["dates"][-1], "days": len(histories[row]["close"])}
+        for name, values in indicators.items():
+            value = float(values[row])
+            record[name] = None if np.isnan(value) else round(value, 2)
+        record["trend"] = _trend(record["ma5"], record["ma20"], record["ma60"])
+        records[ticker] = record
+    return records
+
+def get_technicals_many(tickers: List[str]) -> Dict[str, Dict[str, Any]]:
+    """
+    여러 종목의 기술적 지표 (이력은 병렬 조회, 지표는 한 번에 계산)
+
+    Args:
+        tickers: 종목 코드 목록
+
+    Returns:
+        종목 코드 → 지표 dict (이력이 없는 종목은 제외)
+    """
+    tickers = list(dict.fromkeys(tickers))
+    if not tickers:
+        return {}
+    fetched = fetch_histories(tickers)
+
+    found = [(ticker, history) for ticker, history in zip(tickers, fetched) if history]
+    if not found:
+        return {}
+    found_tickers = [ticker for ticker, _ in found]
+    histories = [history for _, history in found]
+    closes, volumes = stack_histories(histories)
+    return _records(found_tickers, histories, compute_indicators(closes, volumes))
+
+def get_technicals(ticker: str) -> Optional[Dict[str, Any]]:
+    """종목 하나의 기술적 지표 (이력이 없으면 None)"""
+    return get_technicals_many([ticker]).get(ticker)
+
+def digest(technicals: Optional[Dict[str, Any]]) -> str:
+    """
+    프롬프트용 기술적 지표 요약 (계산된 항목만, 몇 줄)
+
+    Args:
+        technicals: get_technicals 결과
+    """
+    if not technicals:
+        return ""
+    t = technicals
+    lines = []
+    averages = [f"{w}일 {t[f'ma{w}']:,.0f}" for w in MA_WINDOWS if t.get(f"ma{w}") is not None]
+    if averages:
+        trend = f" ({t['trend']})" if t.get("trend") else ""
+        lines.append(f"이동평균: {' / '.join(averages)}{trend}")
+    if t.get("rsi") is not None:
+        lines.append(f"RSI({RSI_PERIOD}): {t['rsi']:.1f}")
+    if t.get("volatility") is not None:
+        lines.append(f"변동성({VOLATILITY_WINDOW}일, 연율): {t['volatility']:.1f}%")
+    if t.get("volume_z") is not None:
+        lines.append(f"거래량: {VOLUME_WINDOW}일 평균 대비 z-score {t['volume_z']:+.2f}")
+    if t.get("position_52w") is not None:
+        lines.append(
+            f"52주 범위: {t['low_52w']:,.0f} ~ {t['high_52w']:,.0f}원 (현재 위치 {t['position_52w']:.0f}%)"
+        )
+    return "\n".join(lines)
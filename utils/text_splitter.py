@@ -1,35 +1,154 @@
 """
 텍스트 분할 모듈
 긴 문서를 작은 청크로 분할하여 임베딩 및 검색 효율 향상
+(청크 크기는 임베딩 모델 토크나이저 기준 토큰 수, 대량 문서는 CPU 코어별 병렬 분할)
 """
 from langchain.text_splitter import RecursiveCharacterTextSplitter
 from langchain_core.documents import Document
-from typing import List
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
+from itertools import islice
+import atexit
+import os
 from utils.config import settings
 from utils.logger import logger
+from utils.tokenizer import count_tokens
 
-def split_documents(documents: List[Document]) -> List[Document]:
+# 프로세스 풀 (split_document_stream 배치 간 재사용, 워커 수가 바뀌면 다시 생성)
+_executor: Optional[ProcessPoolExecutor] = None
+_executor_workers = 0
+
+def _embedding_token_length(text: str) -> int:
+    """임베딩 모델 토크나이저 기준 토큰 수 (프로세스 간 pickle 가능하도록 모듈 함수)"""
+    return count_tokens(text, settings.embedding_model)
+
+@lru_cache(maxsize=1)
+def get_text_splitter() -> RecursiveCharacterTextSplitter:
+    """
+    토큰 기준 RecursiveCharacterTextSplitter 반환 (프로세스별 캐시)
+
+    Returns:
+        RecursiveCharacterTextSplitter 객체
+    """
+    # RecursiveCharacterTextSplitter: 문단 → 문장 → 단어 순으로 분할
+    return RecursiveCharacterTextSplitter(
+        chunk_size=settings.chunk_size,  # 각 청크의 최대 크기 (토큰 수)
+        chunk_overlap=settings.chunk_overlap,  # 청크 간 오버랩 (문맥 유지)
+        length_function=_embedding_token_length,  # 임베딩 모델 토큰 수
+        separators=["\n\n", "\n", ". ", " ", ""]  # 분할 우선순위
+    )
+
+def _split_partition(documents: List[Document]) -> Tuple[List[Document], List[int]]:
+    """
+    워커 프로세스에서 실행되는 분할 함수
+    (청크 토큰 수도 워커에서 세어 함께 반환 → 부모 프로세스에서 다시 토큰화하지 않음,
+     metadata에는 넣지 않음 - metadata는 그대로 벡터 DB에 저장됨)
+
+    Returns:
+        (청크 리스트, 청크별 토큰 수)
+    """
+    chunks = get_text_splitter().split_documents(documents)
+    return chunks, [_embedding_token_length(chunk.page_content) for chunk in chunks]
+
+def _get_executor(workers: int) -> ProcessPoolExecutor:
+    """프로세스 풀 반환 (없거나 워커 수가 다르면 새로 생성)"""
+    global _executor, _executor_workers
+    if _executor is not None and _executor_workers != workers:
+        _executor.shutdown(wait=True)
+        _executor = None
+    if _executor is None:
+        _executor = ProcessPoolExecutor(max_workers=workers)
+        _executor_workers = workers
+    return _executor
+
+@atexit.register
+def shutdown_executor():
+    """프로세스 풀 종료 (인터프리터 종료 시 자동 호출)"""
+    global _executor, _executor_workers
+    if _executor is not None:
+        _executor.shutdown(wait=True)
+        _executor = None
+        _executor_workers = 0
+
+def get_split_workers() -> int:
+    """분할 워커 수 (settings.split_workers가 0이면 CPU 코어 수)"""
+    return settings.split_workers or os.cpu_count() or 1
+
+def get_chunk_stats(chunks: List[Document], token_counts: Optional[List[int]] = None) -> Dict[str, float]:
+    """
+    청크 토큰 수 통계
+
+    Args:
+        chunks: 분할된 Document 리스트
+        token_counts: 청크별 토큰 수 (분할할 때 센 값, 없으면 직접 계산)
+
+    Returns:
+        {"chunks", "total_tokens", "min_tokens", "max_tokens", "avg_tokens", "oversized"}
+    """
+    if not chunks:
+        return {"chunks": 0, "total_tokens": 0, "min_tokens": 0, "max_tokens": 0, "avg_tokens": 0.0, "oversized": 0}
+
+    lengths = token_counts if token_counts is not None else [
+        _embedding_token_length(chunk.page_content) for chunk in chunks
+    ]
+    return {
+        "chunks": len(lengths),
+        "total_tokens": sum(lengths),
+        "min_tokens": min(lengths),
+        "max_tokens": max(lengths),
+        "avg_tokens": round(sum(lengths) / len(lengths), 1),
+        "oversized": sum(1 for n in lengths if n > settings.chunk_size)
+    }
+
+def split_documents(documents: List[Document], workers: Optional[int] = None) -> List[Document]:
     """
     문서를 청크 단위로 분할
-    
+
     Args:
         documents: Document 객체 리스트
-    
+        workers: 병렬 워커 수 (기본: settings.split_workers)
+
     Returns:
-        분할된 Document 리스트
+        분할된 Document 리스트 (입력 순서 유지)
     """
     logger.info(f"텍스트 분할 시작: {len(documents)}개 문서")
-    
-    # RecursiveCharacterTextSplitter: 문단 → 문장 → 단어 순으로 분할
-    text_splitter = RecursiveCharacterTextSplitter(
-        chunk_size=settings.chunk_size,  # 각 청크의 최대 크기 (문자 수)
-        chunk_overlap=settings.chunk_overlap,  # 청크 간 오버랩 (문맥 유지)
-        length_function=len,  # 길이 측정 함수
-        separators=["\n\n", "\n", " ", ""]  # 분할 우선순위
-    )
-    
-    # 문서 분할 실행
-    chunks = text_splitter.split_documents(documents)
-    
-    logger.info(f"텍스트 분할 완료: {len(chunks)}개 청크 생성")
+
+    workers = workers or get_split_workers()
+
+    if workers <= 1 or len(documents) < settings.split_parallel_min_docs:
+        chunks, token_counts = _split_partition(documents)
+    else:
+        # 연속 구간으로 나눠 순서 유지
+        size = -(-len(documents) // workers)
+        partitions = [documents[i:i + size] for i in range(0, len(documents), size)]
+        chunks, token_counts = [], []
+        for part, counts in _get_executor(workers).map(_split_partition, partitions):
+            chunks.extend(part)
+            token_counts.extend(counts)
+
+    stats = get_chunk_stats(chunks, token_counts)
+    logger.info(f"텍스트 분할 완료: {len(chunks)}개 청크 생성 (워커 {workers}개), 토큰 통계: {stats}")
     return chunks
+
+def split_document_stream(
+    documents: Iterable[Document],
+    batch_size: int = settings.ingest_batch_size
+) -> Iterator[List[Document]]:
+    """
+    문서 스트림을 batch_size개씩 묶어 분할한 청크 배치를 지연 생성
+    (전체 문서를 메모리에 올리지 않고 배치 단위로 처리)
+
+    Args:
+        documents: Document 이터러블 (iter_pdf 등 제너레이터)
+        batch_size: 한 번에 분할할 문서 수
+
+    Yields:
+        분할된 Document 리스트 (배치 단위)
+    """
+    iterator = iter(documents)
+    while True:
+        batch = list(islice(iterator, batch_size))
+        if not batch:
+            return
+        yield split_documents(batch)
@@ -0,0 +1,62 @@
+"""
+토큰 카운팅 모듈
+tiktoken으로 모델별 토큰 수를 계산 (프롬프트 예산 관리 및 청킹 기준)
+"""
+from functools import lru_cache
+from typing import List
+import tiktoken
+
+# 모델명을 tiktoken이 모를 때 사용하는 기본 인코딩
+DEFAULT_ENCODING = "cl100k_base"
+
+@lru_cache(maxsize=16)
+def get_encoding(model: str) -> tiktoken.Encoding:
+    """
+    모델명에 맞는 tiktoken 인코딩 반환 (캐시)
+
+    Args:
+        model: OpenAI 모델명 (예: "gpt-4o-mini", "text-embedding-3-small")
+
+    Returns:
+        tiktoken.Encoding 객체
+    """
+    try:
+        return tiktoken.encoding_for_model(model)
+    except KeyError:
+        return tiktoken.get_encoding(DEFAULT_ENCODING)
+
+def count_tokens(text: str, model: str) -> int:
+    """
+    텍스트의 토큰 수 계산
+
+    Args:
+        text: 대상 텍스트
+        model: 토큰 기준 모델명
+
+    Returns:
+        토큰 수
+    """
+    if not text:
+        return 0
+    return len(get_encoding(model).encode(text, disallowed_special=()))
+
+def truncate_tokens(text: str, max_tokens: int, model: str) -> str:
+    """
+    텍스트를 최대 토큰 수에 맞게 자르기
+
+    Args:
+        text: 대상 텍스트
+        max_tokens: 최대 토큰 수
+        model: 토큰 기준 모델명
+
+    Returns:
+        잘린 텍스트 (이미 짧으면 원문 그대로)
+    """
+    if max_tokens <= 0:
+        return ""
+    encoding = get_encoding(model)
+    tokens: List[int] = encoding.encode(text, disallowed_special=())
+    if len(tokens) <= max_tokens:
+        return text
+    # ★ 잘린 위치가 한글 등 멀티바이트 문자 중간이면 불완전한 끝 바이트를 버림 (U+FFFD 방지)
+    return encoding.decode_bytes(tokens[:max_tokens]).decode("utf-8", errors="ignore")
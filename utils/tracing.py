@@ -0,0 +1,230 @@
+"""
+요청 단위 트레이싱 모듈
+요청마다 트레이스를 만들고 단계(분류, Spring 조회, 데이터 조회, 검색, LLM)별 스팬을 기록하여
+로컬 JSONL 파일 또는 수집기(HTTP)로 내보냄
+
+- 내보내기는 settings.trace_sample_rate 비율만 (5xx 응답은 항상) - 트레이스 자체는 항상 만들어서 debug timings에 사용
+- 파일은 settings.trace_max_bytes마다 로테이션 (traces.jsonl.1, .2, ...)
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, List, Optional
+import json
+import os
+import queue
+import random
+import threading
+import time
+import uuid
+import httpx
+from utils.config import settings
+from utils.logger import logger, per_worker_path
+
+class Span:
+    """트레이스 안의 단일 단계"""
+
+    __slots__ = ("name", "span_id", "parent_id", "start", "end", "attributes")
+
+    def __init__(self, name: str, parent_id: Optional[str] = None, attributes: Optional[Dict[str, Any]] = None):
+        self.name = name
+        self.span_id = uuid.uuid4().hex[:16]
+        self.parent_id = parent_id
+        self.start = time.time()
+        self.end: Optional[float] = None
+        self.attributes: Dict[str, Any] = attributes or {}
+
+    @property
+    def duration_ms(self) -> float:
+        return round(((self.end or time.time()) - self.start) * 1000, 2)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "name": self.name,
+            "span_id": self.span_id,
+            "parent_id": self.parent_id,
+            "start": self.start,
+            "duration_ms": self.duration_ms,
+            "attributes": self.attributes
+        }
+
+class Trace:
+    """요청 하나의 스팬 모음"""
+
+    def __init__(self, name: str, request_id: str = "-"):
+        self.trace_id = uuid.uuid4().hex
+        self.request_id = request_id
+        self.root = Span(name)
+        self.spans: List[Span] = [self.root]
+        self.finished = False
+
+    def timings(self) -> Dict[str, float]:
+        """
+        단계별 소요 시간 (ms) - 같은 이름의 스팬은 합산
+
+        Returns:
+            {"total": ..., "classification": ..., "llm.stock": ..., ...}
+        """
+        result: Dict[str, float] = {"total": self.root.duration_ms}
+        for span in self.spans[1:]:
+            result[span.name] = round(result.get(span.name, 0.0) + span.duration_ms, 2)
+        return result
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            "trace_id": self.trace_id,
+            "request_id": self.request_id,
+            "name": self.root.name,
+            "spans": [span.to_dict() for span in self.spans]
+        }
+
+_current_trace: ContextVar[Optional[Trace]] = ContextVar("current_trace", default=None)
+_current_span: ContextVar[Optional[Span]] = ContextVar("current_span", default=None)
+
+def get_current_trace() -> Optional[Trace]:
+    """현재 컨텍스트의 트레이스 (없으면 None)"""
+    return _current_trace.get()
+
+def start_trace(name: str, request_id: str = "-") -> Optional[Trace]:
+    """
+    새 트레이스 시작 (트레이싱 비활성화 시 None)
+
+    Args:
+        name: 루트 스팬 이름 (예: "POST /ai/query")
+        request_id: 로그와 연결할 요청 ID
+    """
+    if not settings.tracing_enabled:
+        return None
+    trace = Trace(name, request_id)
+    _current_trace.set(trace)
+    _current_span.set(trace.root)
+    return trace
+
+def _should_export(attributes: Dict[str, Any]) -> bool:
+    """샘플링 (서버 오류 트레이스는 항상 내보냄)"""
+    status = attributes.get("status")
+    if isinstance(status, int) and status >= 500:
+        return True
+    return random.random() < settings.trace_sample_rate
+
+def finish_trace(trace: Optional[Trace], **attributes: Any):
+    """트레이스 종료 및 내보내기 (샘플링된 것만)"""
+    if trace is None or trace.finished:
+        return
+    trace.root.end = time.time()
+    trace.root.attributes.update(attributes)
+    trace.finished = True
+    if _should_export(trace.root.attributes):
+        _exporter.export(trace)
+
+@contextmanager
+def span(name: str, **attributes: Any):
+    """
+    현재 트레이스에 스팬 기록 (트레이스가 없으면 아무 것도 하지 않음)
+
+    사용 예:
+        with span("spring.indicators"):
+            ...
+    """
+    trace = _current_trace.get()
+    if trace is None or trace.finished:
+        yield None
+        return
+
+    parent = _current_span.get()
+    current = Span(name, parent.span_id if parent else None, attributes)
+    trace.spans.append(current)
+    token = _current_span.set(current)
+    try:
+        yield current
+    except Exception as e:
+        current.attributes["error"] = type(e).__name__
+        raise
+    finally:
+        current.end = time.time()
+        _current_span.reset(token)
+
+def record_span(name: str, start: float, end: float, **attributes: Any):
+    """
+    이미 측정된 구간을 스팬으로 기록 (LLM 콜백처럼 with 블록을 쓸 수 없는 경우)
+
+    Args:
+        name: 스팬 이름
+        start: 시작 시각 (time.time())
+        end: 종료 시각 (time.time())
+    """
+    trace = _current_trace.get()
+    if trace is None or trace.finished:
+        return
+    parent = _current_span.get()
+    recorded = Span(name, parent.span_id if parent else None, attributes)
+    recorded.start = start
+    recorded.end = end
+    trace.spans.append(recorded)
+
+class TraceExporter:
+    """백그라운드 스레드에서 트레이스를 파일/수집기로 내보내는 익스포터 (요청 경로는 큐에 넣기만 함)"""
+
+    def __init__(self, max_queue: int = 1000, batch_size: int = 50):
+        self._queue: queue.Queue = queue.Queue(maxsize=max_queue)
+        self._batch_size = batch_size
+        self._thread: Optional[threading.Thread] = None
+        self.dropped = 0
+
+    def export(self, trace: Trace):
+        """트레이스 내보내기 예약 (큐가 가득 차면 버림)"""
+        if self._thread is None:
+            self._start()
+        try:
+            self._queue.put_nowait(trace.to_dict())
+        except queue.Full:
+            self.dropped += 1
+
+    def _start(self):
+        self._thread = threading.Thread(target=self._run, name="trace-exporter", daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            batch = [self._queue.get()]
+            while len(batch) < self._batch_size:
+                try:
+                    batch.append(self._queue.get_nowait())
+                except queue.Empty:
+                    break
+            try:
+                self._write(batch)
+            except Exception as e:
+                logger.warning(f"트레이스 내보내기 실패 ({len(batch)}건): {e}")
+
+    def _write(self, batch: List[Dict[str, Any]]):
+        if settings.trace_collector_url:
+            httpx.post(settings.trace_collector_url, json={"traces": batch}, timeout=5.0)
+            return
+
+        path = per_worker_path(settings.trace_file)
+        trace_dir = os.path.dirname(path)
+        if trace_dir:
+            os.makedirs(trace_dir, exist_ok=True)
+        self._rotate_if_needed(path)
+        with open(path, "a", encoding="utf-8") as f:
+            for item in batch:
+                f.write(json.dumps(item, ensure_ascii=False) + "\n")
+
+    @staticmethod
+    def _rotate_if_needed(path: str):
+        """파일이 trace_max_bytes 이상이면 path → path.1 → ... → path.N 으로 밀어냄 (가장 오래된 것은 삭제)"""
+        try:
+            if os.path.getsize(path) < settings.trace_max_bytes:
+                return
+        except OSError:
+            return  # 아직 파일 없음
+        backups = settings.trace_backup_count
+        if backups <= 0:
+            os.remove(path)
+            return
+        for index in range(backups - 1, 0, -1):
+            if os.path.exists(f"{path}.{index}"):
+                os.replace(f"{path}.{index}", f"{path}.{index + 1}")
+        os.replace(path, f"{path}.1")
+
+_exporter = TraceExporter()